@@ -25,8 +25,6 @@ from datetime import date, datetime, timedelta
 from fpdf import FPDF
 from st_aggrid import AgGrid, GridOptionsBuilder
 import matplotlib.patches as patches
-import gspread
-from google.oauth2.service_account import Credentials
 
 # =========================================================
 # 🎨 HELPER VISUAL — PLOTLY GLASS (ANTI FONDO NEGRO)
@@ -68,13 +66,36 @@ def apply_glass_plotly(fig):
 # BLOQUE DE CONEXIÓN A GOOGLE SHEETS (FINAL - SEGURO Y MULTIUSUARIO)
 # =========================================================
 
-import os, json, time
+import os, time
 import pandas as pd
-import gspread
-from google.oauth2.service_account import Credentials
 import streamlit as st
 from datetime import datetime, timedelta
 
+from data.loader import COLUMNAS_BASE
+from data.almacen import ALMACEN_POR_DEFECTO, RegistroNoEncontradoError, obtener_almacen
+from data.circuito import obtener_circuito
+from data.cache import (
+    actualizar_registros,
+    agregar_registros,
+    eliminar_registros,
+    invalidar_hoja,
+    linaje_de,
+    obtener_cache_tablas,
+    obtener_versiones,
+    versiones_de,
+)
+from data.indices import obtener_indices
+from data.vistas import obtener_vistas
+from data.seguridad import obtener_vistas_usuario
+from data.ids import IDDuplicadoError, obtener_asignador
+from data.agregados import obtener_agregados
+from data.referencias import franja_edad, obtener_referencias
+from data.radar import obtener_radares
+from data.percentiles import obtener_percentiles
+from data.similares import DISTANCIAS, obtener_similares
+from data.esquema import METRICAS, columnas_hoja, obtener_tablas_tipadas, opciones_categoria, tipar
+from data.writes import FilaDesplazadaError
+
 # --- CONFIGURACIÓN GENERAL ---
 SCOPE = [
     "https://www.googleapis.com/auth/spreadsheets",
@@ -82,138 +103,153 @@ SCOPE = [
 ]
 SHEET_ID = "1IInJ87xaaEwJfaz96mUlLLiX9_tk0HvqzoBoZGhrBi8"
 CREDS_PATH = os.path.join("credentials", "credentials.json")
-
-# Control de lectura para evitar exceso de requests
-if "ultima_lectura" not in st.session_state:
-    st.session_state["ultima_lectura"] = datetime.now() - timedelta(seconds=5)
+# Cuánto espera la app a que Sheets confirme el ID de un jugador nuevo
+ESPERA_CONFIRMACION_SEG = 30
 
 
 # =========================================================
-# CONEXIÓN
+# ALMACENAMIENTO (Google Sheets o local, ver data/almacen.py)
 # =========================================================
-def conectar_sheets():
-    try:
-        if "GOOGLE_SERVICE_ACCOUNT_JSON" in st.secrets:
-            creds_dict = json.loads(st.secrets["GOOGLE_SERVICE_ACCOUNT_JSON"])
-            creds = Credentials.from_service_account_info(creds_dict, scopes=SCOPE)
-        else:
-            if not os.path.exists(CREDS_PATH):
-                st.error("❌ Falta credentials.json o secreto en Streamlit Cloud.")
-                st.stop()
-            creds = Credentials.from_service_account_file(CREDS_PATH, scopes=SCOPE)
 
-        client = gspread.authorize(creds)
-        return client.open_by_key(SHEET_ID)
+def _almacen():
+    try:
+        return obtener_almacen(ALMACEN_POR_DEFECTO, SHEET_ID, CREDS_PATH, tuple(SCOPE))
+    except FileNotFoundError as e:
+        st.error(f"❌ {e}")
+        st.stop()
     except Exception as e:
-        st.error(f"⚠️ No se pudo conectar con Google Sheets: {e}")
+        st.error(f"⚠️ No se pudo inicializar el almacenamiento: {e}")
         st.stop()
 
 
-# =========================================================
-# OBTENER O CREAR HOJA
-# =========================================================
-def obtener_hoja(nombre_hoja: str, columnas_base: list = None):
-    try:
-        book = conectar_sheets()
-        hojas = [ws.title for ws in book.worksheets()]
-        if nombre_hoja not in hojas:
-            ws = book.add_worksheet(title=nombre_hoja, rows=500, cols=20)
-            if columnas_base:
-                ws.append_row(columnas_base)
-            st.warning(f"⚠️ Hoja '{nombre_hoja}' creada automáticamente.")
-            return ws
-        return book.worksheet(nombre_hoja)
-    except Exception as e:
-        st.error(f"⚠️ Error al obtener hoja '{nombre_hoja}': {e}")
-        st.stop()
+def registrar_escritura(descripcion: str, confirmacion):
+    """Guarda la confirmación en la sesión para avisar si la escritura falla."""
+    st.session_state.setdefault("escrituras_pendientes", []).append((descripcion, confirmacion))
+
+
+def mostrar_escrituras_pendientes():
+    pendientes = []
+    for descripcion, confirmacion in st.session_state.get("escrituras_pendientes", []):
+        if not confirmacion.done():
+            pendientes.append((descripcion, confirmacion))
+        elif confirmacion.exception() is not None:
+            st.error(f"⚠️ No se pudo guardar {descripcion}: {confirmacion.exception()}")
+    st.session_state["escrituras_pendientes"] = pendientes
+    if pendientes:
+        st.sidebar.caption(f"⏳ {len(pendientes)} cambio(s) sincronizándose con Google Sheets…")
 
 
 # =========================================================
-# CARGAR DATOS (con control de tiempo)
+# CARGAR DATOS (la cuota la controla el limitador compartido, data/cuota.py)
 # =========================================================
-@st.cache_data(ttl=30)
-def _leer_datos(nombre_hoja: str):
-    ws = obtener_hoja(nombre_hoja)
-    return ws.get_all_records()
+def _leer_hojas(nombres_hojas: list) -> dict:
+    """
+    Lee (en una sola request) las hojas que el cache marcó como vencidas.
+    Los errores se propagan: el cache responde con el último snapshot bueno.
+    """
+    return _almacen().leer_tablas(nombres_hojas)
 
 
-def cargar_datos_sheets(nombre_hoja: str, columnas_base: list = None) -> pd.DataFrame:
-    try:
-        ahora = datetime.now()
-        if ahora - st.session_state["ultima_lectura"] < timedelta(seconds=2):
-            time.sleep(1)
-        st.session_state["ultima_lectura"] = ahora
-
-        data = _leer_datos(nombre_hoja)
-        df = pd.DataFrame(data)
-        if df.empty and columnas_base:
-            df = pd.DataFrame(columns=columnas_base)
-        return df
-    except Exception as e:
-        st.error(f"⚠️ Error al cargar '{nombre_hoja}': {e}")
-        return pd.DataFrame(columns=columnas_base or [])
+def _lector_fondo():
+    """Lector sin st.* para revalidar en segundo plano (None si leer es local)."""
+    almacen = _almacen()
+    return almacen.leer_tablas if almacen.remoto else None
+
+
+def parchar_hoja(nombre_hoja: str, cambio, confirmacion=None):
+    """
+    Refleja una escritura en el snapshot en memoria (sin releer la hoja)
+    y programa una reconciliación en segundo plano contra el almacén.
+    Si la escritura está encolada, la reconciliación espera a su confirmación.
+    """
+    cache = obtener_cache_tablas()
+    cache.parchar(nombre_hoja, cambio)
+    lector = _lector_fondo()
+    if lector is None:
+        return
+    if confirmacion is None:
+        cache.programar_reconciliacion([nombre_hoja], lector)
+    else:
+        confirmacion.add_done_callback(
+            lambda _: cache.programar_reconciliacion([nombre_hoja], lector)
+        )
 
 
 # =========================================================
 # ACTUALIZAR HOJA (BLINDADA - SIN BORRAR)
 # =========================================================
-def actualizar_hoja(nombre_hoja: str, df: pd.DataFrame):
+def actualizar_hoja(nombre_hoja: str, df: pd.DataFrame, id_col: str = None, agregar_nuevos: bool = True) -> bool:
     """
     Actualiza sin borrar datos previos.
-    Si existe el ID, actualiza esa fila. Si no, la agrega.
-    Nunca borra toda la hoja.
+    Si existe el ID, escribe solo las celdas que cambiaron. Si no, agrega la fila
+    (o avisa, con agregar_nuevos=False). Todo viaja en un batch_update + un append_rows.
     """
     try:
-        ws = obtener_hoja(nombre_hoja, list(df.columns))
-        data_actual = ws.get_all_records()
-        df_actual = pd.DataFrame(data_actual)
-
-        # Si la hoja está vacía, crea desde cero
-        if df_actual.empty:
-            ws.update([df.columns.values.tolist()] + df.values.tolist())
-            st.toast(f"✅ Hoja '{nombre_hoja}' creada y actualizada.", icon="💾")
-            return
+        resultado = _almacen().actualizar_por_id(nombre_hoja, df, id_col, agregar_nuevos)
+    except RegistroNoEncontradoError as e:
+        st.warning(f"⚠️ {e}")
+        return False
+    except Exception as e:
+        st.error(f"⚠️ Error al actualizar '{nombre_hoja}': {e}")
+        return False
 
-        # Detectar columna de ID
-        id_col = None
-        for posible in ["ID_Jugador", "ID_Informe"]:
-            if posible in df.columns:
-                id_col = posible
-                break
-
-        # Fusión segura sin borrar
-        if id_col:
-            df_actual[id_col] = df_actual[id_col].astype(str)
-            df[id_col] = df[id_col].astype(str)
-            df_fusion = pd.concat([df_actual, df]).drop_duplicates(subset=[id_col], keep="last")
-        else:
-            df_fusion = pd.concat([df_actual, df]).drop_duplicates(keep="last")
+    if not resultado["celdas"] and not resultado["filas_nuevas"]:
+        st.toast(f"💾 '{nombre_hoja}' sin cambios.", icon="✅")
+        return True
 
-        # Subir a Sheets
-        ws.update([df_fusion.columns.values.tolist()] + df_fusion.values.tolist())
-        st.toast(f"💾 '{nombre_hoja}' actualizada correctamente (sin borrar datos).", icon="✅")
+    confirmacion = resultado["confirmacion"]
+    registrar_escritura(f"los cambios en '{nombre_hoja}'", confirmacion)
 
-    except Exception as e:
-        st.error(f"⚠️ Error al actualizar '{nombre_hoja}': {e}")
+    # El snapshot en memoria refleja el cambio sin releer la hoja
+    if resultado["id_col"]:
+        parchar_hoja(nombre_hoja, actualizar_registros(df, resultado["id_col"]), confirmacion)
+    else:
+        parchar_hoja(nombre_hoja, agregar_registros(
+            [dict(zip(resultado["encabezado"], fila)) for fila in resultado["nuevas"]]
+        ), confirmacion)
+    st.toast(
+        f"💾 '{nombre_hoja}' actualizada: {resultado['celdas']} celdas, "
+        f"{resultado['filas_nuevas']} filas nuevas.",
+        icon="✅"
+    )
+    return True
 
 
 # =========================================================
 # ELIMINAR FILA SEGURA (CONTROLADO)
 # =========================================================
+def eliminar_filas_por_filtro(nombre_hoja: str, filtro: dict, solo_primera: bool = False) -> int:
+    """
+    Borra las filas cuyo contenido coincide con `filtro` ({columna: valor}).
+    En Sheets verifica la fila física contra la hoja y la borra con
+    deleteDimension (nunca clear + reescritura).
+    """
+    try:
+        borradas = _almacen().eliminar_por_filtro(nombre_hoja, filtro, solo_primera)
+    except Exception:
+        # La hoja ya había cambiado: se relee
+        invalidar_hoja(nombre_hoja)
+        raise
+
+    if borradas:
+        parchar_hoja(nombre_hoja, eliminar_registros(filtro, solo_primera))
+    return borradas
+
+
 def eliminar_por_id(nombre_hoja: str, id_col: str, id_valor):
     """
     Elimina una fila específica por ID, sin tocar el resto.
     """
     try:
-        ws = obtener_hoja(nombre_hoja)
-        data_actual = ws.get_all_records()
-        df = pd.DataFrame(data_actual)
-        if id_col not in df.columns:
-            st.error(f"⚠️ La hoja '{nombre_hoja}' no tiene la columna '{id_col}'.")
-            return
-        df = df[df[id_col].astype(str) != str(id_valor)]
-        ws.update([df.columns.values.tolist()] + df.values.tolist())
-        st.success(f"🗑️ Registro con {id_col}={id_valor} eliminado correctamente.")
+        borradas = eliminar_filas_por_filtro(nombre_hoja, {id_col: id_valor})
+        if borradas:
+            st.success(f"🗑️ Registro con {id_col}={id_valor} eliminado correctamente.")
+        else:
+            st.warning(f"⚠️ No se encontró {id_col}={id_valor} en '{nombre_hoja}'.")
+    except KeyError as e:
+        st.error(f"⚠️ {e.args[0]}")
+    except FilaDesplazadaError as e:
+        st.warning(f"⚠️ {e}")
     except Exception as e:
         st.error(f"⚠️ Error al eliminar en '{nombre_hoja}': {e}")
 
@@ -221,15 +257,20 @@ def eliminar_por_id(nombre_hoja: str, id_col: str, id_valor):
 # =========================================================
 # AGREGAR FILA NUEVA (SEGURA)
 # =========================================================
-def agregar_fila(nombre_hoja: str, fila: list):
-    """Agrega una nueva fila sin tocar el resto."""
-    try:
-        ws = obtener_hoja(nombre_hoja)
-        ws.append_row(fila, value_input_option="USER_ENTERED")
-        st.toast(f"🟢 Nueva fila agregada en '{nombre_hoja}'.", icon="🟢")
-        st.cache_data.clear()
-    except Exception as e:
-        st.error(f"⚠️ Error al agregar fila en '{nombre_hoja}': {e}")
+def agregar_fila(nombre_hoja: str, fila: list, descripcion: str,
+                 value_input_option: str = "USER_ENTERED", confirmar=None):
+    """
+    Agrega una nueva fila sin tocar el resto. En Sheets la fila se encola
+    (se escribe junto con las demás en un append_rows); devuelve la confirmación.
+    `confirmar` envuelve la confirmación de la escritura (p. ej. la verificación
+    del ID del asignador). Los avisos y errores los maneja quien llama.
+    """
+    confirmacion = _almacen().agregar_filas(nombre_hoja, [fila], value_input_option)
+    if confirmar is not None:
+        confirmacion = confirmar(confirmacion)
+    registrar_escritura(descripcion, confirmacion)
+    parchar_hoja(nombre_hoja, agregar_registros([fila]), confirmacion)
+    return confirmacion
 
 
 # =========================================================
@@ -238,7 +279,7 @@ def agregar_fila(nombre_hoja: str, fila: list):
 def boton_refrescar_datos():
     st.markdown("---")
     if st.button("🔄 Actualizar datos (refrescar desde Google Sheets)"):
-        st.cache_data.clear()
+        obtener_versiones().invalidar_todo()
         st.rerun()
 
 # =========================================================
@@ -643,219 +684,135 @@ def calcular_edad(fecha_nac):
         return "?"
 
 
-def generar_id_unico(df, columna="ID_Jugador"):
-    if columna not in df.columns or df.empty:
-        return 1
-    ids = df[columna].dropna().astype(str)
-    nums = [int(i) for i in ids if i.isdigit()]
-    return max(nums) + 1 if nums else 1
-
-
 # ---------------------------------------------------------
 # FUNCIONES DE PROMEDIOS (OBLIGATORIAS PARA BLOQUE 3)
 # ---------------------------------------------------------
 
-def calcular_promedios_jugador(df_reports, id_jugador):
-    if df_reports.empty:
-        return None
-
-    df = df_reports.copy()
-    df["ID_Jugador"] = df["ID_Jugador"].astype(str)
-    informes = df[df["ID_Jugador"] == str(id_jugador)]
-
-    if informes.empty:
-        return None
-
-    metricas = [
-        "Controles","Perfiles","Pase_corto","Pase_largo","Pase_filtrado",
-        "1v1_defensivo","Recuperacion","Intercepciones","Duelos_aereos",
-        "Regate","Velocidad","Duelos_ofensivos",
-        "Resiliencia","Liderazgo","Inteligencia_tactica",
-        "Inteligencia_emocional","Posicionamiento",
-        "Vision_de_juego","Movimientos_sin_pelota"
-    ]
-
-    promedios = {}
-    for m in metricas:
-        if m in informes.columns:
-            try:
-                valores = (
-                    informes[m]
-                    .astype(str)
-                    .str.replace(",", ".", regex=False)
-                    .replace(["", "nan", "None", "-", "—"], 0)
-                    .astype(float)
-                )
-                promedios[m] = round(valores.mean(), 2)
-            except Exception:
-                promedios[m] = 0.0
-        else:
-            promedios[m] = 0.0
-
-    return promedios
-
-
-def calcular_promedios_posicion(df_reports, df_players, posicion):
-    if not posicion or df_reports.empty or df_players.empty:
-        return None
-
-    df_r = df_reports.copy()
-    df_p = df_players.copy()
-
-    df_r["ID_Jugador"] = df_r["ID_Jugador"].astype(str)
-    df_p["ID_Jugador"] = df_p["ID_Jugador"].astype(str)
-
-    ids = df_p[df_p["Posición"] == posicion]["ID_Jugador"].tolist()
-    informes = df_r[df_r["ID_Jugador"].isin(ids)]
-
-    if informes.empty:
-        return None
-
-    metricas = [
-        "Controles","Perfiles","Pase_corto","Pase_largo","Pase_filtrado",
-        "1v1_defensivo","Recuperacion","Intercepciones","Duelos_aereos",
-        "Regate","Velocidad","Duelos_ofensivos",
-        "Resiliencia","Liderazgo","Inteligencia_tactica",
-        "Inteligencia_emocional","Posicionamiento",
-        "Vision_de_juego","Movimientos_sin_pelota"
-    ]
-
-    promedios = {}
-    for m in metricas:
-        if m in informes.columns:
-            try:
-                valores = (
-                    informes[m]
-                    .astype(str)
-                    .str.replace(",", ".", regex=False)
-                    .replace(["", "nan", "None", "-", "—"], 0)
-                    .astype(float)
-                )
-                promedios[m] = round(valores.mean(), 2)
-            except Exception:
-                promedios[m] = 0.0
-        else:
-            promedios[m] = 0.0
-
-    return promedios
+# Por jugador: matriz de agregados (data/agregados.py)
+# Por posición: referencias por posición (data/referencias.py)
 
 
 # ---------------------------------------------------------
 # RADAR
 # ---------------------------------------------------------
 
-def radar_chart(prom_jugador, prom_posicion):
+def radar_chart(prom_jugador, prom_posicion, clave):
+    """
+    Radar jugador vs. referencia. `clave` = (jugador, referencia, versión):
+    la imagen se dibuja una vez y se reusa (data/radar.py).
+    """
     if not prom_jugador:
         return
 
-    categorias = list(prom_jugador.keys())
-    valores_j = [float(prom_jugador.get(c, 0)) for c in categorias]
-    valores_p = [float(prom_posicion.get(c, 0)) for c in categorias] if prom_posicion else [0]*len(categorias)
-
-    valores_j += valores_j[:1]
-    valores_p += valores_p[:1]
-
-    angles = np.linspace(0, 2*np.pi, len(categorias), endpoint=False).tolist()
-    angles += angles[:1]
-
-    fig, ax = plt.subplots(figsize=(6, 6), subplot_kw=dict(polar=True))
-    fig.patch.set_facecolor("#0e1117")
-    ax.set_facecolor("#0e1117")
-
-    ax.plot(angles, valores_j, color="cyan", linewidth=2)
-    ax.fill(angles, valores_j, color="cyan", alpha=0.25)
-
-    ax.plot(angles, valores_p, color="orange", linewidth=2)
-    ax.fill(angles, valores_p, color="orange", alpha=0.25)
-
-    ax.set_xticks(angles[:-1])
-    ax.set_xticklabels(categorias, color="white", fontsize=9)
-    ax.tick_params(colors="white")
-
-    st.pyplot(fig)
+    st.image(obtener_radares().imagen(clave, prom_jugador, prom_posicion))
 
 
 # ---------------------------------------------------------
 # CARGA DE DATOS
 # ---------------------------------------------------------
 
-@st.cache_data(ttl=120)
-def cargar_datos():
-
-    columnas_jug = ["ID_Jugador","Nombre","Fecha_Nac","Nacionalidad","Segunda_Nacionalidad",
-                    "Altura","Pie_Hábil","Posición","Caracteristica","Club","Liga",
-                    "Sexo","URL_Foto","URL_Perfil","Instagram","Fecha_Fin_Contrato"]
+HOJAS_APP = ["Jugadores", "Informes", "Lista corta", "Agenda"]
 
-    columnas_inf = ["ID_Informe","ID_Jugador","Scout","Fecha_Partido","Fecha_Informe",
-                    "Equipos_Resultados","Formación","Observaciones","Línea",
-                    "Controles","Perfiles","Pase_corto","Pase_largo","Pase_filtrado",
-                    "1v1_defensivo","Recuperacion","Intercepciones","Duelos_aereos",
-                    "Regate","Velocidad","Duelos_ofensivos",
-                    "Resiliencia","Liderazgo","Inteligencia_tactica",
-                    "Inteligencia_emocional","Posicionamiento",
-                    "Vision_de_juego","Movimientos_sin_pelota"]
 
-    columnas_short = ["ID_Jugador","Nombre","Edad","Altura","Club","Posición",
-                      "URL_Foto","URL_Perfil","Agregado_Por","Fecha_Agregado"]
-
-    df_players = cargar_datos_sheets("Jugadores", columnas_jug)
-    df_reports = cargar_datos_sheets("Informes", columnas_inf)
-    df_short   = cargar_datos_sheets("Lista corta", columnas_short)
-
-    # Normalización de IDs
-    for df in (df_players, df_reports, df_short):
-        if not df.empty and "ID_Jugador" in df.columns:
-            df["ID_Jugador"] = df["ID_Jugador"].astype(str)
-
-    return df_players, df_reports, df_short
+def cargar_datos():
+    # Solo se releen las hojas invalidadas, todas en una sola request
+    # ("Informes" además baja solo las filas nuevas). Las vencidas por TTL
+    # o recién arrancadas (espejo SQLite) se sirven ya y se revalidan de fondo
+    tablas = obtener_cache_tablas().tablas(
+        HOJAS_APP, _leer_hojas, _lector_fondo(), _almacen().leer_respaldo
+    )
+    # Fechas, métricas e IDs se parsean una vez por versión (data/esquema.py)
+    tipadas = obtener_tablas_tipadas()
+    tablas = {
+        nombre: tipadas.tipada(nombre, df, versiones_de(nombre))
+        for nombre, df in tablas.items()
+    }
+    return (
+        tablas["Jugadores"],
+        tablas["Informes"],
+        tablas["Lista corta"],
+        tablas["Agenda"],
+    )
 
 # ---------------------------------------------------------
 # INICIALIZACIÓN
 # ---------------------------------------------------------
 
-# 1️⃣ Carga base desde Sheets (SIN filtros)
-df_players, df_reports, df_short = cargar_datos()
+# 1️⃣ Carga base desde Sheets (SIN filtros) — una sola request
+# Las versiones se toman antes de leer: nunca son más nuevas que los datos
+versiones_leidas = {nombre: versiones_de(nombre) for nombre in HOJAS_APP}
+# Sin reescrituras de "Informes" (solo filas agregadas), lo derivado se extiende
+linaje_informes = linaje_de("Informes")
+try:
+    df_players, df_reports, df_short, df_agenda_all = cargar_datos()
+except Exception as e:
+    st.error(f"⚠️ Error al cargar datos desde Google Sheets: {e}")
+    st.stop()
+
+# Google Sheets caído: se trabaja con el último snapshot, sin escrituras
+circuito = obtener_circuito()
+if circuito.abierto:
+    leido_en = obtener_cache_tablas().leido_en(HOJAS_APP)
+    antiguedad = (
+        f"de hace {int((time.time() - leido_en) // 60)} min"
+        if leido_en is not None else "de antigüedad desconocida"
+    )
+    st.warning(
+        f"🔒 Google Sheets no responde: modo solo lectura con datos {antiguedad}. "
+        "Se reintenta la conexión en segundo plano."
+    )
+
+# Avisa si alguna escritura encolada de esta sesión falló
+mostrar_escrituras_pendientes()
 
-# 2️⃣ Guardar como fuente única en session_state
-st.session_state["df_players"] = df_players.copy()
-st.session_state["df_reports"] = df_reports.copy()
-st.session_state["df_short"]   = df_short.copy()
+# Instrumentación del Google Sheets simulado (SCOUTING_ALMACEN=simulado)
+if ALMACEN_POR_DEFECTO == "simulado":
+    resumen_api = _almacen().estadisticas.resumen()
+    st.sidebar.caption(
+        f"🧪 API simulada: {resumen_api['total_llamadas']} llamadas · "
+        f"{resumen_api['bytes_recibidos'] // 1024} KB recibidos · "
+        f"{resumen_api['errores_429']} respuestas 429"
+    )
 
 # =========================================================
 # 🔐 FILTRADO GLOBAL DE DATOS POR USUARIO (ÚNICO)
 # =========================================================
 
-# Fuente completa (ALL)
-df_players_all = st.session_state["df_players"].copy()
-df_reports_all = st.session_state["df_reports"].copy()
-df_short_all   = st.session_state["df_short"].copy()
-
-if CURRENT_ROLE != "admin":
-    # Informes: solo los del scout
-    df_reports_user = df_reports_all[
-        df_reports_all["Scout"] == CURRENT_USER
-    ].copy()
-
-    # Lista corta: solo lo agregado por el scout
-    df_short_user = df_short_all[
-        df_short_all["Agregado_Por"] == CURRENT_USER
-    ].copy()
-
-    # Jugadores relacionados (informes + lista corta)
-    ids = (
-        set(df_reports_user["ID_Jugador"].astype(str)) |
-        set(df_short_user["ID_Jugador"].astype(str))
-    )
+# 2️⃣ Fuente completa (ALL): los frames compartidos del proceso, sin copiar.
+# Solo lectura: cada sección trabaja sobre df.copy(deep=False) (copy-on-write)
+df_players_all = df_players
+df_reports_all = df_reports
+df_short_all   = df_short
+
+# Vistas por usuario cacheadas en el proceso por (usuario, rol, versiones):
+# el scout ve sus informes, su lista corta y los jugadores relacionados
+df_players_user, df_reports_user, df_short_user = obtener_vistas_usuario().vistas(
+    CURRENT_USER, CURRENT_ROLE, versiones_leidas, df_players_all, df_reports_all, df_short_all
+)
 
-    df_players_user = df_players_all[
-        df_players_all["ID_Jugador"].astype(str).isin(ids)
-    ].copy()
+# Búsquedas O(1): todos los jugadores + informes visibles para el usuario
+indice = obtener_indices().obtener(
+    (versiones_leidas["Jugadores"], versiones_leidas["Informes"], None if CURRENT_ROLE == "admin" else CURRENT_USER),
+    df_players_all,
+    df_reports_user,
+)
 
-else:
-    # Admin ve todo
-    df_reports_user = df_reports_all.copy()
-    df_short_user   = df_short_all.copy()
-    df_players_user = df_players_all.copy()
+# Informes ⟕ jugadores unidos una vez por versión; cada sección proyecta
+ALCANCE_SCOUT = None if CURRENT_ROLE == "admin" else CURRENT_USER
+vista = obtener_vistas().obtener(
+    (versiones_leidas["Jugadores"], versiones_leidas["Informes"], linaje_informes), df_reports_all, df_players_all
+)
+
+# Media / desvío / último valor por jugador: un groupby por versión y alcance
+agregados = obtener_agregados().obtener(
+    (versiones_leidas["Informes"], ALCANCE_SCOUT), df_reports_user
+)
+
+# Datos que ve el usuario (clave de los percentiles y de los radares cacheados)
+VERSION_USUARIO = (versiones_leidas["Jugadores"], versiones_leidas["Informes"], ALCANCE_SCOUT, linaje_informes)
+
+# Percentil de cada métrica dentro de la posición (y posición + liga)
+percentiles = obtener_percentiles().obtener(VERSION_USUARIO, agregados, df_players_all)
 
 # -----------------------------
 # Menú principal
@@ -885,8 +842,8 @@ if menu == "Jugadores":
     # ---------------------------------------------------------
     # DATASETS
     # ---------------------------------------------------------
-    df_players = df_players_all.copy()      # 🔓 todos los jugadores
-    df_reports = df_reports_user.copy()     # 🔐 solo informes del scout
+    df_players = df_players_all.copy(deep=False)      # 🔓 todos los jugadores
+    df_reports = df_reports_user.copy(deep=False)     # 🔐 solo informes del scout
 
     # ---------------------------------------------------------
     # OPCIONES PREDEFINIDAS
@@ -937,10 +894,7 @@ if menu == "Jugadores":
     # ---------------------------------------------------------
     # BUSCADOR DE JUGADORES
     # ---------------------------------------------------------
-    opciones = {
-        f"{row['Nombre']} - {row['Club']}": row["ID_Jugador"]
-        for _, row in df_players.iterrows()
-    }
+    opciones = indice.etiquetas
 
     seleccion_jug = st.selectbox(
         "🔍 Buscar jugador",
@@ -979,19 +933,10 @@ if menu == "Jugadores":
 
                 if guardar and nuevo_nombre:
                     try:
-                        # 🔒 GENERAR ID DESDE LA HOJA REAL (NO CACHE)
-                        ws = obtener_hoja("Jugadores")
-                        data_sheet = ws.get_all_records()
-                        df_sheet = pd.DataFrame(data_sheet)
-
-                        if not df_sheet.empty and "ID_Jugador" in df_sheet.columns:
-                            max_id = pd.to_numeric(
-                                df_sheet["ID_Jugador"],
-                                errors="coerce"
-                            ).max()
-                            nuevo_id = int(max_id) + 1 if pd.notna(max_id) else 1
-                        else:
-                            nuevo_id = 1
+                        almacen = _almacen()
+                        asignador = obtener_asignador(almacen)
+                        # 🔒 ID del asignador del proceso (sin leer la hoja entera)
+                        nuevo_id = asignador.reservar("Jugadores")
 
                         car_str = ", ".join(nueva_caracteristica)
 
@@ -1014,11 +959,25 @@ if menu == "Jugadores":
                             nueva_fecha_fin_contrato
                         ]
 
-                        ws.append_row(fila, value_input_option="USER_ENTERED")
-
-                        st.cache_data.clear()
-                        st.experimental_rerun()
-
+                        confirmacion = asignador.confirmar(
+                            "Jugadores", fila, almacen.agregar_filas("Jugadores", [fila])
+                        )
+                        almacen.vaciar("Jugadores")
+
+                        # Si chocó con otra instancia, la fila quedó con un ID nuevo
+                        fila[0] = confirmacion.result(timeout=ESPERA_CONFIRMACION_SEG)
+                        parchar_hoja("Jugadores", agregar_registros([fila]), confirmacion)
+                        st.rerun()
+
+                    except TimeoutError:
+                        # Sigue en curso: se muestra con el ID reservado y se avisa si al final falla
+                        registrar_escritura(f"el jugador {nuevo_nombre}", confirmacion)
+                        parchar_hoja("Jugadores", agregar_registros([fila]), confirmacion)
+                        st.warning("⏳ Google Sheets todavía no confirmó el alta; el ID del jugador puede cambiar al sincronizar.")
+                    except IDDuplicadoError as e:
+                        # La fila ya está en la hoja: se relee para mostrarla tal cual quedó
+                        invalidar_hoja("Jugadores")
+                        st.error(f"⚠️ {e}. Revisá la hoja antes de volver a guardar.")
                     except Exception as e:
                         st.error(f"Error al guardar jugador: {e}")
 
@@ -1028,7 +987,7 @@ if menu == "Jugadores":
     if seleccion_jug:
 
         id_jugador = opciones[seleccion_jug]
-        jugador = df_players[df_players["ID_Jugador"] == id_jugador].iloc[0]
+        jugador = indice.jugador(id_jugador)
 
         col1, col2, col3 = st.columns([1.2, 1.2, 1.6])
 
@@ -1062,9 +1021,7 @@ if menu == "Jugadores":
             if CURRENT_ROLE in ["admin", "scout"]:
                 if st.button("⭐ Agregar a lista corta"):
                     try:
-                        ws_short = obtener_hoja("Lista corta")
-                        data_short = ws_short.get_all_records()
-                        df_short_local = pd.DataFrame(data_short)
+                        df_short_local = _almacen().leer_tabla("Lista corta")
 
                         from datetime import date
                         hoy = date.today()
@@ -1072,11 +1029,7 @@ if menu == "Jugadores":
                         SEMESTRE_ACTUAL = 1 if hoy.month <= 6 else 2
 
                         if not df_short_local.empty:
-                            df_short_local["Fecha_Agregado_dt"] = pd.to_datetime(
-                                df_short_local["Fecha_Agregado"],
-                                format="%d/%m/%Y",
-                                errors="coerce"
-                            )
+                            df_short_local = tipar("Lista corta", df_short_local)
 
                             df_short_local["Año"] = df_short_local["Fecha_Agregado_dt"].dt.year
                             df_short_local["Semestre"] = df_short_local["Fecha_Agregado_dt"].dt.month.apply(
@@ -1084,7 +1037,7 @@ if menu == "Jugadores":
                             )
 
                             existe = df_short_local[
-                                (df_short_local["ID_Jugador"].astype(str) == str(jugador["ID_Jugador"])) &
+                                (df_short_local["ID_Jugador"] == str(jugador["ID_Jugador"])) &
                                 (df_short_local["Agregado_Por"] == CURRENT_USER) &
                                 (df_short_local["Año"] == ANIO_ACTUAL) &
                                 (df_short_local["Semestre"] == SEMESTRE_ACTUAL)
@@ -1108,14 +1061,113 @@ if menu == "Jugadores":
                                 hoy.strftime("%d/%m/%Y")
                             ]
 
-                            ws_short.append_row(nueva_fila, value_input_option="USER_ENTERED")
+                            agregar_fila("Lista corta", nueva_fila, "el jugador en la lista corta")
                             st.toast("⭐ Jugador agregado a Lista Corta", icon="⭐")
-                            st.cache_data.clear()
 
                     except Exception as e:
                         st.error(f"Error al agregar a lista corta: {e}")
 
+        # 📊 PERCENTILES Y PROMEDIOS (matriz de agregados, sin recorrer los informes)
+        with col2:
+            st.markdown("#### 📊 Percentiles")
+            tabla_prom, n_informes = agregados.jugador(id_jugador)
+            if tabla_prom is None:
+                st.info("Sin informes cargados.")
+            else:
+                pct_pos = percentiles.jugador(id_jugador)
+                pct_liga = percentiles.jugador(id_jugador, por_liga=True)
+                if pd.notna(pct_pos["Score"]):
+                    st.metric(
+                        f"Percentil entre {jugador.get('Posición', '-')}",
+                        f"P{int(round(pct_pos['Score']))}",
+                        help="Promedio de todas las métricas, comparado con los demás jugadores evaluados en su posición."
+                    )
+                st.caption(f"{n_informes} informe(s)")
+                tabla_prom.insert(0, "Pctl. posición", pct_pos[METRICAS].to_numpy())
+                tabla_prom.insert(1, "Pctl. liga", pct_liga[METRICAS].to_numpy())
+                st.dataframe(
+                    tabla_prom.round({"Pctl. posición": 0, "Pctl. liga": 0, "Media": 2, "Desvío": 2, "Último": 2}),
+                    use_container_width=True
+                )
+
+        # 🕸️ RADAR: jugador vs. referencia de su posición (calculada una vez por versión)
+        with col3:
+            referencias = obtener_referencias().obtener(VERSION_USUARIO, vista, ALCANCE_SCOUT)
+            comparar_con = st.radio(
+                "Comparar con",
+                ["Posición", "Posición + liga", "Posición + edad"],
+                horizontal=True,
+                key=f"referencia_{id_jugador}"
+            )
+            liga_ref = jugador.get("Liga") if comparar_con == "Posición + liga" else None
+            franja_ref = (
+                franja_edad(pd.Series([jugador.get("Fecha_Nac_dt")], dtype="datetime64[ns]")).iloc[0]
+                if comparar_con == "Posición + edad" else None
+            )
+            if comparar_con != "Posición" and pd.isna(liga_ref if liga_ref is not None else franja_ref):
+                st.caption("Sin dato de liga / edad: se compara con la posición.")
+                liga_ref = franja_ref = None
+
+            _, n_ref = referencias.referencia(jugador.get("Posición"), liga_ref, franja_ref)
+            radar_chart(
+                agregados.promedios(id_jugador),
+                referencias.promedios(jugador.get("Posición"), liga_ref, franja_ref),
+                (id_jugador, (jugador.get("Posición"), liga_ref, franja_ref), VERSION_USUARIO)
+            )
+            if n_ref:
+                st.caption(f"🟠 Referencia: {n_ref} informe(s) · 🔵 {jugador['Nombre']}")
+
             
+        # ---------------------------------------------------------
+        # 🧬 JUGADORES SIMILARES (k-NN sobre el perfil de métricas)
+        # ---------------------------------------------------------
+        with st.expander("🧬 Buscar jugadores similares", expanded=False):
+            if id_jugador not in agregados:
+                st.info("El jugador no tiene informes: no hay perfil para comparar.")
+            else:
+                c_k, c_dist, c_filtros = st.columns([1, 1, 2])
+                with c_k:
+                    k_similares = st.slider("Cantidad", 5, 25, 10, key=f"knn_k_{id_jugador}")
+                with c_dist:
+                    distancia = st.radio(
+                        "Distancia", DISTANCIAS,
+                        format_func=lambda d: "Coseno" if d == "coseno" else "Euclídea",
+                        key=f"knn_dist_{id_jugador}"
+                    )
+                with c_filtros:
+                    misma_posicion = st.checkbox("Misma posición", value=True, key=f"knn_pos_{id_jugador}")
+                    misma_liga = st.checkbox("Misma liga", key=f"knn_liga_{id_jugador}")
+                    filtrar_edad = st.checkbox("Acotar edad", key=f"knn_edad_{id_jugador}")
+                    rango_edad = st.slider(
+                        "Edad", 15, 45, (18, 30), key=f"knn_rango_{id_jugador}", disabled=not filtrar_edad
+                    )
+
+                # Índice armado una vez por versión de datos; la búsqueda tarda milisegundos
+                df_sim = obtener_similares().obtener(VERSION_USUARIO, agregados, df_players_all).similares(
+                    id_jugador,
+                    k=k_similares,
+                    distancia=distancia,
+                    misma_posicion=misma_posicion,
+                    misma_liga=misma_liga,
+                    edad=rango_edad if filtrar_edad else None,
+                )
+
+                if df_sim.empty:
+                    st.info("Ningún jugador evaluado cumple los filtros.")
+                else:
+                    filas_sim = []
+                    for r in df_sim.itertuples():
+                        j_sim = indice.jugador(r.ID_Jugador)
+                        filas_sim.append({
+                            "Nombre": j_sim["Nombre"] if j_sim is not None else r.ID_Jugador,
+                            "Club": j_sim.get("Club", "") if j_sim is not None else "",
+                            "Posición": j_sim.get("Posición", "") if j_sim is not None else "",
+                            "Liga": j_sim.get("Liga", "") if j_sim is not None else "",
+                            "Edad": r.Edad,
+                            "Distancia": round(float(r.Distancia), 3),
+                        })
+                    st.dataframe(pd.DataFrame(filas_sim), use_container_width=True, hide_index=True)
+
         # ---------------------------------------------------------
         # EDITAR DATOS DEL JUGADOR
         # ---------------------------------------------------------
@@ -1181,48 +1233,29 @@ if menu == "Jugadores":
                 guardar_ed = st.form_submit_button("💾 Guardar cambios")
 
                 if guardar_ed:
-                    try:
-                        ws = obtener_hoja("Jugadores")
-                        data = ws.get_all_records()
-                        df_actual = pd.DataFrame(data)
-
-                        index_row = df_actual.index[
-                            df_actual["ID_Jugador"].astype(str) == str(id_jugador)
-                        ]
-
-                        if not index_row.empty:
-                            row_number = index_row[0] + 2
-                            e_car_str = ", ".join(e_car) if e_car else ""
-
-                            valores = [
-                                id_jugador,
-                                e_nombre,
-                                e_fecha,
-                                e_nac,
-                                e_seg,
-                                e_altura,
-                                e_pie,
-                                e_pos,
-                                e_car_str,
-                                e_club,
-                                e_liga,
-                                "",
-                                e_foto,
-                                e_link,
-                                e_instagram,
-                                e_fin_contrato
-                            ]
-
-                            ws.update(f"A{row_number}:P{row_number}", [valores])
-
-                            st.cache_data.clear()
-                            st.toast("✅ Datos actualizados correctamente.", icon="✅")
-                            st.experimental_rerun()
-                        else:
-                            st.warning("⚠️ No se encontró el jugador en la hoja.")
-
-                    except Exception as e:
-                        st.error(f"⚠️ Error al guardar: {e}")
+                    e_car_str = ", ".join(e_car) if e_car else ""
+
+                    # Solo viajan las celdas que cambiaron (Sexo no se edita acá)
+                    cambios = pd.DataFrame([{
+                        "ID_Jugador": id_jugador,
+                        "Nombre": e_nombre,
+                        "Fecha_Nac": e_fecha,
+                        "Nacionalidad": e_nac,
+                        "Segunda_Nacionalidad": e_seg,
+                        "Altura": e_altura,
+                        "Pie_Hábil": e_pie,
+                        "Posición": e_pos,
+                        "Caracteristica": e_car_str,
+                        "Club": e_club,
+                        "Liga": e_liga,
+                        "URL_Foto": e_foto,
+                        "URL_Perfil": e_link,
+                        "Instagram": e_instagram,
+                        "Fecha_Fin_Contrato": e_fin_contrato,
+                    }])
+
+                    if actualizar_hoja("Jugadores", cambios, "ID_Jugador", agregar_nuevos=False):
+                        st.rerun()
 
 
         # ---------------------------------------------------------
@@ -1327,8 +1360,9 @@ if menu == "Jugadores":
                             except Exception:
                                 return 0.0
 
+                        asignador = obtener_asignador(_almacen())
                         nuevo = [
-                            generar_id_unico(df_reports_all, "ID_Informe"),
+                            asignador.reservar("Informes"),
                             jugador["ID_Jugador"],
                             CURRENT_USER,
                             fecha_partido.strftime("%d/%m/%Y"),
@@ -1358,17 +1392,16 @@ if menu == "Jugadores":
                             to_float_safe(movimientos)
                         ]
 
-                        ws_inf = obtener_hoja("Informes")
-                        ws_inf.append_row(nuevo, value_input_option="USER_ENTERED")
-
-                        st.cache_data.clear()
-                        df_reports = df_reports_usercargar_datos_sheets("Informes")
+                        agregar_fila(
+                            "Informes", nuevo, f"el informe de {jugador['Nombre']}",
+                            confirmar=lambda c: asignador.confirmar("Informes", nuevo, c)
+                        )
 
                         st.toast(
                             f"✅ Informe guardado correctamente para {jugador['Nombre']}",
                             icon="✅"
                         )
-                        st.experimental_rerun()
+                        st.rerun()
 
                     except Exception as e:
                         st.error(f"⚠️ Error al guardar el informe: {e}")
@@ -1449,14 +1482,6 @@ if menu == "Ver informes":
     # ---------------------------------------------------------
     # HELPERS
     # ---------------------------------------------------------
-    def _safe_str_series(sr):
-        return (
-            sr.fillna("")
-            .astype(str)
-            .str.strip()
-            .str.replace(".0", "", regex=False)
-        )
-
     def _safe_text(val, default="-"):
         if pd.isna(val):
             return default
@@ -1466,32 +1491,16 @@ if menu == "Ver informes":
     def _safe_options(df, col):
         if col not in df.columns:
             return []
-        vals = df[col].dropna().astype(str).str.strip()
-        vals = vals[vals != ""]
-        return sorted(vals.unique().tolist())
+        return opciones_categoria(df[col])
 
     def _safe_http(val):
         return pd.notna(val) and str(val).strip().startswith("http")
 
-    def _excel_col_letter(n):
-        result = ""
-        while n > 0:
-            n, remainder = divmod(n - 1, 26)
-            result = chr(65 + remainder) + result
-        return result
-
-    def _safe_date(series):
-        return pd.to_datetime(series.astype(str).str.strip(), format="%d/%m/%Y", errors="coerce")
-
     # ---------------------------------------------------------
     # DATASETS SEGÚN ROL
     # ---------------------------------------------------------
-    df_players = df_players_all.copy()
-
-    if CURRENT_ROLE == "admin":
-        df_reports = df_reports_all.copy()
-    else:
-        df_reports = df_reports_user.copy()
+    df_players = df_players_all.copy(deep=False)
+    df_reports = df_reports_user.copy(deep=False)
 
     # ---------------------------------------------------------
     # VALIDACIONES
@@ -1526,24 +1535,9 @@ if menu == "Ver informes":
         st.stop()
 
     # ---------------------------------------------------------
-    # NORMALIZACIÓN + MERGE
+    # VISTA INFORMES × JUGADORES (ya unida por versión)
     # ---------------------------------------------------------
-    try:
-        df_reports["ID_Jugador"] = _safe_str_series(df_reports["ID_Jugador"])
-        df_reports["ID_Informe"] = _safe_str_series(df_reports["ID_Informe"])
-        df_players["ID_Jugador"] = _safe_str_series(df_players["ID_Jugador"])
-
-        df_players = df_players.drop_duplicates(subset=["ID_Jugador"], keep="first").copy()
-
-        df_merged = df_reports.merge(
-            df_players,
-            on="ID_Jugador",
-            how="left",
-            suffixes=("", "_jug")
-        )
-    except Exception as e:
-        st.error(f"❌ Error al unir datos: {e}")
-        st.stop()
+    df_merged = vista.proyectar(scout=ALCANCE_SCOUT)
 
     if df_merged.empty:
         st.warning("No se pudieron unir informes con jugadores.")
@@ -1582,17 +1576,17 @@ if menu == "Ver informes":
     df_filtrado = df_merged.copy()
 
     if filtro_scout:
-        df_filtrado = df_filtrado[df_filtrado["Scout"].astype(str).isin(filtro_scout)]
+        df_filtrado = df_filtrado[df_filtrado["Scout"].isin(filtro_scout)]
     if filtro_jugador:
         df_filtrado = df_filtrado[df_filtrado["Nombre"].astype(str).isin(filtro_jugador)]
     if filtro_club:
-        df_filtrado = df_filtrado[df_filtrado["Club"].astype(str).isin(filtro_club)]
+        df_filtrado = df_filtrado[df_filtrado["Club"].isin(filtro_club)]
     if filtro_pos:
-        df_filtrado = df_filtrado[df_filtrado["Posición"].astype(str).isin(filtro_pos)]
+        df_filtrado = df_filtrado[df_filtrado["Posición"].isin(filtro_pos)]
     if filtro_linea:
-        df_filtrado = df_filtrado[df_filtrado["Línea"].astype(str).isin(filtro_linea)]
+        df_filtrado = df_filtrado[df_filtrado["Línea"].isin(filtro_linea)]
     if filtro_nac:
-        df_filtrado = df_filtrado[df_filtrado["Nacionalidad"].astype(str).isin(filtro_nac)]
+        df_filtrado = df_filtrado[df_filtrado["Nacionalidad"].isin(filtro_nac)]
 
     if df_filtrado.empty:
         st.warning("No hay informes que coincidan con los filtros seleccionados.")
@@ -1626,10 +1620,8 @@ if menu == "Ver informes":
     columnas_base = [c for c in columnas_base if c in df_filtrado.columns]
     df_tabla = df_filtrado[columnas_base].copy()
 
-    df_tabla["Fecha_dt"] = _safe_date(df_tabla["Fecha_Informe"])
-    if "Fecha_Partido" in df_tabla.columns:
-        mask = df_tabla["Fecha_dt"].isna()
-        df_tabla.loc[mask, "Fecha_dt"] = _safe_date(df_tabla.loc[mask, "Fecha_Partido"])
+    # Fechas ya parseadas en la carga; sin fecha de informe, la del partido
+    df_tabla["Fecha_dt"] = df_filtrado["Fecha_Informe_dt"].fillna(df_filtrado["Fecha_Partido_dt"])
 
     df_tabla = df_tabla.sort_values(
         ["Fecha_dt", "ID_Informe"],
@@ -1639,7 +1631,7 @@ if menu == "Ver informes":
 
     for col in ["Fecha_Informe", "Nombre", "Club", "Posición", "Línea", "Scout", "Equipos_Resultados", "Observaciones"]:
         if col in df_tabla.columns:
-            df_tabla[col] = df_tabla[col].apply(_safe_text)
+            df_tabla[col] = df_tabla[col].astype(object).apply(_safe_text)
 
     df_show = df_tabla[[
         c for c in [
@@ -1686,7 +1678,7 @@ if menu == "Ver informes":
 
     id_informe_sel = st.session_state.get("id_informe_sel_ver_informes", "")
 
-    informe_sel_df = df_tabla[df_tabla["ID_Informe"].astype(str) == str(id_informe_sel)].copy()
+    informe_sel_df = df_tabla[df_tabla["ID_Informe"] == str(id_informe_sel)].copy()
 
     if informe_sel_df.empty and not df_tabla.empty:
         informe_sel_df = df_tabla.iloc[[0]].copy()
@@ -1727,10 +1719,9 @@ if menu == "Ver informes":
     # ---------------------------------------------------------
     # FICHA DEL JUGADOR
     # ---------------------------------------------------------
-    jugador_data = df_players[df_players["ID_Jugador"] == id_jugador_sel].copy()
+    j = indice.jugador(id_jugador_sel)
 
-    if not jugador_data.empty:
-        j = jugador_data.iloc[0]
+    if j is not None:
 
         st.markdown("""
         <div class="ps-player-box">
@@ -1783,7 +1774,7 @@ if menu == "Ver informes":
             pdf.set_font("Arial", "B", 14)
             pdf.cell(0, 10, "SCOUTING REPORT", ln=True)
 
-            if not jugador_data.empty:
+            if j is not None:
                 pdf.set_font("Arial", "", 11)
                 pdf.ln(4)
                 pdf.cell(0, 8, f"Jugador: {_safe_text(j.get('Nombre'))}", ln=True)
@@ -1791,18 +1782,10 @@ if menu == "Ver informes":
                 pdf.cell(0, 8, f"Posicion: {_safe_text(j.get('Posición'))}", ln=True)
                 pdf.ln(3)
 
-            informes_pdf = df_reports[df_reports["ID_Jugador"] == id_jugador_sel].copy()
+            informes_pdf = indice.informes_de(id_jugador_sel)
 
-            if "Fecha_Partido" in informes_pdf.columns:
-                try:
-                    informes_pdf["Fecha_dt"] = pd.to_datetime(
-                        informes_pdf["Fecha_Partido"],
-                        format="%d/%m/%Y",
-                        errors="coerce"
-                    )
-                    informes_pdf = informes_pdf.sort_values("Fecha_dt", ascending=False)
-                except Exception:
-                    pass
+            if "Fecha_Partido_dt" in informes_pdf.columns:
+                informes_pdf = informes_pdf.sort_values("Fecha_Partido_dt", ascending=False)
 
             for _, inf in informes_pdf.iterrows():
                 fecha = _safe_text(inf.get("Fecha_Partido"))
@@ -1817,7 +1800,7 @@ if menu == "Ver informes":
             buffer = BytesIO(pdf_bytes)
 
             nombre_archivo = "Informe.pdf"
-            if not jugador_data.empty:
+            if j is not None:
                 nombre_archivo = f"Informe_{_safe_text(j.get('Nombre'), 'Jugador')}.pdf"
 
             st.download_button(
@@ -1836,10 +1819,9 @@ if menu == "Ver informes":
     st.markdown("---")
 
     with st.expander("✏️ Editar informe seleccionado", expanded=False):
-        informe_edit = df_reports[df_reports["ID_Informe"] == id_informe_sel].copy()
+        inf = indice.informe(id_informe_sel)
 
-        if not informe_edit.empty:
-            inf = informe_edit.iloc[0]
+        if inf is not None:
 
             with st.form(f"form_edit_{id_informe_sel}"):
 
@@ -1869,43 +1851,17 @@ if menu == "Ver informes":
                 guardar = st.form_submit_button("💾 Guardar cambios")
 
                 if guardar:
-                    try:
-                        ws_inf = obtener_hoja("Informes")
-                        data_sheet = ws_inf.get_all_records()
-                        df_sheet = pd.DataFrame(data_sheet)
-
-                        if "ID_Informe" not in df_sheet.columns:
-                            st.error("La hoja Informes no contiene la columna ID_Informe.")
-                        else:
-                            df_sheet["ID_Informe"] = _safe_str_series(df_sheet["ID_Informe"])
-                            match = df_sheet[df_sheet["ID_Informe"] == id_informe_sel]
-
-                            if not match.empty:
-                                row_index = match.index[0] + 2
-                                fila_actual = match.iloc[0].copy()
-
-                                fila_actual["Scout"] = nuevo_scout
-                                fila_actual["Fecha_Partido"] = nueva_fecha
-                                fila_actual["Equipos_Resultados"] = nuevos_equipos
-                                fila_actual["Línea"] = nueva_linea
-                                fila_actual["Observaciones"] = nuevas_obs
-
-                                total_cols = len(df_sheet.columns)
-                                end_col = _excel_col_letter(total_cols)
-
-                                ws_inf.update(
-                                    f"A{row_index}:{end_col}{row_index}",
-                                    [fila_actual.tolist()]
-                                )
-
-                                st.cache_data.clear()
-                                st.toast("✓ Informe actualizado correctamente", icon="✅")
-                                st.rerun()
-                            else:
-                                st.error("No se encontró el informe en la hoja.")
-
-                    except Exception as e:
-                        st.error(f"⚠️ Error al actualizar el informe: {e}")
+                    cambios = pd.DataFrame([{
+                        "ID_Informe": id_informe_sel,
+                        "Scout": nuevo_scout,
+                        "Fecha_Partido": nueva_fecha,
+                        "Equipos_Resultados": nuevos_equipos,
+                        "Línea": nueva_linea,
+                        "Observaciones": nuevas_obs,
+                    }])
+
+                    if actualizar_hoja("Informes", cambios, "ID_Informe", agregar_nuevos=False):
+                        st.rerun()
 
     st.info("El borrado quedó desactivado en esta vista para evitar eliminar informes por error.")
 # =========================================================
@@ -1918,8 +1874,8 @@ if menu == "Lista corta":
     # -----------------------------------------------------
     # DATASETS
     # -----------------------------------------------------
-    df_short = df_short_user.copy()          # decisiones (todas; privacidad luego)
-    df_players = df_players_all.copy()       # base completa de jugadores
+    df_short = df_short_user.copy(deep=False)          # decisiones (todas; privacidad luego)
+    df_players = df_players_all.copy(deep=False)       # base completa de jugadores
 
     if df_short.empty:
         st.info("No hay jugadores cargados en la lista corta actualmente.")
@@ -1931,20 +1887,14 @@ if menu == "Lista corta":
     if CURRENT_ROLE not in ["admin"]:
         df_short = df_short[df_short["Agregado_Por"] == CURRENT_USER]
 
-    # Cortar referencia (evita SettingWithCopyWarning)
-    df_short = df_short.copy()
-
     # =========================================================
     # NORMALIZAR FECHA / AÑO / SEMESTRE (LISTA CORTA)
     # =========================================================
     if "Fecha_Agregado" not in df_short.columns:
         df_short["Fecha_Agregado"] = None
+        df_short["Fecha_Agregado_dt"] = pd.NaT
 
-    df_short["Fecha_dt"] = pd.to_datetime(
-        df_short["Fecha_Agregado"],
-        errors="coerce",
-        dayfirst=True
-    )
+    df_short["Fecha_dt"] = df_short["Fecha_Agregado_dt"]
 
     df_short["Año"] = df_short["Fecha_dt"].dt.year.astype("Int64")
 
@@ -1988,13 +1938,13 @@ if menu == "Lista corta":
     with col2:
         filtro_liga = st.selectbox(
             "Liga",
-            [""] + sorted(df_players["Liga"].dropna().unique())
+            [""] + opciones_categoria(df_players["Liga"])
         )
 
     with col3:
         filtro_nac = st.selectbox(
             "Nacionalidad",
-            [""] + sorted(df_players["Nacionalidad"].dropna().unique())
+            [""] + opciones_categoria(df_players["Nacionalidad"])
         )
 
     with col4:
@@ -2232,6 +2182,44 @@ if menu == "Lista corta":
                                         unsafe_allow_html=True
                                     )
 
+    # =========================================================
+    # 🕸️ EXPORTAR RADARES DE LA LISTA (LOTE)
+    # =========================================================
+    if st.button("🕸️ Exportar radares (ZIP)", disabled=df_filtrado.empty):
+        try:
+            import zipfile
+
+            referencias = obtener_referencias().obtener(VERSION_USUARIO, vista, ALCANCE_SCOUT)
+
+            # Un radar por jugador (vs. su posición), todos en un lote
+            pedidos, archivos = [], {}
+            for id_j, nombre_j in zip(df_filtrado["ID_Jugador"].tolist(), df_filtrado["Nombre"].tolist()):
+                prom_j = agregados.promedios(id_j)
+                if prom_j is None or id_j in archivos:
+                    continue
+                j = indice.jugador(id_j)
+                pos = j.get("Posición") if j is not None else None
+                pedidos.append(((id_j, (pos, None, None), VERSION_USUARIO), prom_j, referencias.promedios(pos)))
+                archivos[id_j] = f"Radar_{id_j}_{nombre_j}.png"
+
+            if not pedidos:
+                st.info("Ningún jugador filtrado tiene informes.")
+            else:
+                buffer = BytesIO()
+                with zipfile.ZipFile(buffer, "w") as zf:
+                    for nombre_archivo, imagen in zip(archivos.values(), obtener_radares().lote(pedidos)):
+                        zf.writestr(nombre_archivo, imagen)
+
+                st.download_button(
+                    "📦 Descargar radares",
+                    data=buffer.getvalue(),
+                    file_name="Radares_lista_corta.zip",
+                    mime="application/zip"
+                )
+
+        except Exception as e:
+            st.error(f"⚠️ Error al exportar radares: {e}")
+
     # =========================================================
     # GESTOR DE LISTA CORTA — Eliminación
     # =========================================================
@@ -2269,30 +2257,23 @@ if menu == "Lista corta":
 
             if st.button("🗑️ Eliminar jugador", type="primary", disabled=not confirmar):
                 try:
-                    ws_short = obtener_hoja("Lista corta")
-                    data_short = ws_short.get_all_records()
-                    df_short_local = pd.DataFrame(data_short)
-
-                    fila = df_short_local.index[
-                        (df_short_local["ID_Jugador"].astype(str) == str(jugador_row["ID_Jugador"])) &
-                        (df_short_local["Agregado_Por"] == CURRENT_USER)
-                    ]
+                    # Borra SOLO esa fila (sin vaciar la hoja para el resto)
+                    borradas = eliminar_filas_por_filtro(
+                        "Lista corta",
+                        {"ID_Jugador": jugador_row["ID_Jugador"], "Agregado_Por": CURRENT_USER},
+                        solo_primera=True
+                    )
 
-                    if not fila.empty:
-                        df_short_local = df_short_local.drop(fila[0])
-                        ws_short.clear()
-                        ws_short.update(
-                            [df_short_local.columns.values.tolist()] +
-                            df_short_local.values.tolist()
-                        )
+                    if borradas:
                         st.toast(
                             f"🗑️ Jugador {jugador_sel} eliminado correctamente de TU lista.",
                             icon="🗑️"
                         )
-                        st.cache_data.clear()
-                        st.experimental_rerun()
+                        st.rerun()
                     else:
                         st.warning("⚠️ No se encontró el jugador en tu lista corta.")
+                except FilaDesplazadaError as e:
+                    st.warning(f"⚠️ {e}")
                 except Exception as e:
                     st.error(f"⚠️ Error al eliminar: {e}")
 
@@ -2344,26 +2325,19 @@ if menu == "Agenda":
     # =========================================================
     # CARGA / CREACIÓN DE HOJA "Agenda"
     # =========================================================
-    columnas = ["ID_Jugador", "Nombre", "Scout", "Fecha_Revisar", "Motivo", "Visto"]
+    columnas = COLUMNAS_BASE["Agenda"]
 
-    try:
-        ws = obtener_hoja("Agenda", columnas)
-        data = ws.get_all_records()
-        df_agenda = pd.DataFrame(data)
-    except Exception as e:
-        st.warning("⚠️ No existía la hoja 'Agenda'. Se creará automáticamente en la base de datos.")
-        try:
-            ws = obtener_hoja("Agenda", columnas)
-            ws.append_row(columnas)
-            df_agenda = pd.DataFrame(columns=columnas)
-        except Exception as err:
-            st.error(f"❌ No se pudo crear la hoja Agenda: {err}")
-            st.stop()
+    # Los datos ya vienen de la carga en lote
+    df_agenda = df_agenda_all.copy(deep=False)
 
     if df_agenda.empty:
         df_agenda = pd.DataFrame(columns=columnas)
 
-    df_agenda["Fecha_Revisar"] = pd.to_datetime(df_agenda["Fecha_Revisar"], errors="coerce")
+    # La fecha ya viene parseada: la gemela reemplaza al texto (y no se escribe de vuelta)
+    if "Fecha_Revisar_dt" in df_agenda.columns:
+        df_agenda["Fecha_Revisar"] = df_agenda.pop("Fecha_Revisar_dt")
+    else:
+        df_agenda["Fecha_Revisar"] = pd.to_datetime(df_agenda["Fecha_Revisar"], errors="coerce")
     df_agenda["Visto"] = df_agenda["Visto"].astype(str).str.lower().isin(["si", "sí", "true", "1"])
 
     hoy = pd.Timestamp(datetime.now().date())
@@ -2393,9 +2367,9 @@ if menu == "Agenda":
         backup_local(df_tmp)
 
         try:
-            ws.update([df_tmp.columns.values.tolist()] + df_tmp.fillna("").values.tolist())
+            _almacen().reemplazar_tabla("Agenda", columnas_hoja("Agenda", df_tmp).fillna(""))
             st.toast(f"✅ {nombre} marcado como visto.", icon="✅")
-            st.cache_data.clear()
+            invalidar_hoja("Agenda")
             st.rerun()
         except Exception as e:
             st.error(f"⚠️ Error al actualizar seguimiento: {e}")
@@ -2406,7 +2380,7 @@ if menu == "Agenda":
     def guardar_nuevo(id_jugador, nombre, scout, fecha, motivo):
         nueva = [id_jugador, nombre, scout, fecha.strftime("%Y-%m-%d"), motivo, "Pendiente"]
         try:
-            ws.append_row(nueva)
+            agregar_fila("Agenda", nueva, f"el seguimiento de {nombre}", value_input_option="RAW")
             df_local = pd.concat([df_agenda, pd.DataFrame([{
                 "ID_Jugador": id_jugador,
                 "Nombre": nombre,
@@ -2417,7 +2391,6 @@ if menu == "Agenda":
             }])], ignore_index=True)
             backup_local(df_local)
             st.success(f"✅ Seguimiento agendado para {nombre} el {fecha.strftime('%d/%m/%Y')}")
-            st.cache_data.clear()
             st.rerun()
         except Exception as e:
             st.error(f"⚠️ Error al guardar seguimiento: {e}")
@@ -2484,7 +2457,7 @@ if menu == "Agenda":
     # =========================================================
     st.markdown("---")
     with st.expander("➕ Agendar nuevo seguimiento", expanded=False):
-        jugadores_dict = {row["Nombre"]: row["ID_Jugador"] for _, row in df_players.iterrows()}
+        jugadores_dict = dict(zip(df_players["Nombre"].tolist(), df_players["ID_Jugador"].tolist()))
         col1, col2 = st.columns(2)
         with col1:
             jugador_sel = st.selectbox("Seleccioná un jugador", [""] + list(jugadores_dict.keys()))
@@ -2510,59 +2483,22 @@ if menu == "Panel General":
     # =========================
     # DATA BASE
     # =========================
-    df_players = df_players_user.copy()
-    df_reports = df_reports_user.copy()
-    df_short = df_short_user.copy()
-
-    df_players["ID_Jugador"] = df_players["ID_Jugador"].astype(str)
-    df_reports["ID_Jugador"] = df_reports["ID_Jugador"].astype(str)
-    df_short["ID_Jugador"] = df_short["ID_Jugador"].astype(str)
-
-    # =========================
-    # FECHAS
-    # =========================
-    df_reports["Fecha_Informe_dt"] = pd.to_datetime(
-        df_reports["Fecha_Informe"], errors="coerce", dayfirst=True
-    )
+    df_players = df_players_user.copy(deep=False)
+    df_reports = df_reports_user.copy(deep=False)
+    df_short = df_short_user.copy(deep=False)
 
+    # IDs, fechas ("*_dt") y métricas (float32) ya vienen tipados de la carga
     hoy = datetime.today()
     hace_30 = hoy - timedelta(days=30)
 
     # =========================
     # EDAD SEGURA
     # =========================
-    def edad_segura(fecha):
-        try:
-            f = datetime.strptime(str(fecha), "%d/%m/%Y")
-            return int((hoy - f).days / 365.25)
-        except:
-            return None
+    df_players["Edad"] = np.floor(
+        (pd.Timestamp(hoy) - df_players["Fecha_Nac_dt"]).dt.days / 365.25
+    ).astype("Int64")
 
-    df_players["Edad"] = df_players["Fecha_Nac"].apply(edad_segura)
-
-    # =========================
-    # MÉTRICAS LIMPIAS
-    # =========================
-    metricas = [
-        "Controles","Perfiles","Pase_corto","Pase_largo","Pase_filtrado",
-        "1v1_defensivo","Recuperacion","Intercepciones","Duelos_aereos",
-        "Regate","Velocidad","Duelos_ofensivos",
-        "Resiliencia","Liderazgo","Inteligencia_tactica",
-        "Inteligencia_emocional","Posicionamiento","Vision_de_juego",
-        "Movimientos_sin_pelota"
-    ]
-
-    for m in metricas:
-        if m in df_reports.columns:
-            df_reports[m] = (
-                df_reports[m]
-                .astype(str)
-                .str.replace(",", ".", regex=False)
-                .replace(["", "nan", "None", "-", "—"], 0)
-                .astype(float)
-            )
-        else:
-            df_reports[m] = 0.0
+    metricas = METRICAS
 
     # =========================
     # KPIs
@@ -2585,10 +2521,6 @@ if menu == "Panel General":
     # =====================================================
     st.markdown("<div class='panel-title'>⭐ Consenso en Lista Corta</div>", unsafe_allow_html=True)
 
-    df_short["Fecha_Agregado_dt"] = pd.to_datetime(
-        df_short["Fecha_Agregado"], errors="coerce", dayfirst=True
-    )
-
     col_c1, col_c2 = st.columns(2)
 
     with col_c1:
@@ -2616,7 +2548,7 @@ if menu == "Panel General":
 
     df_consenso = (
         df_consenso
-        .groupby(["ID_Jugador","Nombre","Club","Posición"], as_index=False)
+        .groupby(["ID_Jugador","Nombre","Club","Posición"], as_index=False, observed=True)
         .agg(Cantidad_Scouts=("Agregado_Por","nunique"))
     )
 
@@ -2639,7 +2571,10 @@ if menu == "Panel General":
     lineas_prioritarias = ["1ra (Fichar)", "2da (Seguir)", "Joven Promesa"]
 
     df_last = (
-        df_reports
+        vista.proyectar(
+            ["ID_Jugador", "Fecha_Informe", "Fecha_Informe_dt", "Línea", "Scout", "Nombre", "Club", "Posición"],
+            ALCANCE_SCOUT,
+        )
         .sort_values("Fecha_Informe_dt")
         .groupby("ID_Jugador")
         .last()
@@ -2657,24 +2592,20 @@ if menu == "Panel General":
     if CURRENT_ROLE != "admin":
         df_last = df_last[df_last["Scout"] == CURRENT_USER]
 
-    df_alertas = df_last.merge(
-        df_players[["ID_Jugador","Nombre","Club","Posición"]],
-        on="ID_Jugador",
-        how="left"
-    )
+    df_alertas = df_last
 
     col_f1, col_f2, col_f3 = st.columns(3)
 
     with col_f1:
         filtro_pos = st.multiselect(
             "Posición",
-            sorted(df_alertas["Posición"].dropna().unique().tolist())
+            opciones_categoria(df_alertas["Posición"])
         )
 
     with col_f2:
         filtro_linea = st.multiselect(
             "Línea",
-            sorted(df_alertas["Línea"].dropna().unique().tolist())
+            opciones_categoria(df_alertas["Línea"])
         )
 
     with col_f3:
@@ -2716,7 +2647,7 @@ if menu == "Panel General":
     if "Fecha_Fin_Contrato" in df_players.columns:
 
         df_c = df_players.copy()
-        df_c["Fecha_Fin_dt"] = pd.to_datetime(df_c["Fecha_Fin_Contrato"], errors="coerce", dayfirst=True)
+        df_c["Fecha_Fin_dt"] = df_c["Fecha_Fin_Contrato_dt"]
         df_c = df_c.dropna(subset=["Fecha_Fin_dt"])
 
         lim6 = hoy + timedelta(days=180)
@@ -2743,18 +2674,14 @@ if menu == "Panel General":
     # =========================
     # TOPS POR POSICIÓN
     # =========================
+    # Percentil del Score (promedio de las medias) dentro de la posición
     df_scores = (
-        df_reports
-        .groupby("ID_Jugador")[metricas]
-        .mean()
-        .mean(axis=1)
-        .reset_index(name="Score")
+        vista.jugadores[["ID_Jugador", "Nombre", "Posición"]]
         .merge(
-            df_players[["ID_Jugador","Nombre","Posición"]],
-            on="ID_Jugador",
-            how="left"
-        )
-        .sort_values("Score", ascending=False)
+            percentiles.score().rename("Percentil"),
+            left_on="ID_Jugador", right_index=True, how="inner"
+        )[["ID_Jugador", "Percentil", "Nombre", "Posición"]]
+        .sort_values("Percentil", ascending=False)
     )
 
     def render_top(df, titulo):
@@ -2769,7 +2696,7 @@ if menu == "Panel General":
                     <div class='rank-num'>#{i}</div>
                     <div class='rank-name'>{r.Nombre}</div>
                 </div>
-                <div class='rank-score'>{round(r.Score,2)}</div>
+                <div class='rank-score'>P{int(round(r.Percentil))}</div>
             </div>
             """, unsafe_allow_html=True)
 
@@ -2799,7 +2726,7 @@ if menu == "Panel General":
 
     col_f1, col_f2, col_f3 = st.columns(3)
 
-    opciones_pos = sorted(df_players["Posición"].dropna().astype(str).unique().tolist())
+    opciones_pos = opciones_categoria(df_players["Posición"])
     opciones_pie = sorted(df_players["Pie_Hábil"].dropna().astype(str).unique().tolist())
 
     with col_f1:
@@ -2829,9 +2756,8 @@ if menu == "Panel General":
         ids = [opciones_cmp[n] for n in seleccionados]
 
         df_cmp = (
-            df_reports[df_reports["ID_Jugador"].isin(ids)]
-            .groupby("ID_Jugador")[metricas]
-            .mean()
+            agregados.medias(ids)
+            .rename_axis("ID_Jugador")
             .reset_index()
             .merge(
                 df_players[["ID_Jugador","Nombre","Posición","Edad","Club","Pie_Hábil"]],
@@ -2866,44 +2792,28 @@ if menu == "Panel Scouts":
     # -----------------------------------------------------
     # 📦 DATA BASE (YA FILTRADA POR USUARIO)
     # -----------------------------------------------------
-    df_reports = df_reports_user.copy()
-    df_players = df_players_user.copy()
+    # Vista informes × jugadores, solo las columnas del panel
+    df = vista.proyectar(
+        ["ID_Informe", "ID_Jugador", "Scout", "Fecha_Informe", "Fecha_Informe_dt", "Línea", "Posición", "Liga"],
+        ALCANCE_SCOUT,
+    ).copy()
 
-    if df_reports.empty:
+    if df.empty:
         st.info("No hay informes disponibles.")
         st.stop()
 
     # -----------------------------------------------------
-    # 🧹 NORMALIZACIÓN BÁSICA
-    # -----------------------------------------------------
-    df_reports["Scout"] = df_reports["Scout"].astype(str).str.strip()
-    df_reports["ID_Jugador"] = df_reports["ID_Jugador"].astype(str)
-    df_players["ID_Jugador"] = df_players["ID_Jugador"].astype(str)
-
-    # -----------------------------------------------------
-    # 🕒 FECHAS
+    # 🕒 FECHAS (parseadas en la carga)
     # -----------------------------------------------------
-    df_reports["Fecha_dt"] = pd.to_datetime(
-        df_reports["Fecha_Informe"],
-        errors="coerce",
-        dayfirst=True
-    )
+    df["Fecha_dt"] = df["Fecha_Informe_dt"]
 
-    df_reports["Año"] = df_reports["Fecha_Informe"].astype(str).str[-4:]
-    df_reports["Mes_num"] = df_reports["Fecha_dt"].dt.month
-    df_reports["Semestre"] = df_reports["Mes_num"].apply(
+    # Fecha que no se pudo parsear: el año sale del texto, como antes
+    df["Año"] = df["Fecha_dt"].dt.strftime("%Y").fillna(df["Fecha_Informe"].astype(str).str[-4:])
+    df["Mes_num"] = df["Fecha_dt"].dt.month
+    df["Semestre"] = df["Mes_num"].apply(
         lambda m: "1º" if m and m <= 6 else "2º"
     )
-    df_reports["Mes"] = df_reports["Fecha_dt"].dt.strftime("%Y-%m")
-
-    # -----------------------------------------------------
-    # 🔗 MERGE CON JUGADORES
-    # -----------------------------------------------------
-    df = df_reports.merge(
-        df_players[["ID_Jugador", "Posición", "Liga"]],
-        on="ID_Jugador",
-        how="left"
-    )
+    df["Mes"] = df["Fecha_dt"].dt.strftime("%Y-%m")
 
     # -----------------------------------------------------
     # 🔎 FILTROS
@@ -2925,7 +2835,7 @@ if menu == "Panel Scouts":
         if CURRENT_ROLE == "admin":
             filtro_scout = st.multiselect(
                 "Scout",
-                sorted(df["Scout"].dropna().unique())
+                opciones_categoria(df["Scout"])
             )
         else:
             filtro_scout = []
@@ -2963,10 +2873,10 @@ if menu == "Panel Scouts":
     }
 
     df_rank = df_f.copy()
-    df_rank["Peso"] = df_rank["Línea"].map(pesos).fillna(0.5)
+    df_rank["Peso"] = df_rank["Línea"].map(pesos).astype(float).fillna(0.5)
 
     ranking = (
-        df_rank.groupby("Scout")
+        df_rank.groupby("Scout", observed=True)
         .agg(
             Informes=("ID_Jugador", "count"),
             Jugadores=("ID_Jugador", "nunique"),
@@ -3002,7 +2912,7 @@ if menu == "Panel Scouts":
 
         st.markdown("### 🧭 Observaciones por posición")
 
-        pos_df = df_f["Posición"].value_counts().reset_index()
+        pos_df = df_f["Posición"].value_counts().loc[lambda c: c > 0].reset_index()
         pos_df.columns = ["Posición", "Cantidad"]
 
         fig = px.pie(pos_df, names="Posición", values="Cantidad", hole=0.45)
@@ -3013,7 +2923,7 @@ if menu == "Panel Scouts":
         st.markdown("### 📊 Evolución mensual por scout")
 
         scout_mes = (
-            df_f.groupby(["Mes", "Scout"])
+            df_f.groupby(["Mes", "Scout"], observed=True)
             .size()
             .reset_index(name="Informes")
             .sort_values("Mes")
@@ -3032,7 +2942,7 @@ if menu == "Panel Scouts":
         st.markdown("### 📊 Informes por scout")
 
         bar_df = (
-            df_f.groupby("Scout")
+            df_f.groupby("Scout", observed=True)
             .size()
             .reset_index(name="Informes")
         )
@@ -3047,7 +2957,7 @@ if menu == "Panel Scouts":
     st.markdown("### 🎯 Distribución de decisiones por scout")
 
     tabla_lineas = (
-        df_f.groupby(["Scout", "Línea"])
+        df_f.groupby(["Scout", "Línea"], observed=True)
         .size()
         .reset_index(name="Cantidad")
         .pivot(index="Scout", columns="Línea", values="Cantidad")
@@ -0,0 +1,86 @@
+# =========================================================
+# 📐 MATRIZ DE AGREGADOS POR JUGADOR
+# =========================================================
+# - Un único groupby sobre los informes por versión de datos (y
+#   alcance del usuario): por jugador y por cada una de las
+#   METRICAS → media, desvío y último valor en float32, más la
+#   cantidad de informes
+# - Reemplaza a calcular_promedios_jugador, que filtraba y
+#   promediaba el frame entero cada vez que se abría un jugador
+# - Ficha del jugador, comparador y tops del Panel General leen
+#   de acá: una fila por ID, búsqueda O(1)
+# =========================================================
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from data.cache import CachePorVersion
+from data.esquema import METRICAS
+
+
+MAX_AGREGADOS = 32
+
+
+class AgregadoJugadores:
+    def __init__(self, df_reports: pd.DataFrame):
+        self.informes = df_reports
+
+        if df_reports.empty:
+            ids = pd.Index([], name="ID_Jugador")
+            vacia = np.zeros((0, len(METRICAS)), dtype="float32")
+            self.media, self.desvio, self.ultimo = vacia, vacia, vacia
+            self.cantidad = np.zeros(0, dtype="int32")
+        else:
+            # "Último" = informe más reciente (sin fecha: el orden de la hoja)
+            orden = df_reports.sort_values("Fecha_Informe_dt", kind="stable", na_position="first")
+            grupos = orden.groupby("ID_Jugador", sort=True, observed=True)[METRICAS]
+            media = grupos.mean()
+            ids = media.index
+            self.media = media.to_numpy(dtype="float32")
+            # Con un solo informe el desvío es 0 (no NaN)
+            self.desvio = grupos.std().fillna(0).to_numpy(dtype="float32")
+            self.ultimo = grupos.last().to_numpy(dtype="float32")
+            self.cantidad = grupos.size().to_numpy(dtype="int32")
+
+        self.ids = ids
+        self._pos = {id_jugador: pos for pos, id_jugador in enumerate(ids)}
+
+    def __contains__(self, id_jugador) -> bool:
+        return str(id_jugador) in self._pos
+
+    def jugador(self, id_jugador):
+        """
+        DataFrame (media, desvío, último) × METRICAS del jugador y su
+        cantidad de informes; (None, 0) si no tiene informes.
+        """
+        pos = self._pos.get(str(id_jugador))
+        if pos is None:
+            return None, 0
+        tabla = pd.DataFrame(
+            {"Media": self.media[pos], "Desvío": self.desvio[pos], "Último": self.ultimo[pos]},
+            index=pd.Index(METRICAS, name="Métrica"),
+        )
+        return tabla, int(self.cantidad[pos])
+
+    def promedios(self, id_jugador):
+        """{métrica: media redondeada} como devolvía calcular_promedios_jugador (o None)."""
+        pos = self._pos.get(str(id_jugador))
+        if pos is None:
+            return None
+        return {m: round(float(v), 2) for m, v in zip(METRICAS, self.media[pos])}
+
+    def medias(self, ids=None) -> pd.DataFrame:
+        """Medias por jugador (índice ID_Jugador); solo los `ids` con informes si se indican."""
+        if ids is None:
+            return pd.DataFrame(self.media, index=self.ids, columns=METRICAS)
+        posiciones = [self._pos[i] for i in map(str, ids) if i in self._pos]
+        return pd.DataFrame(
+            self.media[posiciones], index=self.ids[posiciones], columns=METRICAS
+        )
+
+
+@st.cache_resource(show_spinner=False)
+def obtener_agregados() -> CachePorVersion:
+    """Agregados del proceso por (versión de "Informes" + alcance): `.obtener(clave, df_reports)`."""
+    return CachePorVersion(AgregadoJugadores, MAX_AGREGADOS)
@@ -0,0 +1,464 @@
+# =========================================================
+# 🗄️ ALMACENAMIENTO INTERCAMBIABLE
+# =========================================================
+# - La app habla con un Almacen, no con gspread:
+#       leer_tablas / leer_tabla / leer_columna / agregar_filas /
+#       actualizar_por_id / eliminar_por_filtro / eliminar_por_id /
+#       reemplazar_tabla
+# - AlmacenSheets: Google Sheets (sync incremental, cola de
+#   escrituras, circuit breaker, espejo SQLite)
+# - AlmacenLocal: SQLite en disco, sembrado con los CSV del repo
+#   (jugadores.csv, informes.csv, lista_corta.csv). Sin cuota ni red:
+#   instancias locales, pruebas de carga y demos
+# - "simulado": AlmacenSheets sobre un Google Sheets en memoria con
+#   latencia / 429 configurables y contadores (data/simulado.py)
+# - Se elige con la variable de entorno SCOUTING_ALMACEN=sheets|local|simulado
+# =========================================================
+
+import os
+import csv
+import threading
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from functools import partial
+
+import streamlit as st
+from gspread.utils import absolute_range_name, rowcol_to_a1
+
+from data.cache import obtener_versiones
+from data.circuito import obtener_circuito
+from data.cola import combinar_confirmaciones, confirmacion_inmediata, obtener_coordinador
+from data.espejo import EspejoSQLite, obtener_espejo
+from data.cuota import obtener_limitador
+from data.loader import (
+    ARCHIVOS_CSV,
+    COLUMNA_ID,
+    COLUMNAS_BASE,
+    leer_rangos,
+    normalizar_id,
+    valores_a_dataframe,
+)
+from data.sheets import obtener_conexion
+from data.sync import leer_hojas, obtener_sincronizador
+from data.writes import (
+    FilaDesplazadaError,
+    a_celda,
+    a_texto,
+    aplicar_a_grilla,
+    calcular_diferencias,
+    eliminar_filas,
+)
+
+
+# Backend que usa la app (ver obtener_almacen)
+ALMACEN_POR_DEFECTO = os.environ.get("SCOUTING_ALMACEN", "sheets")
+RUTA_LOCAL = os.environ.get("SCOUTING_LOCAL", os.path.join(".cache", "local.sqlite"))
+
+
+class RegistroNoEncontradoError(Exception):
+    """Se pidió actualizar un ID que no existe (y no se permite agregarlo)."""
+
+
+def _columna_id(nombre_hoja: str, df, id_col: str = None):
+    if id_col is None:
+        id_col = COLUMNA_ID.get(nombre_hoja)
+    if id_col is None or id_col not in df.columns:
+        id_col = next((c for c in ["ID_Informe", "ID_Jugador"] if c in df.columns), None)
+    return id_col
+
+
+def _hoja_o_crear(conexion, nombre_hoja: str):
+    return conexion.hoja(nombre_hoja) or conexion.crear_hoja(nombre_hoja, COLUMNAS_BASE.get(nombre_hoja))
+
+
+def _filas_del_filtro(nombre_hoja: str, grilla: list, filtro: dict) -> list:
+    """Filas físicas (1-based) cuyo contenido coincide con el filtro."""
+    faltantes = [c for c in filtro if not grilla or c not in grilla[0]]
+    if faltantes:
+        raise KeyError(f"La hoja '{nombre_hoja}' no tiene la columna {faltantes}.")
+    posiciones = [grilla[0].index(c) for c in filtro]
+    buscado = tuple(normalizar_id(v) for v in filtro.values())
+    return [
+        fila_fisica
+        for fila_fisica, fila in enumerate(grilla[1:], start=2)
+        if tuple(normalizar_id(fila[p] if p < len(fila) else "") for p in posiciones) == buscado
+    ]
+
+
+def _resultado(id_col, plan, confirmacion) -> dict:
+    return {
+        "id_col": id_col,
+        "encabezado": plan["encabezado"],
+        "nuevas": plan["nuevas"],
+        "celdas": sum(len(r["values"][0]) for r in plan["rangos"]),
+        "filas_nuevas": len(plan["nuevas"]),
+        "confirmacion": confirmacion,
+    }
+
+
+class Almacen(ABC):
+    """Interfaz común. Las escrituras devuelven un Future de confirmación."""
+
+    # True si leer cuesta red/cuota (habilita la revalidación en segundo plano)
+    remoto = False
+
+    @abstractmethod
+    def bloqueo(self, nombre_hoja: str):
+        """RLock de la hoja para los caminos lectura-modificación-escritura."""
+
+    def vaciar(self, nombre_hoja: str = None):
+        """Escribe lo que haya pendiente (no-op si se escribe en el momento)."""
+
+    @abstractmethod
+    def leer_tablas(self, nombres_hojas: list) -> dict:
+        """{nombre_hoja: DataFrame} de todas las hojas pedidas."""
+
+    @abstractmethod
+    def leer_tabla(self, nombre_hoja: str):
+        """Lectura completa y sin cache (para decidir sobre datos confirmados)."""
+
+    def leer_columna(self, nombre_hoja: str, columna: str) -> list:
+        """Valores actuales de una sola columna, sin encabezado (sin cache)."""
+        df = self.leer_tabla(nombre_hoja)
+        return df[columna].tolist() if columna in df.columns else []
+
+    def leer_respaldo(self, nombres_hojas: list) -> dict:
+        """
+        Copia local para arrancar sin esperar al almacén: {nombre_hoja:
+        (DataFrame, guardado_en)}, con guardado_en en epoch o None ({} si no hay).
+        """
+        return {}
+
+    @abstractmethod
+    def agregar_filas(self, nombre_hoja: str, filas: list, value_input_option: str = "USER_ENTERED"):
+        """Filas nuevas al final de la hoja."""
+
+    @abstractmethod
+    def actualizar_por_id(self, nombre_hoja: str, df, id_col: str = None, agregar_nuevos: bool = True) -> dict:
+        """Escribe solo lo que difiere de la hoja, fila por ID."""
+
+    @abstractmethod
+    def eliminar_por_filtro(self, nombre_hoja: str, filtro: dict, solo_primera: bool = False) -> int:
+        """Borra las filas que coinciden con el filtro; devuelve cuántas."""
+
+    def eliminar_por_id(self, nombre_hoja: str, id_col: str, id_valor) -> int:
+        return self.eliminar_por_filtro(nombre_hoja, {id_col: id_valor})
+
+    @abstractmethod
+    def eliminar_fila(self, nombre_hoja: str, fila_fisica: int, filtro: dict) -> int:
+        """Borra esa fila física si sigue siendo la del filtro (si no, FilaDesplazadaError)."""
+
+    @abstractmethod
+    def reemplazar_tabla(self, nombre_hoja: str, df):
+        """Reescribe la hoja completa con el DataFrame."""
+
+
+# ---------------------------------------------------------
+# GOOGLE SHEETS
+# ---------------------------------------------------------
+class AlmacenSheets(Almacen):
+    remoto = True
+
+    def __init__(self, conexion, sincronizador, coordinador, espejo=None):
+        self._conexion = conexion
+        self._sincronizador = sincronizador
+        self._coordinador = coordinador
+        self._espejo = espejo
+
+    @property
+    def estadisticas(self):
+        """Contadores de llamadas (solo con el libro simulado)."""
+        return getattr(self._conexion.libro(), "estadisticas", None)
+
+    def bloqueo(self, nombre_hoja: str):
+        return self._coordinador.bloqueo(nombre_hoja)
+
+    def vaciar(self, nombre_hoja: str = None):
+        self._coordinador.vaciar(nombre_hoja)
+
+    def _ws(self, nombre_hoja: str):
+        return _hoja_o_crear(self._conexion, nombre_hoja)
+
+    def _grilla(self, nombre_hoja: str, columnas: tuple = ()) -> list:
+        """Grilla para planear una escritura, con las `columnas` clave verificadas contra la hoja."""
+        return self._sincronizador.grilla_verificada(self._conexion.libro(), nombre_hoja, columnas)
+
+    # -----------------------------------------------------
+    # LECTURA
+    # -----------------------------------------------------
+    def leer_tablas(self, nombres_hojas: list) -> dict:
+        return leer_hojas(self._conexion, self._sincronizador, nombres_hojas, self._espejo)
+
+    def leer_respaldo(self, nombres_hojas: list) -> dict:
+        if self._espejo is None:
+            return {}
+        return {
+            nombre: (df, self._espejo.guardado_en(nombre))
+            for nombre, df in self._espejo.leer_tablas(nombres_hojas).items()
+        }
+
+    def leer_tabla(self, nombre_hoja: str):
+        with self.bloqueo(nombre_hoja):
+            self.vaciar(nombre_hoja)
+            self._ws(nombre_hoja)
+            grilla = leer_rangos(self._conexion.libro(), [absolute_range_name(nombre_hoja)])[0]
+        df = valores_a_dataframe(grilla, COLUMNAS_BASE.get(nombre_hoja))
+        # Mismos IDs de texto que leer_tablas (y que AlmacenLocal)
+        if not df.empty and "ID_Jugador" in df.columns:
+            df["ID_Jugador"] = df["ID_Jugador"].astype(str)
+        return df
+
+    def leer_columna(self, nombre_hoja: str, columna: str) -> list:
+        """
+        Una request angosta (encabezado + la columna), no la hoja entera.
+        No toma el bloqueo ni vacía la cola: se puede llamar desde una confirmación.
+        """
+        estado = self._sincronizador.estado(nombre_hoja)
+        encabezado = estado.grilla[0] if estado is not None and estado.grilla else COLUMNAS_BASE.get(nombre_hoja, [])
+        if columna in encabezado:
+            pos = encabezado.index(columna)
+            letra = rowcol_to_a1(1, pos + 1)[:-1]
+            cabecera, valores = leer_rangos(self._conexion.libro(), [
+                absolute_range_name(nombre_hoja, "1:1"),
+                absolute_range_name(nombre_hoja, f"{letra}2:{letra}"),
+            ])
+            actual = cabecera[0] if cabecera else []
+            if pos < len(actual) and actual[pos] == columna:
+                return [fila[0] if fila else "" for fila in valores]
+
+        # La columna se movió: se ubica sobre la grilla completa
+        grilla = leer_rangos(self._conexion.libro(), [absolute_range_name(nombre_hoja)])[0]
+        if not grilla or columna not in grilla[0]:
+            return []
+        pos = grilla[0].index(columna)
+        return [fila[pos] if pos < len(fila) else "" for fila in grilla[1:]]
+
+    # -----------------------------------------------------
+    # ESCRITURA
+    # -----------------------------------------------------
+    def agregar_filas(self, nombre_hoja: str, filas: list, value_input_option: str = "USER_ENTERED"):
+        return self._coordinador.agregar(nombre_hoja, filas, value_input_option)
+
+    def actualizar_por_id(self, nombre_hoja: str, df, id_col: str = None, agregar_nuevos: bool = True) -> dict:
+        """Plan por diferencia sobre la grilla actual; las celdas viajan por la cola."""
+        with self.bloqueo(nombre_hoja):
+            self.vaciar(nombre_hoja)
+            id_col = _columna_id(nombre_hoja, df, id_col)
+            grilla = self._grilla(nombre_hoja, (id_col,) if id_col else ())
+
+            # Si la hoja no tiene ni encabezado, crea desde cero
+            if not grilla:
+                self.reemplazar_tabla(nombre_hoja, df)
+                plan = calcular_diferencias([], df)
+                return _resultado(id_col, plan, confirmacion_inmediata())
+
+            plan = calcular_diferencias(grilla, df, id_col)
+            if plan["nuevas"] and not agregar_nuevos:
+                raise RegistroNoEncontradoError(f"No se encontró el registro en la hoja '{nombre_hoja}'.")
+
+            confirmaciones = []
+            if plan["rangos"]:
+                confirmacion = self._coordinador.actualizar(nombre_hoja, plan["rangos"])
+                # Filas existentes cambiaron: la próxima lectura tras escribir es completa
+                confirmacion.add_done_callback(lambda _: self._sincronizador.marcar_sucia(nombre_hoja))
+                confirmaciones.append(confirmacion)
+            if plan["nuevas"]:
+                confirmaciones.append(self._coordinador.agregar(nombre_hoja, plan["nuevas"]))
+
+        return _resultado(id_col, plan, combinar_confirmaciones(confirmaciones))
+
+    def eliminar_por_filtro(self, nombre_hoja: str, filtro: dict, solo_primera: bool = False) -> int:
+        """
+        Ubica la fila física con el índice cacheado, la verifica contra la hoja
+        y la borra con deleteDimension (nunca clear + reescritura).
+        """
+        ws = self._ws(nombre_hoja)
+
+        # Lo encolado se escribe antes: los índices de fila se calculan sobre la hoja real
+        with self.bloqueo(nombre_hoja):
+            self.vaciar(nombre_hoja)
+            grilla = self._grilla(nombre_hoja, tuple(filtro))
+
+            faltantes = [c for c in filtro if not grilla or c not in grilla[0]]
+            if faltantes:
+                raise KeyError(f"La hoja '{nombre_hoja}' no tiene la columna {faltantes}.")
+
+            indice = self._sincronizador.estado(nombre_hoja).indice(tuple(filtro))
+            filas = indice.get(tuple(normalizar_id(v) for v in filtro.values()), [])
+            if solo_primera:
+                filas = filas[:1]
+
+            try:
+                return eliminar_filas(ws, filas, filtro)
+            finally:
+                # Las filas de abajo se corrieron (o la hoja ya había cambiado)
+                self._sincronizador.marcar_sucia(nombre_hoja)
+
+    def eliminar_fila(self, nombre_hoja: str, fila_fisica: int, filtro: dict) -> int:
+        ws = self._ws(nombre_hoja)
+        with self.bloqueo(nombre_hoja):
+            # Lo encolado se planeó sin este borrado: se escribe antes
+            self.vaciar(nombre_hoja)
+            try:
+                return eliminar_filas(ws, [fila_fisica], filtro)
+            finally:
+                self._sincronizador.marcar_sucia(nombre_hoja)
+
+    def reemplazar_tabla(self, nombre_hoja: str, df):
+        ws = self._ws(nombre_hoja)
+        with self.bloqueo(nombre_hoja):
+            # Reescribe la hoja completa: primero tiene que estar escrito lo encolado
+            self.vaciar(nombre_hoja)
+            ws.update([df.columns.values.tolist()] + [[a_celda(v) for v in fila] for fila in df.values.tolist()])
+            self._sincronizador.marcar_sucia(nombre_hoja)
+
+
+# ---------------------------------------------------------
+# LOCAL (SQLite sembrado con los CSV)
+# ---------------------------------------------------------
+class AlmacenLocal(Almacen):
+    """
+    Cada hoja es una grilla de strings en SQLite (misma forma que la API),
+    así la conversión a DataFrame es idéntica a la de Google Sheets.
+    Las escrituras son inmediatas y solo tocan las filas que cambian.
+    """
+
+    def __init__(self, base: EspejoSQLite, carpeta_csv: str = ".", archivos_csv: dict = None):
+        self._base = base
+        self._carpeta_csv = carpeta_csv
+        self._archivos_csv = ARCHIVOS_CSV if archivos_csv is None else archivos_csv
+        self._lock = threading.Lock()
+        self._bloqueos = defaultdict(threading.RLock)
+
+    def bloqueo(self, nombre_hoja: str):
+        with self._lock:
+            return self._bloqueos[nombre_hoja]
+
+    def _sembrar(self, nombre_hoja: str) -> list:
+        archivo = self._archivos_csv.get(nombre_hoja)
+        ruta = os.path.join(self._carpeta_csv, archivo) if archivo else None
+        if ruta and os.path.exists(ruta):
+            with open(ruta, newline="", encoding="utf-8") as f:
+                return [fila for fila in csv.reader(f)]
+        return [list(COLUMNAS_BASE.get(nombre_hoja, []))]
+
+    def _grilla(self, nombre_hoja: str) -> list:
+        grilla = self._base.leer_grilla(nombre_hoja)
+        if grilla is None:
+            grilla = self._sembrar(nombre_hoja)
+            self._base.guardar_grilla(nombre_hoja, grilla)
+        return grilla
+
+    # -----------------------------------------------------
+    # LECTURA
+    # -----------------------------------------------------
+    def leer_tablas(self, nombres_hojas: list) -> dict:
+        tablas = {}
+        for nombre in nombres_hojas:
+            with self.bloqueo(nombre):
+                df = valores_a_dataframe(self._grilla(nombre), COLUMNAS_BASE.get(nombre))
+            if not df.empty and "ID_Jugador" in df.columns:
+                df["ID_Jugador"] = df["ID_Jugador"].astype(str)
+            tablas[nombre] = df
+        return tablas
+
+    def leer_tabla(self, nombre_hoja: str):
+        return self.leer_tablas([nombre_hoja])[nombre_hoja]
+
+    def leer_columna(self, nombre_hoja: str, columna: str) -> list:
+        with self.bloqueo(nombre_hoja):
+            grilla = self._grilla(nombre_hoja)
+        if not grilla or columna not in grilla[0]:
+            return []
+        pos = grilla[0].index(columna)
+        return [fila[pos] if pos < len(fila) else "" for fila in grilla[1:]]
+
+    # -----------------------------------------------------
+    # ESCRITURA
+    # -----------------------------------------------------
+    def agregar_filas(self, nombre_hoja: str, filas: list, value_input_option: str = "USER_ENTERED"):
+        with self.bloqueo(nombre_hoja):
+            grilla = self._grilla(nombre_hoja)
+            self._base.guardar_grilla(nombre_hoja, grilla + [[a_texto(v) for v in fila] for fila in filas])
+        # Como en Sheets: se confirma con la fila física de la primera fila nueva
+        return confirmacion_inmediata(len(grilla) + 1)
+
+    def actualizar_por_id(self, nombre_hoja: str, df, id_col: str = None, agregar_nuevos: bool = True) -> dict:
+        with self.bloqueo(nombre_hoja):
+            grilla = self._grilla(nombre_hoja)
+            id_col = _columna_id(nombre_hoja, df, id_col)
+            plan = calcular_diferencias(grilla if grilla != [[]] else [], df, id_col)
+            if plan["nuevas"] and not agregar_nuevos:
+                raise RegistroNoEncontradoError(f"No se encontró el registro en la hoja '{nombre_hoja}'.")
+            if not grilla or grilla == [[]]:
+                grilla = [plan["encabezado"]]
+            self._base.guardar_grilla(nombre_hoja, aplicar_a_grilla(grilla, plan))
+        return _resultado(id_col, plan, confirmacion_inmediata())
+
+    def eliminar_por_filtro(self, nombre_hoja: str, filtro: dict, solo_primera: bool = False) -> int:
+        with self.bloqueo(nombre_hoja):
+            grilla = self._grilla(nombre_hoja)
+            filas = _filas_del_filtro(nombre_hoja, grilla, filtro)
+            if solo_primera:
+                filas = filas[:1]
+            if filas:
+                borrar = set(filas)
+                self._base.guardar_grilla(nombre_hoja, [
+                    fila for fila_fisica, fila in enumerate(grilla, start=1) if fila_fisica not in borrar
+                ])
+            return len(filas)
+
+    def eliminar_fila(self, nombre_hoja: str, fila_fisica: int, filtro: dict) -> int:
+        with self.bloqueo(nombre_hoja):
+            grilla = self._grilla(nombre_hoja)
+            if fila_fisica not in _filas_del_filtro(nombre_hoja, grilla, filtro):
+                raise FilaDesplazadaError(
+                    "La hoja cambió desde la última lectura; recargá los datos e intentá de nuevo."
+                )
+            self._base.guardar_grilla(nombre_hoja, grilla[:fila_fisica - 1] + grilla[fila_fisica:])
+            return 1
+
+    def reemplazar_tabla(self, nombre_hoja: str, df):
+        with self.bloqueo(nombre_hoja):
+            self._base.guardar_grilla(
+                nombre_hoja,
+                [[str(c) for c in df.columns]] + [[a_texto(v) for v in fila] for fila in df.values.tolist()],
+            )
+
+
+# ---------------------------------------------------------
+# FÁBRICA
+# ---------------------------------------------------------
+def _al_fallar(sincronizador, versiones, nombre_hoja, error):
+    # El parche optimista no llegó a la hoja: se descarta en la próxima lectura
+    sincronizador.marcar_sucia(nombre_hoja)
+    versiones.invalidar(nombre_hoja)
+
+
+@st.cache_resource(show_spinner=False)
+def obtener_almacen(tipo: str, sheet_id: str, creds_path: str, scope: tuple) -> Almacen:
+    """Almacén único del proceso ("sheets", "local" o "simulado")."""
+    if tipo == "local":
+        return AlmacenLocal(EspejoSQLite(RUTA_LOCAL))
+
+    if tipo == "simulado":
+        from data.simulado import ConexionSimulada, LibroSimulado
+
+        libro = LibroSimulado.desde_csv(
+            ".",
+            latencia_seg=float(os.environ.get("SCOUTING_SIMULADO_LATENCIA", "0")),
+            prob_429=float(os.environ.get("SCOUTING_SIMULADO_429", "0")),
+        )
+        conexion = ConexionSimulada(libro, obtener_limitador(), obtener_circuito())
+        # El espejo es de la hoja real: no se mezcla con datos simulados (ni se abre)
+        espejo = None
+    else:
+        conexion = obtener_conexion(sheet_id, creds_path, scope)
+        espejo = obtener_espejo()
+    sincronizador = obtener_sincronizador()
+    coordinador = obtener_coordinador(
+        partial(_hoja_o_crear, conexion),
+        partial(_al_fallar, sincronizador, obtener_versiones()),
+        obtener_circuito(),
+    )
+    return AlmacenSheets(conexion, sincronizador, coordinador, espejo)
@@ -0,0 +1,444 @@
+# =========================================================
+# 🗂️ CACHE POR HOJA CON VERSIONES
+# =========================================================
+# - Cada hoja tiene un contador de versión (compartido por proceso)
+# - Escribir en "Agenda" solo invalida lo derivado de "Agenda"
+# - Las funciones derivadas usan la versión como parte de su clave:
+#       @st.cache_data
+#       def algo(version_informes): ...
+#       algo(versiones_de("Informes"))
+# - Reemplaza a st.cache_data.clear(), que vaciaba todo para todos
+# - Después de escribir se parcha el snapshot en memoria (sin releer)
+#   y una reconciliación en segundo plano lo confirma contra la hoja
+# - Si la lectura falla (API caída), se sirve el último snapshot bueno
+# - Stale-while-revalidate: con un lector de fondo, una hoja vencida
+#   (o recién arrancada, desde el espejo SQLite) se sirve al instante
+#   y se revalida contra Sheets en segundo plano
+# - CachePorVersion: objetos derivados (índices, agregados, vistas...)
+#   armados una sola vez por clave de versiones, aunque los pidan
+#   varias sesiones a la vez
+# - Linaje: cuenta los cambios que NO fueron solo filas agregadas al
+#   final; con el mismo linaje, lo derivado se extiende con la cola
+# =========================================================
+
+import time
+import threading
+
+import pandas as pd
+import streamlit as st
+
+from data.cuota import prioridad_fondo
+from data.loader import normalizar_id
+
+
+TTL_TABLAS_SEG = 120
+DEMORA_RECONCILIACION_SEG = 5
+MAX_ENTRADAS_DERIVADAS = 32
+
+
+class VersionesHojas:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versiones = {}
+        # {nombre_hoja: cambios que no fueron solo filas agregadas al final}
+        self._reescrituras = {}
+
+    def version(self, nombre_hoja: str) -> int:
+        return self._versiones.get(nombre_hoja, 0)
+
+    def invalidar(self, *nombres_hojas, solo_agregado: bool = False):
+        with self._lock:
+            for nombre in nombres_hojas:
+                self._versiones[nombre] = self._versiones.get(nombre, 0) + 1
+                if not solo_agregado:
+                    self._reescrituras[nombre] = self._reescrituras.get(nombre, 0) + 1
+
+    def invalidar_todo(self):
+        with self._lock:
+            for nombre in list(self._versiones):
+                self._versiones[nombre] += 1
+            self._versiones["__todo__"] = self._versiones.get("__todo__", 0) + 1
+
+    def clave(self, *nombres_hojas) -> tuple:
+        """Clave de cache para datos derivados de estas hojas."""
+        base = self._versiones.get("__todo__", 0)
+        return (base,) + tuple(self.version(n) for n in nombres_hojas)
+
+    def linaje(self, nombre_hoja: str) -> tuple:
+        """Igual entre dos momentos si en el medio a la hoja solo se le agregaron filas al final."""
+        return (self._versiones.get("__todo__", 0), self._reescrituras.get(nombre_hoja, 0))
+
+
+class CacheTablas:
+    """
+    DataFrame por hoja, válido mientras no cambie su versión ni venza el TTL.
+    Las hojas vencidas se piden juntas en una sola lectura.
+    """
+
+    def __init__(self, versiones: VersionesHojas, ttl_seg: int = TTL_TABLAS_SEG):
+        self._versiones = versiones
+        self._ttl_seg = ttl_seg
+        self._lock = threading.RLock()
+        self._tablas = {}
+        self._revalidando = set()
+        # {nombre_hoja: Event} de las lecturas en curso (una por hoja)
+        self._leyendo = {}
+
+    def _vigente(self, nombre_hoja: str) -> bool:
+        entrada = self._tablas.get(nombre_hoja)
+        if entrada is None:
+            return False
+        clave, leido_en, _ = entrada
+        return (
+            clave == self._versiones.clave(nombre_hoja)
+            and leido_en is not None
+            and time.time() - leido_en < self._ttl_seg
+        )
+
+    def tablas(self, nombres_hojas: list, leer, leer_fondo=None, respaldo=None) -> dict:
+        """
+        {nombre_hoja: DataFrame}. `leer(nombres)` recibe solo las hojas
+        vencidas y devuelve {nombre: DataFrame} en una única lectura.
+        Si `leer` falla y todas las vencidas tienen un snapshot previo,
+        se devuelven esos (viejos); si falta alguna, el error se propaga.
+
+        Con `leer_fondo` (sin st.*), las hojas a las que solo se les venció
+        el TTL y las que `respaldo(nombres)` tenga (espejo SQLite, como
+        {nombre: (DataFrame, guardado_en)}) se devuelven
+        sin esperar y se revalidan en segundo plano. Una versión invalidada
+        se lee siempre.
+
+        Las lecturas corren SIN el lock del cache: mientras una sesión espera
+        a Sheets las demás siguen sirviéndose. Si otra sesión ya está leyendo
+        una hoja, se espera esa lectura en lugar de repetirla.
+        """
+        with self._lock:
+            frias = [
+                n for n in nombres_hojas
+                if n not in self._tablas and n not in self._leyendo
+            ] if leer_fondo is not None and respaldo is not None else []
+
+        del_espejo = {}
+        if frias:
+            try:
+                del_espejo = respaldo(frias)
+            except Exception:
+                del_espejo = {}
+
+        with self._lock:
+            revalidar = []
+            for nombre, (df, guardado_en) in del_espejo.items():
+                if nombre not in self._tablas:
+                    # leido_en = cuándo se espejó (None si no se sabe: queda vencida)
+                    self._tablas[nombre] = (self._versiones.clave(nombre), guardado_en, df)
+                    revalidar.append(nombre)
+
+            vencidas = [n for n in nombres_hojas if not self._vigente(n)]
+            if vencidas and leer_fondo is not None:
+                revalidar += [
+                    n for n in vencidas
+                    if n not in revalidar and n in self._tablas
+                    and self._tablas[n][0] == self._versiones.clave(n)
+                ]
+                vencidas = [n for n in vencidas if n not in revalidar]
+            if revalidar:
+                self.revalidar_en_fondo(revalidar, leer_fondo)
+
+            # Cada hoja vencida la lee una sola sesión; las demás esperan su resultado
+            ajenas = [self._leyendo[n] for n in vencidas if n in self._leyendo]
+            propias = [n for n in vencidas if n not in self._leyendo]
+            for nombre in propias:
+                self._leyendo[nombre] = threading.Event()
+            claves = {n: self._versiones.clave(n) for n in propias}
+
+        error = None
+        if propias:
+            leidas = {}
+            try:
+                leidas = leer(propias)
+            except Exception as e:
+                error = e
+            finally:
+                with self._lock:
+                    self._instalar(leidas, claves, time.time())
+                    for nombre in propias:
+                        self._leyendo.pop(nombre).set()
+
+        for lectura in ajenas:
+            lectura.wait()
+
+        with self._lock:
+            faltan = [n for n in nombres_hojas if n not in self._tablas]
+            if not faltan:
+                return {n: self._tablas[n][2] for n in nombres_hojas}
+        if error is not None:
+            raise error
+        # Falló la lectura de otra sesión y no hay snapshot: se intenta de nuevo
+        return self.tablas(nombres_hojas, leer, leer_fondo, respaldo)
+
+    def _instalar(self, leidas: dict, claves: dict, ahora: float):
+        """Guarda lo leído (con el lock tomado). `claves` = versiones antes de leer."""
+        for nombre, df in leidas.items():
+            previa = self._tablas.get(nombre)
+            actual = self._versiones.clave(nombre)
+            if actual != claves[nombre] and previa is not None and previa[0] == actual:
+                # Hubo un parche mientras se leía: su propia reconciliación manda
+                continue
+            if previa is not None and previa[0] == claves[nombre]:
+                if previa[2].equals(df):
+                    # Venció el TTL pero no cambió nada: se conserva lo derivado
+                    df = previa[2]
+                else:
+                    # Cambio externo (otra instancia o edición manual)
+                    self._versiones.invalidar(nombre, solo_agregado=_solo_agregadas(previa[2], df))
+                    claves[nombre] = self._versiones.clave(nombre)
+            self._tablas[nombre] = (claves[nombre], ahora, df)
+
+    def leido_en(self, nombres_hojas: list):
+        """Momento (epoch) de la lectura más vieja entre estas hojas, o None si no se sabe."""
+        with self._lock:
+            momentos = [self._tablas[n][1] for n in nombres_hojas if n in self._tablas]
+            if not momentos or None in momentos:
+                return None
+            return min(momentos)
+
+    # -----------------------------------------------------
+    # PARCHES OPTIMISTAS
+    # -----------------------------------------------------
+    def parchar(self, nombre_hoja: str, cambio) -> bool:
+        """
+        Aplica `cambio(df) -> df` sobre el snapshot cacheado y sube la versión.
+        Si la hoja no está en cache no hay nada que parchar (se leerá entera).
+        """
+        with self._lock:
+            entrada = self._tablas.get(nombre_hoja)
+            if entrada is None:
+                self._versiones.invalidar(nombre_hoja)
+                return False
+            _, leido_en, df = entrada
+            nuevo = cambio(df)
+            self._versiones.invalidar(nombre_hoja, solo_agregado=getattr(cambio, "solo_agrega", False))
+            self._tablas[nombre_hoja] = (self._versiones.clave(nombre_hoja), leido_en, nuevo)
+            return True
+
+    def reconciliar(self, nombres_hojas: list, leer):
+        """Relee las hojas y reemplaza el snapshot si difiere del parchado."""
+        with self._lock:
+            claves = {n: self._versiones.clave(n) for n in nombres_hojas}
+        leidas = leer(list(nombres_hojas))
+        ahora = time.time()
+        with self._lock:
+            for nombre in nombres_hojas:
+                if self._versiones.clave(nombre) != claves[nombre]:
+                    # Hubo otro parche mientras se leía: su propia reconciliación manda
+                    continue
+                entrada = self._tablas.get(nombre)
+                df = leidas[nombre]
+                if entrada is not None and entrada[2].equals(df):
+                    self._tablas[nombre] = (entrada[0], ahora, entrada[2])
+                    continue
+                self._versiones.invalidar(
+                    nombre, solo_agregado=entrada is not None and _solo_agregadas(entrada[2], df)
+                )
+                self._tablas[nombre] = (self._versiones.clave(nombre), ahora, df)
+
+    def revalidar_en_fondo(self, nombres_hojas: list, leer):
+        """Reconciliación inmediata en un hilo; una sola a la vez por hoja."""
+        with self._lock:
+            nombres = [n for n in nombres_hojas if n not in self._revalidando]
+            self._revalidando.update(nombres)
+        if not nombres:
+            return None
+
+        def _tarea():
+            try:
+                with prioridad_fondo():
+                    self.reconciliar(nombres, leer)
+            except Exception:
+                # API caída: se reintenta en la próxima lectura
+                pass
+            finally:
+                with self._lock:
+                    self._revalidando.difference_update(nombres)
+
+        hilo = threading.Thread(target=_tarea, daemon=True)
+        hilo.start()
+        return hilo
+
+    def programar_reconciliacion(self, nombres_hojas: list, leer, demora_seg: float = DEMORA_RECONCILIACION_SEG):
+        def _tarea():
+            try:
+                # Cede la cuota a las lecturas de los usuarios
+                with prioridad_fondo():
+                    self.reconciliar(nombres_hojas, leer)
+            except Exception:
+                # Si falla, el TTL normal termina de corregir el snapshot
+                pass
+
+        timer = threading.Timer(demora_seg, _tarea)
+        timer.daemon = True
+        timer.start()
+        return timer
+
+
+class CachePorVersion:
+    """
+    `fabrica(*args)` por clave (versiones de hojas + alcance), armado una sola
+    vez: si otra sesión ya está armando la misma clave, se espera su resultado.
+    Se conservan las últimas `max_entradas` claves.
+
+    Con `reutilizable(clave, anterior) -> bool`, la fábrica recibe además
+    `previa=` (lo armado para la clave anterior más reciente que sirva, o None)
+    para extenderlo en lugar de empezar de cero.
+    """
+
+    def __init__(self, fabrica, max_entradas: int = MAX_ENTRADAS_DERIVADAS, reutilizable=None):
+        self._fabrica = fabrica
+        self._max = max_entradas
+        self._reutilizable = reutilizable
+        self._lock = threading.Lock()
+        self._entradas = {}
+        # {clave: Event} de lo que se está armando
+        self._armando = {}
+
+    def obtener(self, clave, *args):
+        while True:
+            with self._lock:
+                if clave in self._entradas:
+                    return self._entradas[clave]
+                armando = self._armando.get(clave)
+                if armando is None:
+                    self._armando[clave] = threading.Event()
+                    previa = self._previa(clave)
+                    break
+            # Si la otra sesión falla, se vuelve a intentar desde acá
+            armando.wait()
+
+        try:
+            if self._reutilizable is None:
+                valor = self._fabrica(*args)
+            else:
+                valor = self._fabrica(*args, previa=previa)
+            with self._lock:
+                self._entradas[clave] = valor
+                while len(self._entradas) > self._max:
+                    self._entradas.pop(next(iter(self._entradas)))
+            return valor
+        finally:
+            with self._lock:
+                self._armando.pop(clave).set()
+
+    def _previa(self, clave):
+        if self._reutilizable is None:
+            return None
+        for anterior in reversed(list(self._entradas)):
+            if self._reutilizable(clave, anterior):
+                return self._entradas[anterior]
+        return None
+
+
+def filas_conservadas(previo: pd.DataFrame, actual: pd.DataFrame, columna: str) -> int:
+    """
+    Cuántas filas de `previo` se pueden reusar al principio de `actual`, cuando
+    el linaje de la hoja ya garantiza que solo se agregaron filas al final
+    (0 si no). Solo compara la cantidad y la última fila conocida de `columna`.
+    """
+    n = len(previo) if previo is not None else 0
+    if not 0 < n <= len(actual) or columna not in actual.columns:
+        return 0
+    return n if normalizar_id(actual[columna].iat[n - 1]) == normalizar_id(previo[columna].iat[n - 1]) else 0
+
+
+def _solo_agregadas(previo: pd.DataFrame, nuevo: pd.DataFrame) -> bool:
+    """True si `nuevo` es `previo` con filas agregadas al final."""
+    n = len(previo)
+    return n < len(nuevo) and list(previo.columns) == list(nuevo.columns) and nuevo.iloc[:n].equals(previo)
+
+
+# ---------------------------------------------------------
+# CAMBIOS SOBRE EL SNAPSHOT (funciones puras df -> df)
+# ---------------------------------------------------------
+def _normalizar_ids(df: pd.DataFrame) -> pd.DataFrame:
+    if "ID_Jugador" in df.columns:
+        df["ID_Jugador"] = df["ID_Jugador"].astype(str)
+    return df
+
+
+def agregar_registros(registros: list):
+    """
+    Agrega filas al final del snapshot. Cada fila puede ser {columna: valor}
+    o una lista en el orden de columnas de la hoja (como en append_row).
+    """
+    def cambio(df):
+        nuevas = pd.DataFrame([
+            r if isinstance(r, dict) else dict(zip(df.columns, r))
+            for r in registros
+        ])
+        nuevas = nuevas.reindex(columns=list(df.columns) + [c for c in nuevas.columns if c not in df.columns])
+        if df.empty:
+            return _normalizar_ids(nuevas.reset_index(drop=True))
+        return _normalizar_ids(pd.concat([df, nuevas], ignore_index=True))
+    cambio.solo_agrega = True
+    return cambio
+
+
+def actualizar_registros(df_cambios: pd.DataFrame, id_col: str):
+    """Actualiza por ID las columnas presentes en df_cambios; los IDs nuevos se agregan."""
+    def cambio(df):
+        df = df.copy()
+        if id_col not in df.columns:
+            return df
+        claves = df[id_col].map(normalizar_id)
+        nuevos = []
+        for registro in df_cambios.to_dict("records"):
+            mascara = claves == normalizar_id(registro[id_col])
+            if not mascara.any():
+                nuevos.append(registro)
+                continue
+            for col, valor in registro.items():
+                if col not in df.columns:
+                    df[col] = ""
+                if col != id_col:
+                    df[col] = df[col].astype(object)
+                    df.loc[mascara, col] = valor
+        return agregar_registros(nuevos)(df) if nuevos else df
+    return cambio
+
+
+def eliminar_registros(filtro: dict, solo_primera: bool = False):
+    """Quita las filas que coinciden con el filtro {columna: valor}."""
+    def cambio(df):
+        if any(c not in df.columns for c in filtro):
+            return df
+        mascara = pd.Series(True, index=df.index)
+        for col, valor in filtro.items():
+            mascara &= df[col].map(normalizar_id) == normalizar_id(valor)
+        if solo_primera and mascara.any():
+            primera = mascara.idxmax()
+            mascara[:] = False
+            mascara[primera] = True
+        return df[~mascara].reset_index(drop=True)
+    return cambio
+
+
+@st.cache_resource(show_spinner=False)
+def obtener_versiones() -> VersionesHojas:
+    return VersionesHojas()
+
+
+@st.cache_resource(show_spinner=False)
+def obtener_cache_tablas() -> CacheTablas:
+    return CacheTablas(obtener_versiones())
+
+
+def invalidar_hoja(*nombres_hojas):
+    """Marca como viejas SOLO las hojas indicadas (y lo derivado de ellas)."""
+    obtener_versiones().invalidar(*nombres_hojas)
+
+
+def versiones_de(*nombres_hojas) -> tuple:
+    return obtener_versiones().clave(*nombres_hojas)
+
+
+def linaje_de(nombre_hoja: str) -> tuple:
+    return obtener_versiones().linaje(nombre_hoja)
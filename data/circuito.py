@@ -0,0 +1,117 @@
+# =========================================================
+# 🧯 CIRCUIT BREAKER DE GOOGLE SHEETS
+# =========================================================
+# - Cuenta fallos consecutivos de red / cuota / servidor
+# - Al llegar al umbral se abre: las requests fallan al instante
+#   (CircuitoAbiertoError) y la app sirve el último snapshot
+#   en modo solo lectura
+# - Un hilo de fondo sondea la API cada ESPERA_SONDA_SEG;
+#   la primera respuesta buena cierra el circuito
+# =========================================================
+
+import time
+import threading
+from contextlib import contextmanager
+
+import streamlit as st
+
+from data.cuota import prioridad_fondo
+
+
+UMBRAL_FALLOS = 3
+ESPERA_SONDA_SEG = 30
+
+_contexto = threading.local()
+
+
+class CircuitoAbiertoError(Exception):
+    """Google Sheets no responde: la request no se intenta."""
+
+
+class CircuitoSheets:
+    def __init__(self, umbral_fallos: int = UMBRAL_FALLOS, espera_sonda_seg: float = ESPERA_SONDA_SEG):
+        self._umbral = umbral_fallos
+        self._espera_sonda_seg = espera_sonda_seg
+        self._lock = threading.Lock()
+        self._fallos = 0
+        self._abierto_desde = None
+        self._sonda = None
+        self._hilo_sonda = None
+        self.ultimo_error = None
+
+    # -----------------------------------------------------
+    # ESTADO
+    # -----------------------------------------------------
+    @property
+    def abierto(self) -> bool:
+        return self._abierto_desde is not None
+
+    @property
+    def abierto_desde(self):
+        return self._abierto_desde
+
+    def configurar_sonda(self, sonda):
+        """`sonda()` hace una request barata; si no lanza, la API volvió."""
+        self._sonda = sonda
+
+    def permite(self) -> bool:
+        return not self.abierto or getattr(_contexto, "sondeando", False)
+
+    def verificar(self):
+        if not self.permite():
+            raise CircuitoAbiertoError(
+                "Google Sheets no está respondiendo; la app está en modo solo lectura."
+            )
+
+    # -----------------------------------------------------
+    # RESULTADOS
+    # -----------------------------------------------------
+    def registrar_exito(self):
+        with self._lock:
+            self._fallos = 0
+            self._abierto_desde = None
+            self.ultimo_error = None
+
+    def registrar_fallo(self, error: Exception):
+        with self._lock:
+            self._fallos += 1
+            self.ultimo_error = error
+            if self._abierto_desde is None and self._fallos >= self._umbral:
+                self._abierto_desde = time.time()
+                self._iniciar_sonda()
+
+    # -----------------------------------------------------
+    # SONDA DE RECUPERACIÓN
+    # -----------------------------------------------------
+    @contextmanager
+    def _sondeando(self):
+        _contexto.sondeando = True
+        try:
+            yield
+        finally:
+            _contexto.sondeando = False
+
+    def _iniciar_sonda(self):
+        if self._hilo_sonda is not None and self._hilo_sonda.is_alive():
+            return
+        self._hilo_sonda = threading.Thread(target=self._sondear, daemon=True)
+        self._hilo_sonda.start()
+
+    def _sondear(self):
+        while self.abierto:
+            time.sleep(self._espera_sonda_seg)
+            if self._sonda is None:
+                continue
+            try:
+                with self._sondeando(), prioridad_fondo():
+                    self._sonda()
+                self.registrar_exito()
+            except Exception as e:
+                with self._lock:
+                    self.ultimo_error = e
+
+
+@st.cache_resource(show_spinner=False)
+def obtener_circuito() -> CircuitoSheets:
+    """Circuito único del proceso."""
+    return CircuitoSheets()
@@ -0,0 +1,186 @@
+# =========================================================
+# 📮 COLA DE ESCRITURAS (WRITE-BEHIND)
+# =========================================================
+# - Un coordinador por proceso, compartido por todas las sesiones
+# - Las mutaciones se encolan por hoja y se vacían cada INTERVALO_FLUSH_SEG:
+#   todas las filas nuevas en un append_rows, todas las celdas en un batch_update
+# - Las escrituras de una misma hoja corren de a una (bloqueo por hoja);
+#   los caminos lectura-modificación-escritura usan el mismo bloqueo
+# - Cada mutación devuelve un Future: la UI puede esperar su confirmación
+#   (las filas nuevas se confirman con la fila física donde quedaron)
+# - Con el circuito abierto (API caída) no se acepta ninguna mutación
+# =========================================================
+
+import atexit
+import threading
+from collections import defaultdict
+from concurrent.futures import Future
+
+import streamlit as st
+from gspread.utils import a1_to_rowcol
+
+
+INTERVALO_FLUSH_SEG = 1.0
+
+
+class CoordinadorEscrituras:
+    def __init__(self, obtener_ws, intervalo_seg: float = INTERVALO_FLUSH_SEG, al_fallar=None, circuito=None):
+        self._obtener_ws = obtener_ws
+        self._intervalo_seg = intervalo_seg
+        self._al_fallar = al_fallar
+        self._circuito = circuito
+        self._lock = threading.Lock()
+        self._bloqueos = defaultdict(threading.RLock)
+        self._colas = defaultdict(list)
+        self._timer = None
+        atexit.register(self.vaciar)
+
+    # -----------------------------------------------------
+    # SERIALIZACIÓN POR HOJA
+    # -----------------------------------------------------
+    def bloqueo(self, nombre_hoja: str):
+        """RLock de la hoja: `with coordinador.bloqueo("Informes"): ...`"""
+        with self._lock:
+            return self._bloqueos[nombre_hoja]
+
+    def pendientes(self, nombre_hoja: str = None) -> int:
+        with self._lock:
+            if nombre_hoja is not None:
+                return len(self._colas.get(nombre_hoja, []))
+            return sum(len(c) for c in self._colas.values())
+
+    # -----------------------------------------------------
+    # ENCOLAR
+    # -----------------------------------------------------
+    def _encolar(self, nombre_hoja: str, tipo: str, datos: list, value_input_option: str) -> Future:
+        if self._circuito is not None:
+            # Modo solo lectura: falla antes de que la UI parche el snapshot
+            self._circuito.verificar()
+        futuro = Future()
+        with self._lock:
+            self._colas[nombre_hoja].append((tipo, datos, value_input_option, futuro))
+            if self._timer is None:
+                self._timer = threading.Timer(self._intervalo_seg, self._vaciar_por_timer)
+                self._timer.daemon = True
+                self._timer.start()
+        return futuro
+
+    def agregar(self, nombre_hoja: str, filas: list, value_input_option: str = "USER_ENTERED") -> Future:
+        """Filas nuevas al final de la hoja (se agrupan en un solo append_rows)."""
+        return self._encolar(nombre_hoja, "append", list(filas), value_input_option)
+
+    def actualizar(self, nombre_hoja: str, rangos: list, value_input_option: str = "USER_ENTERED") -> Future:
+        """Rangos {"range", "values"} (se agrupan en un solo batch_update)."""
+        return self._encolar(nombre_hoja, "update", list(rangos), value_input_option)
+
+    # -----------------------------------------------------
+    # VACIAR
+    # -----------------------------------------------------
+    def _vaciar_por_timer(self):
+        with self._lock:
+            self._timer = None
+        self.vaciar()
+
+    def vaciar(self, nombre_hoja: str = None):
+        """Escribe ya lo pendiente (de una hoja o de todas). Bloquea hasta terminar."""
+        with self._lock:
+            nombres = [nombre_hoja] if nombre_hoja is not None else list(self._colas)
+        for nombre in nombres:
+            self._vaciar_hoja(nombre)
+
+    def _vaciar_hoja(self, nombre_hoja: str):
+        with self.bloqueo(nombre_hoja):
+            with self._lock:
+                operaciones = self._colas.pop(nombre_hoja, [])
+            if not operaciones:
+                return
+
+            # Agrupa por (tipo, value_input_option); primero updates, después appends
+            grupos = defaultdict(list)
+            for tipo, datos, vio, futuro in operaciones:
+                grupos[(tipo, vio)].append((datos, futuro))
+            orden = sorted(grupos, key=lambda k: 0 if k[0] == "update" else 1)
+
+            try:
+                ws = self._obtener_ws(nombre_hoja)
+            except Exception as e:
+                self._fallar(nombre_hoja, [f for g in grupos.values() for _, f in g], e)
+                return
+
+            for tipo, vio in orden:
+                lote = grupos[(tipo, vio)]
+                futuros = [f for _, f in lote]
+                datos = [d for bloque, _ in lote for d in bloque]
+                try:
+                    if tipo == "update":
+                        ws.batch_update(datos, value_input_option=vio)
+                        fila = None
+                    else:
+                        fila = _primera_fila(ws.append_rows(datos, value_input_option=vio))
+                except Exception as e:
+                    self._fallar(nombre_hoja, futuros, e)
+                    continue
+                for bloque, futuro in lote:
+                    futuro.set_result(fila if fila is not None else True)
+                    if fila is not None:
+                        fila += len(bloque)
+
+    def _fallar(self, nombre_hoja: str, futuros: list, error: Exception):
+        for futuro in futuros:
+            futuro.set_exception(error)
+        if self._al_fallar is not None:
+            try:
+                self._al_fallar(nombre_hoja, error)
+            except Exception:
+                pass
+
+
+# ---------------------------------------------------------
+# CONFIRMACIONES
+# ---------------------------------------------------------
+def _primera_fila(respuesta):
+    """Fila física donde empezó un append_rows (None si la respuesta no la informa)."""
+    try:
+        return a1_to_rowcol(respuesta["updates"]["updatedRange"].split("!")[-1].split(":")[0])[0]
+    except Exception:
+        return None
+
+
+def confirmacion_inmediata(resultado=True) -> Future:
+    """Future ya resuelto (backends que escriben en el momento)."""
+    futuro = Future()
+    futuro.set_result(resultado)
+    return futuro
+
+
+def combinar_confirmaciones(confirmaciones: list) -> Future:
+    """Un Future que se resuelve cuando todos terminan (falla si falla alguno)."""
+    if not confirmaciones:
+        return confirmacion_inmediata()
+    if len(confirmaciones) == 1:
+        return confirmaciones[0]
+
+    combinado = Future()
+    restantes = [len(confirmaciones)]
+    lock = threading.Lock()
+
+    def _terminado(_):
+        with lock:
+            restantes[0] -= 1
+            if restantes[0]:
+                return
+        errores = [c.exception() for c in confirmaciones if c.exception() is not None]
+        if errores:
+            combinado.set_exception(errores[0])
+        else:
+            combinado.set_result(True)
+
+    for confirmacion in confirmaciones:
+        confirmacion.add_done_callback(_terminado)
+    return combinado
+
+
+@st.cache_resource(show_spinner=False)
+def obtener_coordinador(_obtener_ws, _al_fallar=None, _circuito=None) -> CoordinadorEscrituras:
+    """Coordinador único del proceso (los argumentos con _ no forman parte de la clave)."""
+    return CoordinadorEscrituras(_obtener_ws, al_fallar=_al_fallar, circuito=_circuito)
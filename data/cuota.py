@@ -0,0 +1,207 @@
+# =========================================================
+# 🚦 CUOTA DE LA API (TOKEN BUCKET COMPARTIDO)
+# =========================================================
+# - Un único balde de tokens por proceso: todas las sesiones
+#   y los hilos de fondo descuentan de la misma cuota
+# - Cada request HTTP de gspread toma un token (ClienteLimitado)
+# - Las lecturas interactivas tienen prioridad: el trabajo de fondo
+#   espera si hay usuarios esperando y nunca usa la reserva
+# - HTTP 429 / 5xx: reintento con backoff exponencial + jitter,
+#   y el balde se vacía para que el resto del proceso también frene
+# - Reemplaza al time.sleep(1) por sesión de cargar_datos_sheets
+# =========================================================
+
+import time
+import random
+import threading
+from contextlib import contextmanager
+
+import streamlit as st
+from gspread.exceptions import APIError
+from gspread.http_client import HTTPClient
+from requests.exceptions import RequestException
+
+
+# Cuota por defecto de Sheets: 60 requests por minuto y por usuario
+REQUESTS_POR_MINUTO = 60
+CAPACIDAD_BALDE = 15
+RESERVA_INTERACTIVA = 5
+
+REINTENTOS_MAX = 5
+ESPERA_BASE_SEG = 1.0
+ESPERA_MAX_SEG = 32.0
+CODIGOS_REINTENTABLES = (408, 429, 500, 502, 503, 504)
+TIMEOUT_REQUEST_SEG = 20
+
+INTERACTIVA = "interactiva"
+FONDO = "fondo"
+
+_contexto = threading.local()
+
+
+# ---------------------------------------------------------
+# PRIORIDAD DEL HILO ACTUAL
+# ---------------------------------------------------------
+def prioridad_actual() -> str:
+    return getattr(_contexto, "prioridad", INTERACTIVA)
+
+
+@contextmanager
+def prioridad_fondo():
+    """Las requests hechas dentro del bloque ceden ante las interactivas."""
+    previa = prioridad_actual()
+    _contexto.prioridad = FONDO
+    try:
+        yield
+    finally:
+        _contexto.prioridad = previa
+
+
+def espera_con_jitter(intento: int, base_seg: float = ESPERA_BASE_SEG, maximo_seg: float = ESPERA_MAX_SEG) -> float:
+    """Backoff exponencial con jitter completo: uniforme en [0, base * 2^intento]."""
+    return random.uniform(0, min(maximo_seg, base_seg * (2 ** intento)))
+
+
+# ---------------------------------------------------------
+# BALDE DE TOKENS
+# ---------------------------------------------------------
+class LimitadorCuota:
+    def __init__(
+        self,
+        por_minuto: int = REQUESTS_POR_MINUTO,
+        capacidad: int = CAPACIDAD_BALDE,
+        reserva_interactiva: int = RESERVA_INTERACTIVA,
+    ):
+        self._tasa = por_minuto / 60.0
+        self._capacidad = capacidad
+        self._reserva = min(reserva_interactiva, capacidad - 1)
+        self._tokens = float(capacidad)
+        self._ultimo = time.monotonic()
+        self._pausa_hasta = 0.0
+        self._interactivas_esperando = 0
+        self._cond = threading.Condition()
+
+    def _recargar(self, ahora: float):
+        self._tokens = min(self._capacidad, self._tokens + (ahora - self._ultimo) * self._tasa)
+        self._ultimo = ahora
+
+    def disponibles(self) -> float:
+        with self._cond:
+            self._recargar(time.monotonic())
+            return self._tokens
+
+    def adquirir(self, prioridad: str = None):
+        """Bloquea hasta obtener un token (las de fondo dejan la reserva libre)."""
+        interactiva = (prioridad or prioridad_actual()) == INTERACTIVA
+        with self._cond:
+            if interactiva:
+                self._interactivas_esperando += 1
+            try:
+                while True:
+                    ahora = time.monotonic()
+                    self._recargar(ahora)
+                    if ahora < self._pausa_hasta:
+                        self._cond.wait(self._pausa_hasta - ahora)
+                        continue
+
+                    minimo = 1 if interactiva else 1 + self._reserva
+                    libre = interactiva or self._interactivas_esperando == 0
+                    if libre and self._tokens >= minimo:
+                        self._tokens -= 1
+                        return
+                    faltan = max(minimo - self._tokens, 0) / self._tasa
+                    self._cond.wait(max(faltan, 0.05))
+            finally:
+                if interactiva:
+                    self._interactivas_esperando -= 1
+                    self._cond.notify_all()
+
+    def penalizar(self, segundos: float):
+        """La API respondió 429: nadie del proceso pide nada por `segundos`."""
+        with self._cond:
+            self._tokens = 0.0
+            self._ultimo = time.monotonic()
+            self._pausa_hasta = max(self._pausa_hasta, self._ultimo + segundos)
+            self._cond.notify_all()
+
+
+# ---------------------------------------------------------
+# CLIENTE HTTP DE GSPREAD
+# ---------------------------------------------------------
+class ClienteLimitado(HTTPClient):
+    """
+    HTTPClient que pasa cada request por el limitador y reintenta
+    los errores de cuota / servidor con backoff exponencial + jitter.
+    Con `circuito` (data/circuito.py) falla al instante mientras la API
+    está caída y le informa el resultado de cada request.
+    Uso: gspread.authorize(creds, http_client=partial(ClienteLimitado, limitador=...))
+    """
+
+    def __init__(
+        self,
+        auth,
+        session=None,
+        limitador: LimitadorCuota = None,
+        circuito=None,
+        reintentos_max: int = REINTENTOS_MAX,
+    ):
+        super().__init__(auth, session)
+        self.limitador = limitador or LimitadorCuota()
+        self.circuito = circuito
+        self.reintentos_max = reintentos_max
+        self.set_timeout(TIMEOUT_REQUEST_SEG)
+
+    def request(self, *args, **kwargs):
+        return ejecutar_con_cuota(
+            lambda: super(ClienteLimitado, self).request(*args, **kwargs),
+            self.limitador,
+            self.circuito,
+            self.reintentos_max,
+        )
+
+
+def ejecutar_con_cuota(llamada, limitador: LimitadorCuota, circuito=None, reintentos_max: int = REINTENTOS_MAX):
+    """
+    Ejecuta `llamada()` tomando un token por intento. Reintenta 408/429/5xx
+    con backoff + jitter e informa cada resultado al circuito (si hay).
+    """
+    intento = 0
+    while True:
+        if circuito is not None:
+            circuito.verificar()
+        limitador.adquirir()
+        try:
+            respuesta = llamada()
+        except RequestException as e:
+            # Sin red o timeout: no se reintenta aquí, cuenta para el circuito
+            if circuito is not None:
+                circuito.registrar_fallo(e)
+            raise
+        except APIError as e:
+            if e.code not in CODIGOS_REINTENTABLES or intento >= reintentos_max:
+                if circuito is not None:
+                    if e.code in CODIGOS_REINTENTABLES:
+                        circuito.registrar_fallo(e)
+                    else:
+                        # 4xx propio de la request: la API responde
+                        circuito.registrar_exito()
+                raise
+            espera = espera_con_jitter(intento)
+            retry_after = e.response.headers.get("Retry-After", "") if e.response is not None else ""
+            if retry_after.isdigit():
+                espera = max(espera, float(retry_after))
+            if e.code == 429:
+                limitador.penalizar(espera)
+            else:
+                time.sleep(espera)
+            intento += 1
+        else:
+            if circuito is not None:
+                circuito.registrar_exito()
+            return respuesta
+
+
+@st.cache_resource(show_spinner=False)
+def obtener_limitador() -> LimitadorCuota:
+    """Balde único del proceso (compartido por todas las sesiones)."""
+    return LimitadorCuota()
@@ -0,0 +1,187 @@
+# =========================================================
+# 💽 ESPEJO LOCAL EN SQLITE
+# =========================================================
+# - Copia persistente de la grilla de cada hoja (sobrevive reinicios)
+# - Lo alimenta el lector de Sheets después de cada lectura
+#   (solo se escriben las filas que cambiaron)
+# - Arranque en frío: la app responde con el espejo al instante y
+#   revalida contra Sheets en segundo plano (stale-while-revalidate)
+# - CLI para reconstruirlo desde cero:
+#       python -m data.espejo --sheet-id <ID> [--credenciales ruta.json]
+# =========================================================
+
+import os
+import json
+import time
+import sqlite3
+import argparse
+import threading
+
+import streamlit as st
+
+from data.loader import COLUMNAS_BASE, valores_a_dataframe
+
+
+RUTA_ESPEJO = os.environ.get("SCOUTING_ESPEJO", os.path.join(".cache", "espejo.sqlite"))
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS hojas (
+    hoja        TEXT PRIMARY KEY,
+    modificado  TEXT,
+    filas       INTEGER NOT NULL,
+    guardado_en REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS filas (
+    hoja    TEXT NOT NULL,
+    fila    INTEGER NOT NULL,
+    valores TEXT NOT NULL,
+    PRIMARY KEY (hoja, fila)
+);
+"""
+
+
+class EspejoSQLite:
+    """Grillas crudas por hoja (fila 1 = encabezado), igual que las devuelve la API."""
+
+    def __init__(self, ruta: str = RUTA_ESPEJO):
+        self.ruta = ruta
+        carpeta = os.path.dirname(ruta)
+        if carpeta:
+            os.makedirs(carpeta, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(ruta, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_ESQUEMA)
+        # Lo último guardado por hoja: evita comparar grillas que no cambiaron
+        self._guardado = {}
+
+    # -----------------------------------------------------
+    # LECTURA
+    # -----------------------------------------------------
+    def hojas(self) -> list:
+        with self._lock:
+            return [r[0] for r in self._db.execute("SELECT hoja FROM hojas ORDER BY hoja")]
+
+    def guardado_en(self, nombre_hoja: str):
+        with self._lock:
+            fila = self._db.execute(
+                "SELECT guardado_en FROM hojas WHERE hoja = ?", (nombre_hoja,)
+            ).fetchone()
+        return fila[0] if fila else None
+
+    def leer_grilla(self, nombre_hoja: str):
+        """Grilla guardada, o None si la hoja nunca se espejó."""
+        with self._lock:
+            if self._db.execute("SELECT 1 FROM hojas WHERE hoja = ?", (nombre_hoja,)).fetchone() is None:
+                return None
+            filas = self._db.execute(
+                "SELECT valores FROM filas WHERE hoja = ? ORDER BY fila", (nombre_hoja,)
+            ).fetchall()
+        return [json.loads(v) for (v,) in filas]
+
+    def leer_tablas(self, nombres_hojas: list) -> dict:
+        """{nombre_hoja: DataFrame} solo de las hojas presentes en el espejo."""
+        tablas = {}
+        for nombre in nombres_hojas:
+            grilla = self.leer_grilla(nombre)
+            if grilla is None:
+                continue
+            df = valores_a_dataframe(grilla, COLUMNAS_BASE.get(nombre))
+            if not df.empty and "ID_Jugador" in df.columns:
+                df["ID_Jugador"] = df["ID_Jugador"].astype(str)
+            tablas[nombre] = df
+        return tablas
+
+    # -----------------------------------------------------
+    # ESCRITURA (por diferencia de filas)
+    # -----------------------------------------------------
+    def guardar_grilla(self, nombre_hoja: str, grilla: list, modificado=None) -> int:
+        """Actualiza solo las filas distintas y borra las que sobran. Devuelve las filas escritas."""
+        ultimo = self._guardado.get(nombre_hoja)
+        if ultimo is not None and ultimo == (modificado, len(grilla)) and modificado is not None:
+            return 0
+
+        with self._lock:
+            previas = {
+                fila: valores
+                for fila, valores in self._db.execute(
+                    "SELECT fila, valores FROM filas WHERE hoja = ?", (nombre_hoja,)
+                )
+            }
+            cambios = []
+            for i, fila in enumerate(grilla, start=1):
+                valores = json.dumps(fila, ensure_ascii=False)
+                if previas.get(i) != valores:
+                    cambios.append((nombre_hoja, i, valores))
+
+            with self._db:
+                if cambios:
+                    self._db.executemany(
+                        "INSERT OR REPLACE INTO filas (hoja, fila, valores) VALUES (?, ?, ?)", cambios
+                    )
+                if len(previas) > len(grilla):
+                    self._db.execute(
+                        "DELETE FROM filas WHERE hoja = ? AND fila > ?", (nombre_hoja, len(grilla))
+                    )
+                self._db.execute(
+                    "INSERT OR REPLACE INTO hojas (hoja, modificado, filas, guardado_en) VALUES (?, ?, ?, ?)",
+                    (nombre_hoja, None if modificado is None else str(modificado), len(grilla), time.time()),
+                )
+            self._guardado[nombre_hoja] = (modificado, len(grilla))
+            return len(cambios)
+
+    def vaciar(self):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM filas")
+            self._db.execute("DELETE FROM hojas")
+            self._guardado = {}
+
+
+@st.cache_resource(show_spinner=False)
+def obtener_espejo() -> EspejoSQLite:
+    """Espejo único del proceso."""
+    return EspejoSQLite()
+
+
+# ---------------------------------------------------------
+# CLI: reconstruir el espejo desde Google Sheets
+# ---------------------------------------------------------
+def reconstruir(conexion, espejo: EspejoSQLite, nombres_hojas: list = None) -> dict:
+    """Borra el espejo y lo vuelve a llenar con una lectura completa de cada hoja."""
+    from data.loader import leer_valores
+
+    nombres = nombres_hojas or conexion.titulos()
+    valores = leer_valores(conexion.libro(), nombres)
+    modificado = conexion.libro().get_lastUpdateTime()
+    espejo.vaciar()
+    return {nombre: espejo.guardar_grilla(nombre, valores[nombre], modificado) for nombre in nombres}
+
+
+def main(argv=None):
+    from google.oauth2.service_account import Credentials
+
+    from data.cuota import LimitadorCuota
+    from data.sheets import ConexionSheets
+
+    parser = argparse.ArgumentParser(description="Reconstruye el espejo SQLite desde Google Sheets.")
+    parser.add_argument("--sheet-id", required=True)
+    parser.add_argument("--credenciales", default=os.path.join("credentials", "credentials.json"))
+    parser.add_argument("--ruta", default=RUTA_ESPEJO)
+    parser.add_argument("--hojas", nargs="*", help="Por defecto, todas las pestañas del libro")
+    args = parser.parse_args(argv)
+
+    credenciales = Credentials.from_service_account_file(
+        args.credenciales,
+        scopes=[
+            "https://www.googleapis.com/auth/spreadsheets",
+            "https://www.googleapis.com/auth/drive",
+        ],
+    )
+    conexion = ConexionSheets(credenciales, args.sheet_id, LimitadorCuota())
+    resumen = reconstruir(conexion, EspejoSQLite(args.ruta), args.hojas)
+    for nombre, filas in resumen.items():
+        print(f"{nombre}: {filas} filas")
+
+
+if __name__ == "__main__":
+    main()
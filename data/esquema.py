@@ -0,0 +1,186 @@
+# =========================================================
+# 🧬 ESQUEMA TIPADO DE LAS HOJAS
+# =========================================================
+# - Declara el tipo de las columnas de cada hoja
+# - Las grillas llegan como texto / números sueltos; acá se
+#   parsean UNA vez por versión de datos (no en cada sección):
+#       métricas → float32 (coma decimal; vacío, "-" o basura = 0)
+#       fechas   → columna gemela "<col>_dt" en datetime64
+#       IDs      → texto canónico ("12", nunca "12.0" ni " 12 ")
+#       columnas de pocos valores (Posición, Liga, Club, Scout,
+#       Línea, Nacionalidad) → Categorical con categorías ordenadas:
+#       filtros, groupby y listas de opciones trabajan sobre códigos
+# - El texto de las fechas queda tal cual para mostrar y escribir;
+#   las "_dt" no existen en la hoja: `columnas_hoja` las quita antes
+#   de reescribir una tabla entera
+# =========================================================
+
+import threading
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from data.loader import normalizar_id
+
+
+ID = "id"
+FECHA = "fecha"
+METRICA = "metrica"
+CATEGORIA = "categoria"
+
+SUFIJO_FECHA = "_dt"
+
+METRICAS = [
+    "Controles", "Perfiles", "Pase_corto", "Pase_largo", "Pase_filtrado",
+    "1v1_defensivo", "Recuperacion", "Intercepciones", "Duelos_aereos",
+    "Regate", "Velocidad", "Duelos_ofensivos",
+    "Resiliencia", "Liderazgo", "Inteligencia_tactica",
+    "Inteligencia_emocional", "Posicionamiento",
+    "Vision_de_juego", "Movimientos_sin_pelota",
+]
+
+# {hoja: {columna: tipo}}; las columnas no declaradas quedan como vienen
+ESQUEMA = {
+    "Jugadores": {
+        "ID_Jugador": ID,
+        "Fecha_Nac": FECHA,
+        "Fecha_Fin_Contrato": FECHA,
+        "Nacionalidad": CATEGORIA,
+        "Posición": CATEGORIA,
+        "Club": CATEGORIA,
+        "Liga": CATEGORIA,
+    },
+    "Informes": {
+        "ID_Informe": ID,
+        "ID_Jugador": ID,
+        "Scout": CATEGORIA,
+        "Fecha_Partido": FECHA,
+        "Fecha_Informe": FECHA,
+        "Línea": CATEGORIA,
+        **{m: METRICA for m in METRICAS},
+    },
+    "Lista corta": {
+        # La hoja no guarda Nacionalidad (sale de "Jugadores" por ID_Jugador)
+        "ID_Jugador": ID,
+        "Club": CATEGORIA,
+        "Posición": CATEGORIA,
+        "Fecha_Agregado": FECHA,
+    },
+    "Agenda": {
+        "ID_Jugador": ID,
+        "Fecha_Revisar": FECHA,
+    },
+}
+
+# Formato con que la app escribe cada fecha (lo que no encaje se infiere)
+FORMATOS_FECHA = {
+    "Fecha_Nac": "%d/%m/%Y",
+    "Fecha_Fin_Contrato": "%d/%m/%Y",
+    "Fecha_Partido": "%d/%m/%Y",
+    "Fecha_Informe": "%d/%m/%Y",
+    "Fecha_Agregado": "%d/%m/%Y",
+    "Fecha_Revisar": "%Y-%m-%d",
+}
+
+
+# ---------------------------------------------------------
+# PARSEO POR TIPO
+# ---------------------------------------------------------
+def parsear_fecha(serie: pd.Series, formato: str = None) -> pd.Series:
+    """datetime64: primero el formato declarado, después inferencia día-primero."""
+    texto = serie.astype(str).str.strip()
+    if formato is None:
+        return pd.to_datetime(texto, errors="coerce", dayfirst=True)
+    fechas = pd.to_datetime(texto, format=formato, errors="coerce")
+    faltan = fechas.isna() & ~texto.isin(["", "nan", "None", "NaT"])
+    if faltan.any():
+        fechas[faltan] = pd.to_datetime(
+            texto[faltan], errors="coerce", dayfirst=not formato.startswith("%Y")
+        )
+    return fechas
+
+
+def parsear_metrica(serie: pd.Series) -> pd.Series:
+    """float32 con coma decimal; lo no numérico cuenta como 0 (como antes)."""
+    texto = serie.astype(str).str.replace(",", ".", regex=False)
+    return pd.to_numeric(texto, errors="coerce").fillna(0).astype("float32")
+
+
+def categorizar(serie: pd.Series) -> pd.Series:
+    """Categorical de texto sin espacios sobrantes; categorías en orden alfabético."""
+    texto = serie.astype("string").str.strip()
+    categorias = sorted(texto.dropna().unique())
+    return texto.astype(pd.CategoricalDtype(categorias)).rename(serie.name)
+
+
+def opciones_categoria(serie: pd.Series, vacias: bool = False) -> list:
+    """
+    Valores presentes en `serie`, ordenados, sin recorrer los textos:
+    con un Categorical sale de los códigos usados. Sin `vacias`, se omite "".
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        codigos = np.unique(serie.cat.codes.to_numpy())
+        valores = [str(v) for v in serie.cat.categories[codigos[codigos >= 0]]]
+    else:
+        valores = sorted(serie.dropna().astype(str).str.strip().unique().tolist())
+    return valores if vacias else [v for v in valores if v]
+
+
+def tipar(nombre_hoja: str, df: pd.DataFrame) -> pd.DataFrame:
+    """Copia de `df` con los tipos del esquema (el original no se toca)."""
+    tipado = df.copy()
+    for col, tipo in ESQUEMA.get(nombre_hoja, {}).items():
+        if tipo == METRICA:
+            tipado[col] = (
+                parsear_metrica(tipado[col]) if col in tipado.columns
+                else pd.Series(0.0, index=tipado.index, dtype="float32")
+            )
+        elif col not in tipado.columns:
+            continue
+        elif tipo == ID:
+            tipado[col] = tipado[col].map(normalizar_id)
+        elif tipo == CATEGORIA:
+            tipado[col] = categorizar(tipado[col])
+        elif tipo == FECHA:
+            tipado[col + SUFIJO_FECHA] = parsear_fecha(tipado[col], FORMATOS_FECHA.get(col))
+    return tipado
+
+
+def columnas_hoja(nombre_hoja: str, df: pd.DataFrame) -> pd.DataFrame:
+    """Quita las columnas derivadas para escribir el frame de vuelta en la hoja."""
+    derivadas = [
+        col + SUFIJO_FECHA
+        for col, tipo in ESQUEMA.get(nombre_hoja, {}).items()
+        if tipo == FECHA
+    ]
+    return df.drop(columns=[c for c in derivadas if c in df.columns])
+
+
+# ---------------------------------------------------------
+# CACHE: UN FRAME TIPADO POR VERSIÓN DE CADA HOJA
+# ---------------------------------------------------------
+class TablasTipadas:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tipadas = {}
+
+    def tipada(self, nombre_hoja: str, df: pd.DataFrame, clave) -> pd.DataFrame:
+        """
+        Frame tipado de `df`. Se reusa mientras no cambie la versión de la hoja
+        ni el snapshot crudo (los parches crean un DataFrame nuevo).
+        """
+        with self._lock:
+            entrada = self._tipadas.get(nombre_hoja)
+            if entrada is not None and entrada[0] == clave and entrada[1] is df:
+                return entrada[2]
+        tipado = tipar(nombre_hoja, df)
+        with self._lock:
+            self._tipadas[nombre_hoja] = (clave, df, tipado)
+        return tipado
+
+
+@st.cache_resource(show_spinner=False)
+def obtener_tablas_tipadas() -> TablasTipadas:
+    """Cache único del proceso (compartido por todas las sesiones)."""
+    return TablasTipadas()
@@ -0,0 +1,190 @@
+# =========================================================
+# 🆔 ASIGNACIÓN DE IDS SIN COLISIONES
+# =========================================================
+# - Un máximo por hoja ("high-water mark") en memoria, compartido
+#   por todas las sesiones del proceso: reservar un ID es sumar 1
+#   bajo un lock, sin leer la hoja
+# - La primera reserva de cada hoja lee solo la columna del ID
+#   (una request angosta), nunca la hoja entera
+# - Cada escritura confirmada vuelve a leer la columna y sube el
+#   máximo; además se resiembra si pasaron REFRESCO_SEG sin lecturas
+#   (las otras instancias también agregan filas)
+# - Si el ID quedó repetido (otra instancia reservó el mismo), la
+#   fila que llegó segunda (la confirmación del append trae su fila
+#   física) se borra y se vuelve a agregar con un ID nuevo; recién
+#   tras MAX_REINTENTOS falla con IDDuplicadoError
+# - La verificación corre en un hilo propio: nunca dentro del vaciado
+#   de la cola, que tiene tomado el bloqueo de la hoja
+# =========================================================
+
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future
+
+import streamlit as st
+
+from data.loader import COLUMNA_ID, COLUMNAS_BASE, normalizar_id
+from data.writes import FilaDesplazadaError
+
+
+MAX_REINTENTOS = 3
+REFRESCO_SEG = 300
+
+# Columnas que, junto con el ID, distinguen la fila propia de la de otra instancia
+# cuando la confirmación no trae la fila física
+COLUMNAS_AUTORIA = {
+    "Jugadores": ("Nombre",),
+    "Informes": ("ID_Jugador", "Scout"),
+}
+
+
+class IDDuplicadoError(Exception):
+    """El ID reservado apareció más de una vez en la hoja al confirmar la escritura."""
+
+
+def _maximo_numerico(valores) -> int:
+    """Mayor ID entero de la columna (0 si no hay ninguno)."""
+    maximo = 0
+    for valor in valores:
+        txt = normalizar_id(valor)
+        if txt.isdigit():
+            maximo = max(maximo, int(txt))
+    return maximo
+
+
+class AsignadorIDs:
+    def __init__(self, almacen):
+        self._almacen = almacen
+        self._lock = threading.Lock()
+        self._maximos = {}
+        # {nombre_hoja: momento de la última lectura de la columna}
+        self._refrescados = {}
+        # Un lock por hoja para sembrar: la lectura no frena las reservas de las demás
+        self._siembras = defaultdict(threading.Lock)
+
+    def _columna(self, nombre_hoja: str, columna: str = None) -> str:
+        columna = columna or COLUMNA_ID.get(nombre_hoja)
+        if columna is None:
+            raise KeyError(f"La hoja '{nombre_hoja}' no tiene columna de ID")
+        return columna
+
+    def _vencido(self, nombre_hoja: str) -> bool:
+        with self._lock:
+            return time.time() - self._refrescados.get(nombre_hoja, 0) >= REFRESCO_SEG
+
+    def reservar(self, nombre_hoja: str, columna: str = None) -> int:
+        """Próximo ID libre de la hoja; dos sesiones nunca reciben el mismo."""
+        columna = self._columna(nombre_hoja, columna)
+        if self._vencido(nombre_hoja):
+            with self._lock:
+                siembra = self._siembras[nombre_hoja]
+            with siembra:
+                # Otra sesión pudo sembrarla mientras se esperaba
+                if self._vencido(nombre_hoja):
+                    self._subir(nombre_hoja, _maximo_numerico(self._almacen.leer_columna(nombre_hoja, columna)))
+        with self._lock:
+            self._maximos[nombre_hoja] = self._maximos.get(nombre_hoja, 0) + 1
+            return self._maximos[nombre_hoja]
+
+    def _subir(self, nombre_hoja: str, maximo: int):
+        with self._lock:
+            if maximo > self._maximos.get(nombre_hoja, 0):
+                self._maximos[nombre_hoja] = maximo
+            self._refrescados[nombre_hoja] = time.time()
+
+    def _fila_propia(self, nombre_hoja: str, fila: list, confirmado, repetidas: list):
+        """
+        Posición (0-based, sin encabezado) de nuestra fila entre las `repetidas`,
+        o None si no se puede saber cuál es.
+        """
+        if type(confirmado) is int and confirmado - 2 in repetidas:
+            return confirmado - 2
+
+        # Sin fila física: se distingue por las columnas de autoría
+        autoria = COLUMNAS_AUTORIA.get(nombre_hoja)
+        if not autoria:
+            return None
+        columnas = {col: self._almacen.leer_columna(nombre_hoja, col) for col in autoria}
+        coinciden = [
+            p for p in repetidas
+            if all(
+                normalizar_id(columnas[col][p] if p < len(columnas[col]) else "")
+                == normalizar_id(fila[COLUMNAS_BASE[nombre_hoja].index(col)])
+                for col in autoria
+            )
+        ]
+        # Dos filas iguales (el mismo jugador cargado dos veces): no se sabe cuál es la propia
+        return coinciden[0] if len(coinciden) == 1 else None
+
+    def confirmar(self, nombre_hoja: str, fila: list, confirmacion: Future, columna: str = None, _intento: int = 1) -> Future:
+        """
+        Future que se resuelve con el ID definitivo de `fila` cuando la escritura
+        llegó y el ID figura una sola vez en la hoja. Si otra instancia llegó antes
+        con el mismo ID, la fila se borra y se vuelve a agregar con uno nuevo;
+        falla (IDDuplicadoError o el error de la escritura) si no se puede.
+        """
+        columna = self._columna(nombre_hoja, columna)
+        pos_id = COLUMNAS_BASE[nombre_hoja].index(columna)
+        id_nuevo = fila[pos_id]
+        verificado = Future()
+
+        def _verificar(futuro):
+            try:
+                confirmado = futuro.result()
+                valores = self._almacen.leer_columna(nombre_hoja, columna)
+                self._subir(nombre_hoja, _maximo_numerico(valores))
+                repetidas = [i for i, v in enumerate(valores) if normalizar_id(v) == normalizar_id(id_nuevo)]
+                if len(repetidas) <= 1:
+                    verificado.set_result(id_nuevo)
+                    return
+
+                propia = self._fila_propia(nombre_hoja, fila, confirmado, repetidas)
+                if propia == repetidas[0]:
+                    # Llegamos primero: la otra instancia renumera la suya
+                    verificado.set_result(id_nuevo)
+                    return
+                if propia is None or _intento >= MAX_REINTENTOS:
+                    raise IDDuplicadoError(
+                        f"{columna}={id_nuevo} quedó repetido en '{nombre_hoja}' ({len(repetidas)} filas)"
+                    )
+
+                # La nuestra llegó segunda: se borra esa fila y se reemite con otro ID
+                filtro = {columna: id_nuevo}
+                filtro.update({
+                    col: fila[COLUMNAS_BASE[nombre_hoja].index(col)]
+                    for col in COLUMNAS_AUTORIA.get(nombre_hoja, ())
+                })
+                try:
+                    self._almacen.eliminar_fila(nombre_hoja, propia + 2, filtro)
+                except FilaDesplazadaError:
+                    raise IDDuplicadoError(
+                        f"{columna}={id_nuevo} quedó repetido en '{nombre_hoja}' y la fila se movió"
+                    )
+                nueva = list(fila)
+                nueva[pos_id] = self.reservar(nombre_hoja, columna)
+                siguiente = self.confirmar(
+                    nombre_hoja, nueva, self._almacen.agregar_filas(nombre_hoja, [nueva]), columna, _intento + 1
+                )
+                siguiente.add_done_callback(lambda f: _encadenar(f, verificado))
+            except Exception as e:
+                verificado.set_exception(e)
+
+        # Fuera del hilo de la cola: las requests de la verificación no retienen el bloqueo de la hoja
+        confirmacion.add_done_callback(
+            lambda futuro: threading.Thread(target=_verificar, args=(futuro,), daemon=True).start()
+        )
+        return verificado
+
+
+def _encadenar(origen: Future, destino: Future):
+    if origen.exception() is not None:
+        destino.set_exception(origen.exception())
+    else:
+        destino.set_result(origen.result())
+
+
+@st.cache_resource(show_spinner=False)
+def obtener_asignador(_almacen) -> AsignadorIDs:
+    """Asignador único del proceso (el almacén también lo es)."""
+    return AsignadorIDs(_almacen)
@@ -0,0 +1,70 @@
+# =========================================================
+# 🔎 ÍNDICES DE BÚSQUEDA POR VERSIÓN DE DATOS
+# =========================================================
+# - Se arman una vez por versión de "Jugadores" + "Informes"
+#   (y alcance del usuario), compartidos entre sesiones
+# - ID_Jugador → fila, "Nombre - Club" → ID, ID_Informe → fila,
+#   ID_Jugador → filas de sus informes: todo en O(1)
+# - Reemplaza los df[df[col] == valor].iloc[0] y los iterrows()
+#   que recorrían la tabla entera en cada rerun
+# - Cada índice devuelve filas de los frames con que se armó,
+#   así nunca mezcla posiciones de dos versiones distintas
+# =========================================================
+
+import pandas as pd
+import streamlit as st
+
+from data.cache import CachePorVersion
+
+
+MAX_INDICES = 32
+
+
+def _primera_posicion(valores) -> dict:
+    """{valor: posición de su primera aparición}."""
+    posiciones = {}
+    for pos, valor in enumerate(valores):
+        posiciones.setdefault(valor, pos)
+    return posiciones
+
+
+class IndiceDatos:
+    def __init__(self, df_players: pd.DataFrame, df_reports: pd.DataFrame):
+        self.jugadores = df_players
+        self.informes = df_reports
+
+        self._pos_jugador = _primera_posicion(df_players["ID_Jugador"].tolist())
+        # Etiqueta del buscador "Nombre - Club" → ID (como el dict por comprensión de antes)
+        self.etiquetas = dict(zip(
+            [f"{n} - {c}" for n, c in zip(df_players["Nombre"].tolist(), df_players["Club"].tolist())],
+            df_players["ID_Jugador"].tolist(),
+        ))
+
+        if df_reports.empty:
+            self._pos_informe = {}
+            self._informes_de = {}
+        else:
+            self._pos_informe = _primera_posicion(df_reports["ID_Informe"].tolist())
+            self._informes_de = df_reports.groupby("ID_Jugador", sort=False).indices
+
+    def jugador(self, id_jugador):
+        """Fila del jugador (la primera si el ID está repetido), o None."""
+        pos = self._pos_jugador.get(str(id_jugador))
+        return None if pos is None else self.jugadores.iloc[pos]
+
+    def informe(self, id_informe):
+        pos = self._pos_informe.get(str(id_informe))
+        return None if pos is None else self.informes.iloc[pos]
+
+    def informes_de(self, id_jugador) -> pd.DataFrame:
+        """Informes del jugador en el orden de la hoja (vacío si no tiene)."""
+        posiciones = self._informes_de.get(str(id_jugador))
+        if posiciones is None:
+            return self.informes.iloc[0:0]
+        return self.informes.iloc[posiciones]
+
+
+@st.cache_resource(show_spinner=False)
+def obtener_indices() -> CachePorVersion:
+    """Índices del proceso por (versiones + alcance): `.obtener(clave, df_players, df_reports)`."""
+    return CachePorVersion(IndiceDatos, MAX_INDICES)
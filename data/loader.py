@@ -0,0 +1,123 @@
+# =========================================================
+# 📥 CARGA EN LOTE DE TODAS LAS HOJAS
+# =========================================================
+# - Una sola llamada values_batch_get para todas las pestañas
+# - Las grillas de valores se convierten a DataFrame en local
+# - Misma conversión numérica que Worksheet.get_all_records
+# - Activa Copy-on-Write (por defecto desde pandas 3) una sola vez,
+#   al importar: los frames compartidos entre sesiones se reparten
+#   como vistas y nunca se modifican en su lugar
+# =========================================================
+
+import pandas as pd
+from gspread.utils import absolute_range_name, fill_gaps, numericise_all
+
+
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+
+# ---------------------------------------------------------
+# COLUMNAS BASE DE CADA HOJA
+# ---------------------------------------------------------
+COLUMNAS_BASE = {
+    "Jugadores": [
+        "ID_Jugador", "Nombre", "Fecha_Nac", "Nacionalidad", "Segunda_Nacionalidad",
+        "Altura", "Pie_Hábil", "Posición", "Caracteristica", "Club", "Liga",
+        "Sexo", "URL_Foto", "URL_Perfil", "Instagram", "Fecha_Fin_Contrato"
+    ],
+    "Informes": [
+        "ID_Informe", "ID_Jugador", "Scout", "Fecha_Partido", "Fecha_Informe",
+        "Equipos_Resultados", "Formación", "Observaciones", "Línea",
+        "Controles", "Perfiles", "Pase_corto", "Pase_largo", "Pase_filtrado",
+        "1v1_defensivo", "Recuperacion", "Intercepciones", "Duelos_aereos",
+        "Regate", "Velocidad", "Duelos_ofensivos",
+        "Resiliencia", "Liderazgo", "Inteligencia_tactica",
+        "Inteligencia_emocional", "Posicionamiento",
+        "Vision_de_juego", "Movimientos_sin_pelota"
+    ],
+    "Lista corta": [
+        "ID_Jugador", "Nombre", "Edad", "Altura", "Club", "Posición",
+        "URL_Foto", "URL_Perfil", "Agregado_Por", "Fecha_Agregado"
+    ],
+    "Agenda": ["ID_Jugador", "Nombre", "Scout", "Fecha_Revisar", "Motivo", "Visto"],
+}
+
+
+# CSV del repo con el contenido inicial de cada hoja (almacén local y simulado)
+ARCHIVOS_CSV = {
+    "Jugadores": "jugadores.csv",
+    "Informes": "informes.csv",
+    "Lista corta": "lista_corta.csv",
+}
+
+
+# Columna que identifica cada fila (None = sin ID único)
+COLUMNA_ID = {
+    "Jugadores": "ID_Jugador",
+    "Informes": "ID_Informe",
+    "Lista corta": None,
+    "Agenda": None,
+}
+
+
+def normalizar_id(valor) -> str:
+    """'12', 12, 12.0 y ' 12 ' representan el mismo ID."""
+    if valor is None:
+        return ""
+    txt = str(valor).strip()
+    if txt.lower() in ("nan", "none"):
+        return ""
+    if txt.endswith(".0") and txt[:-2].lstrip("-").isdigit():
+        txt = txt[:-2]
+    return txt
+
+
+def valores_a_registros(valores: list) -> tuple:
+    """
+    (encabezado, filas) a partir de la grilla cruda de la API.
+    Rellena las filas cortas y numeriza igual que get_all_records.
+    """
+    if not valores or valores == [[]]:
+        return [], []
+
+    grilla = fill_gaps(valores)
+    encabezado = grilla[0]
+    filas = [numericise_all(fila) for fila in grilla[1:]]
+    return encabezado, filas
+
+
+def valores_a_dataframe(valores: list, columnas_base: list = None) -> pd.DataFrame:
+    encabezado, filas = valores_a_registros(valores)
+    if not filas:
+        return pd.DataFrame(columns=encabezado or columnas_base or [])
+    return pd.DataFrame(filas, columns=encabezado)
+
+
+def leer_rangos(libro, rangos: list) -> list:
+    """Grillas de varios rangos A1 en UNA sola request (mismo orden pedido)."""
+    if not rangos:
+        return []
+
+    respuesta = libro.values_batch_get(rangos)
+    value_ranges = respuesta.get("valueRanges", [])
+    grillas = [(vr.get("values") or []) for vr in value_ranges]
+    return grillas + [[] for _ in range(len(rangos) - len(grillas))]
+
+
+def leer_valores(libro, nombres_hojas: list) -> dict:
+    """
+    Grilla de valores de cada hoja en UNA sola request.
+    Devuelve {nombre_hoja: [[...], ...]} en el mismo orden pedido.
+    """
+    rangos = [absolute_range_name(nombre) for nombre in nombres_hojas]
+    return dict(zip(nombres_hojas, leer_rangos(libro, rangos)))
+
+
+def leer_tablas(libro, nombres_hojas: list) -> dict:
+    """{nombre_hoja: DataFrame} leyendo todas las hojas en una sola request."""
+    valores = leer_valores(libro, nombres_hojas)
+    return {
+        nombre: valores_a_dataframe(valores.get(nombre, []), COLUMNAS_BASE.get(nombre))
+        for nombre in nombres_hojas
+    }
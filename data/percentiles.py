@@ -0,0 +1,56 @@
+# =========================================================
+# 🏅 PERCENTILES POR POSICIÓN
+# =========================================================
+# - "¿Dónde queda este extremo entre todos los extremos que
+#   evaluamos?": percentil (0-100) de cada métrica del jugador
+#   dentro de su posición, y dentro de posición + liga
+# - Sale de la matriz de agregados (data/agregados.py) con un
+#   único groupby().rank por nivel: sin volver a recorrer los
+#   informes. Se calcula una vez por versión de datos y alcance
+# - "Score" = promedio de las medias del jugador (el de los tops)
+# =========================================================
+
+import pandas as pd
+import streamlit as st
+
+from data.cache import CachePorVersion
+
+
+MAX_PERCENTILES = 32
+
+
+def _rango(medias: pd.DataFrame, grupos: list) -> pd.DataFrame:
+    """Percentil de cada columna dentro de su grupo (NaN si el grupo no se conoce)."""
+    return medias.groupby(grupos, observed=True).rank(pct=True).mul(100).astype("float32")
+
+
+class PercentilesPosicion:
+    def __init__(self, agregado, df_players: pd.DataFrame):
+        medias = agregado.medias()
+        medias["Score"] = medias.mean(axis=1)
+
+        jugadores = (
+            df_players.drop_duplicates(subset=["ID_Jugador"], keep="first")
+            .set_index("ID_Jugador")[["Posición", "Liga"]]
+            .reindex(medias.index)
+        )
+        self.por_posicion = _rango(medias, [jugadores["Posición"]])
+        self.por_liga = _rango(medias, [jugadores["Posición"], jugadores["Liga"]])
+
+    def jugador(self, id_jugador, por_liga: bool = False):
+        """Percentiles del jugador (métricas + Score), o None si no tiene informes."""
+        tabla = self.por_liga if por_liga else self.por_posicion
+        id_jugador = str(id_jugador)
+        if id_jugador not in tabla.index:
+            return None
+        return tabla.loc[id_jugador]
+
+    def score(self, por_liga: bool = False) -> pd.Series:
+        """Percentil del Score de cada jugador (índice ID_Jugador)."""
+        return (self.por_liga if por_liga else self.por_posicion)["Score"]
+
+
+@st.cache_resource(show_spinner=False)
+def obtener_percentiles() -> CachePorVersion:
+    """Percentiles del proceso por (versiones + alcance): `.obtener(clave, agregado, df_players)`."""
+    return CachePorVersion(PercentilesPosicion, MAX_PERCENTILES)
@@ -0,0 +1,96 @@
+# =========================================================
+# 🕸️ RADARES RENDERIZADOS Y CACHEADOS
+# =========================================================
+# - El radar jugador vs. referencia se dibuja una vez y se guarda
+#   como bytes (PNG o SVG) por (jugador, referencia, versión de
+#   datos): los reruns y las demás sesiones reusan la imagen
+# - Cada figura se cierra apenas se exporta (nada queda vivo en
+#   el registro de pyplot de un proceso que corre semanas)
+# - `lote` dibuja los radares de muchos jugadores para exportar,
+#   reusando los que ya estaban en cache
+# =========================================================
+
+import threading
+from io import BytesIO
+
+import matplotlib.pyplot as plt
+import numpy as np
+import streamlit as st
+
+
+MAX_IMAGENES = 512
+
+
+def dibujar_radar(prom_jugador: dict, prom_referencia: dict = None, formato: str = "png") -> bytes:
+    """Imagen del radar (jugador en cian, referencia en naranja)."""
+    categorias = list(prom_jugador.keys())
+    valores_j = [float(prom_jugador.get(c, 0)) for c in categorias]
+    valores_p = [float(prom_referencia.get(c, 0)) for c in categorias] if prom_referencia else [0] * len(categorias)
+
+    valores_j += valores_j[:1]
+    valores_p += valores_p[:1]
+
+    angles = np.linspace(0, 2 * np.pi, len(categorias), endpoint=False).tolist()
+    angles += angles[:1]
+
+    fig, ax = plt.subplots(figsize=(6, 6), subplot_kw=dict(polar=True))
+    try:
+        fig.patch.set_facecolor("#0e1117")
+        ax.set_facecolor("#0e1117")
+
+        ax.plot(angles, valores_j, color="cyan", linewidth=2)
+        ax.fill(angles, valores_j, color="cyan", alpha=0.25)
+
+        ax.plot(angles, valores_p, color="orange", linewidth=2)
+        ax.fill(angles, valores_p, color="orange", alpha=0.25)
+
+        ax.set_xticks(angles[:-1])
+        ax.set_xticklabels(categorias, color="white", fontsize=9)
+        ax.tick_params(colors="white")
+
+        buffer = BytesIO()
+        fig.savefig(buffer, format=formato, facecolor=fig.get_facecolor(), bbox_inches="tight")
+        return buffer.getvalue()
+    finally:
+        plt.close(fig)
+
+
+class RadaresCacheados:
+    def __init__(self, max_imagenes: int = MAX_IMAGENES):
+        self._lock = threading.Lock()
+        # pyplot no es thread-safe: se dibuja de a una figura por proceso
+        self._lock_dibujo = threading.Lock()
+        self._imagenes = {}
+        self._max = max_imagenes
+
+    def imagen(self, clave, prom_jugador: dict, prom_referencia: dict = None, formato: str = "png") -> bytes:
+        """
+        Bytes del radar de `clave` = (jugador, referencia, versión de datos).
+        Los promedios solo se usan si la imagen no estaba en cache.
+        """
+        clave = (clave, formato)
+        with self._lock:
+            imagen = self._imagenes.pop(clave, None)
+            if imagen is not None:
+                self._imagenes[clave] = imagen
+                return imagen
+
+        with self._lock_dibujo:
+            imagen = dibujar_radar(prom_jugador, prom_referencia, formato)
+
+        with self._lock:
+            self._imagenes[clave] = imagen
+            while len(self._imagenes) > self._max:
+                # La menos usada primero
+                self._imagenes.pop(next(iter(self._imagenes)))
+        return imagen
+
+    def lote(self, pedidos: list, formato: str = "png") -> list:
+        """Imágenes de [(clave, prom_jugador, prom_referencia), ...] en el mismo orden."""
+        return [self.imagen(clave, prom_j, prom_r, formato) for clave, prom_j, prom_r in pedidos]
+
+
+@st.cache_resource(show_spinner=False)
+def obtener_radares() -> RadaresCacheados:
+    """Cache de radares del proceso (compartido por todas las sesiones)."""
+    return RadaresCacheados()
@@ -0,0 +1,132 @@
+# =========================================================
+# 📏 REFERENCIAS POR POSICIÓN
+# =========================================================
+# - Por posición (y opcionalmente por posición + liga o
+#   posición + franja de edad): media, mediana y cuartiles de
+#   cada una de las METRICAS sobre los informes de esos jugadores
+# - Se calculan una vez por versión de datos y alcance; si a
+#   "Informes" solo se le agregaron filas al final (mismo linaje,
+#   data/cache.py), se recalculan
+#   únicamente los grupos que recibieron informes nuevos
+# - Reemplaza a calcular_promedios_posicion: abrir el radar de un
+#   jugador es una búsqueda, no un filtrado + promedio
+# =========================================================
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from data.cache import CachePorVersion, filas_conservadas
+from data.esquema import METRICAS
+
+
+MAX_ALCANCES = 32
+
+# Grupos disponibles: {nivel: columnas del groupby}
+NIVELES = {
+    "posicion": ("Posición",),
+    "liga": ("Posición", "Liga"),
+    "edad": ("Posición", "Franja_Edad"),
+}
+
+# Columnas de la vista informes × jugadores que se usan
+COLUMNAS = ["ID_Jugador", "Posición", "Liga", "Fecha_Nac_dt"] + METRICAS
+
+FRANJAS_EDAD = ["≤20", "21–23", "24–27", "28+"]
+ESTADISTICOS = {
+    "Media": lambda g: g.mean(),
+    "Mediana": lambda g: g.median(),
+    "Q1": lambda g: g.quantile(0.25),
+    "Q3": lambda g: g.quantile(0.75),
+}
+
+
+def franja_edad(fecha_nac: pd.Series, hoy=None) -> pd.Series:
+    """Franja de edad (Categorical) a partir de la fecha de nacimiento."""
+    hoy = pd.Timestamp.today().normalize() if hoy is None else pd.Timestamp(hoy)
+    edad = (hoy - fecha_nac).dt.days / 365.25
+    return pd.cut(edad, [-np.inf, 21, 24, 28, np.inf], right=False, labels=FRANJAS_EDAD)
+
+
+def _estadisticas(df: pd.DataFrame, columnas: tuple) -> pd.DataFrame:
+    """Una fila por grupo; columnas (estadístico, métrica) en float32 + "Informes"."""
+    grupos = df.groupby(list(columnas), observed=True)
+    tabla = pd.concat(
+        {nombre: func(grupos[METRICAS]) for nombre, func in ESTADISTICOS.items()},
+        axis=1,
+    ).astype("float32")
+    tabla[("Informes", "")] = grupos.size()
+    return tabla
+
+
+class ReferenciasPosicion:
+    def __init__(self, df: pd.DataFrame, previa=None):
+        """`df`: informes ⟕ jugadores con Posición, Liga, Fecha_Nac_dt y las METRICAS."""
+        n = filas_conservadas(previa.informes if previa is not None else None, df, "ID_Jugador")
+        agregado = n > 0
+
+        self.informes = df
+        nuevas = df.iloc[n:] if agregado else df
+        nuevas = nuevas.assign(Franja_Edad=franja_edad(nuevas["Fecha_Nac_dt"]))
+
+        if not agregado:
+            self.df = nuevas
+            self.tablas = {nivel: _estadisticas(self.df, cols) for nivel, cols in NIVELES.items()}
+            return
+
+        # Solo se agregaron informes: se recalculan los grupos que los recibieron
+        self.df = pd.concat([previa.df, nuevas]) if len(nuevas) else previa.df
+        self.tablas = {}
+        for nivel, cols in NIVELES.items():
+            tabla = previa.tablas[nivel]
+            if len(nuevas):
+                claves = pd.MultiIndex.from_frame(nuevas[list(cols)].astype(object)).unique()
+                tocados = pd.MultiIndex.from_frame(self.df[list(cols)].astype(object)).isin(claves)
+                recalculada = _estadisticas(self.df[tocados], cols)
+                tabla = pd.concat([tabla.drop(recalculada.index, errors="ignore"), recalculada]).sort_index()
+            self.tablas[nivel] = tabla
+
+    def referencia(self, posicion, liga=None, franja=None):
+        """
+        DataFrame estadístico × METRICAS del grupo y su cantidad de informes
+        ((None, 0) si el grupo no tiene informes). Se usa liga o franja, no ambas.
+        """
+        if liga is not None:
+            nivel, clave = "liga", (posicion, liga)
+        elif franja is not None:
+            nivel, clave = "edad", (posicion, franja)
+        else:
+            nivel, clave = "posicion", posicion
+
+        tabla = self.tablas[nivel]
+        if clave not in tabla.index:
+            return None, 0
+        fila = tabla.loc[clave]
+        datos = fila.drop("Informes").astype("float32").unstack(0)[list(ESTADISTICOS)]
+        return datos.reindex(METRICAS).T, int(fila[("Informes", "")])
+
+    def promedios(self, posicion, liga=None, franja=None):
+        """{métrica: media redondeada} como devolvía calcular_promedios_posicion (o None)."""
+        datos, _ = self.referencia(posicion, liga, franja)
+        if datos is None:
+            return None
+        return {m: round(float(v), 2) for m, v in datos.loc["Media"].items()}
+
+
+def _calcular(vista, alcance, previa=None) -> ReferenciasPosicion:
+    """La vista informes × jugadores solo se proyecta si hay que calcular."""
+    return ReferenciasPosicion(vista.proyectar(COLUMNAS, alcance), previa)
+
+
+@st.cache_resource(show_spinner=False)
+def obtener_referencias() -> CachePorVersion:
+    """
+    Referencias del proceso por (versión de "Jugadores", versión de "Informes",
+    alcance, linaje de "Informes"): `.obtener(clave, vista, alcance)`. Con la
+    misma versión de "Jugadores", el mismo alcance y el mismo linaje se
+    recalcula solo lo nuevo.
+    """
+    return CachePorVersion(
+        _calcular, MAX_ALCANCES,
+        reutilizable=lambda clave, anterior: clave[0] == anterior[0] and clave[2:] == anterior[2:],
+    )
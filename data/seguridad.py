@@ -0,0 +1,88 @@
+# =========================================================
+# 🔐 SEGURIDAD POR FILA (ROW-LEVEL SECURITY)
+# =========================================================
+# - Un scout ve solo sus informes ("Scout"), lo que él agregó a la
+#   lista corta ("Agregado_Por") y los jugadores relacionados
+# - Las vistas filtradas se cachean por (usuario, rol) y por la
+#   versión de las hojas de las que sale cada una:
+#       informes  ← "Informes"
+#       lista     ← "Lista corta"
+#       jugadores ← "Jugadores" + sus informes + su lista
+# - Si la hoja cambió pero la porción del usuario no, se conserva
+#   el mismo frame (lo derivado de él sigue valiendo)
+# - El admin recibe los frames completos, sin filtrar ni copiar
+# =========================================================
+
+import threading
+
+import pandas as pd
+import streamlit as st
+
+
+ROLES_SIN_FILTRO = ("admin",)
+MAX_USUARIOS = 64
+
+
+def _conservar(previo, nuevo: pd.DataFrame) -> pd.DataFrame:
+    """El frame previo si la porción no cambió (misma identidad para lo derivado)."""
+    if previo is not None and previo.equals(nuevo):
+        return previo
+    return nuevo
+
+
+class VistasPorUsuario:
+    def __init__(self, max_usuarios: int = MAX_USUARIOS):
+        self._lock = threading.Lock()
+        self._entradas = {}
+        self._max = max_usuarios
+
+    def vistas(self, usuario: str, rol: str, versiones: dict, df_players, df_reports, df_short) -> tuple:
+        """
+        (jugadores, informes, lista corta) visibles para el usuario.
+        `versiones` = {nombre_hoja: versión} tomadas ANTES de leer los frames.
+        """
+        if rol in ROLES_SIN_FILTRO:
+            return df_players, df_reports, df_short
+
+        clave = (usuario, rol)
+        with self._lock:
+            entrada = dict(self._entradas.get(clave, {}))
+
+        v_informes = versiones["Informes"]
+        v_lista = versiones["Lista corta"]
+        v_jugadores = (versiones["Jugadores"], v_informes, v_lista)
+
+        if entrada.get("v_informes") != v_informes:
+            entrada["informes"] = _conservar(
+                entrada.get("informes"), df_reports[df_reports["Scout"] == usuario]
+            )
+            entrada["v_informes"] = v_informes
+
+        if entrada.get("v_lista") != v_lista:
+            entrada["lista"] = _conservar(
+                entrada.get("lista"), df_short[df_short["Agregado_Por"] == usuario]
+            )
+            entrada["v_lista"] = v_lista
+
+        if entrada.get("v_jugadores") != v_jugadores:
+            # Jugadores relacionados (informes + lista corta)
+            ids = pd.concat([entrada["informes"]["ID_Jugador"], entrada["lista"]["ID_Jugador"]])
+            entrada["jugadores"] = _conservar(
+                entrada.get("jugadores"), df_players[df_players["ID_Jugador"].isin(ids)]
+            )
+            entrada["v_jugadores"] = v_jugadores
+
+        with self._lock:
+            self._entradas.pop(clave, None)
+            self._entradas[clave] = entrada
+            while len(self._entradas) > self._max:
+                # El usuario menos reciente primero
+                self._entradas.pop(next(iter(self._entradas)))
+
+        return entrada["jugadores"], entrada["informes"], entrada["lista"]
+
+
+@st.cache_resource(show_spinner=False)
+def obtener_vistas_usuario() -> VistasPorUsuario:
+    """Vistas filtradas del proceso (compartidas entre sesiones del mismo usuario)."""
+    return VistasPorUsuario()
@@ -0,0 +1,157 @@
+# =========================================================
+# 🔌 CONEXIÓN COMPARTIDA A GOOGLE SHEETS
+# =========================================================
+# - Un único cliente gspread por proceso (compartido por todas las sesiones)
+# - Autoriza una sola vez; google-auth renueva el token solo
+# - Registro de hojas (Worksheet) + metadatos por título
+# - El registro solo se invalida al crear o renombrar hojas
+# - Cada request HTTP pasa por el limitador de cuota compartido
+#   y por el circuit breaker (falla rápido si la API está caída)
+# =========================================================
+
+import os
+import json
+import threading
+from functools import partial
+
+import gspread
+import streamlit as st
+from google.oauth2.service_account import Credentials
+
+from data.circuito import obtener_circuito
+from data.cuota import ClienteLimitado, obtener_limitador
+
+
+def cargar_credenciales(creds_path: str, scope: tuple):
+    """
+    Credenciales de la service account: primero st.secrets,
+    después el archivo local. Lanza FileNotFoundError si no hay ninguna.
+    """
+    if "GOOGLE_SERVICE_ACCOUNT_JSON" in st.secrets:
+        creds_dict = json.loads(st.secrets["GOOGLE_SERVICE_ACCOUNT_JSON"])
+        return Credentials.from_service_account_info(creds_dict, scopes=list(scope))
+
+    if not os.path.exists(creds_path):
+        raise FileNotFoundError("Falta credentials.json o secreto en Streamlit Cloud.")
+    return Credentials.from_service_account_file(creds_path, scopes=list(scope))
+
+
+class ConexionSheets:
+    """
+    Cliente autorizado + libro abierto + registro de hojas por título.
+    Thread-safe: Streamlit atiende cada sesión en su propio hilo.
+    """
+
+    def __init__(self, credenciales, sheet_id: str, limitador=None, circuito=None):
+        self._credenciales = credenciales
+        self._sheet_id = sheet_id
+        self._limitador = limitador
+        self._circuito = circuito
+        if circuito is not None:
+            circuito.configurar_sonda(self.sondear)
+        self._lock = threading.RLock()
+        self._libro = None
+        self._hojas = {}
+        self._metadatos = {}
+        self._registro_cargado = False
+
+    # -----------------------------------------------------
+    # LIBRO
+    # -----------------------------------------------------
+    def libro(self):
+        """Spreadsheet abierto una sola vez (authorize + open_by_key)."""
+        with self._lock:
+            if self._libro is None:
+                # gspread.authorize usa una AuthorizedSession de google-auth,
+                # que refresca el access token al vencer sin volver a autorizar.
+                cliente = gspread.authorize(
+                    self._credenciales,
+                    http_client=partial(
+                        ClienteLimitado, limitador=self._limitador, circuito=self._circuito
+                    ),
+                )
+                self._libro = cliente.open_by_key(self._sheet_id)
+            return self._libro
+
+    def sondear(self):
+        """Request mínima (metadatos de Drive) para saber si la API responde."""
+        self.libro().get_lastUpdateTime()
+
+    # -----------------------------------------------------
+    # REGISTRO DE HOJAS
+    # -----------------------------------------------------
+    def _registrar(self, ws):
+        self._hojas[ws.title] = ws
+        self._metadatos[ws.title] = {
+            "id": ws.id,
+            "title": ws.title,
+            "row_count": ws.row_count,
+            "col_count": ws.col_count,
+        }
+
+    def _cargar_registro(self):
+        self._hojas = {}
+        self._metadatos = {}
+        for ws in self.libro().worksheets():
+            self._registrar(ws)
+        self._registro_cargado = True
+
+    def invalidar(self):
+        """Descarta el registro; se recarga en el próximo acceso."""
+        with self._lock:
+            self._hojas = {}
+            self._metadatos = {}
+            self._registro_cargado = False
+
+    def titulos(self) -> list:
+        with self._lock:
+            if not self._registro_cargado:
+                self._cargar_registro()
+            return list(self._hojas)
+
+    def hoja(self, nombre_hoja: str):
+        """
+        Worksheet cacheado por título, o None si no existe.
+        Ante un título desconocido recarga el registro una vez
+        (la hoja pudo crearse desde otra instancia o a mano).
+        """
+        with self._lock:
+            if not self._registro_cargado:
+                self._cargar_registro()
+            if nombre_hoja not in self._hojas:
+                self._cargar_registro()
+            return self._hojas.get(nombre_hoja)
+
+    def metadatos(self, nombre_hoja: str):
+        """id, title, row_count y col_count de la hoja (sin llamar a la API)."""
+        with self._lock:
+            if self.hoja(nombre_hoja) is None:
+                return None
+            return dict(self._metadatos[nombre_hoja])
+
+    def crear_hoja(self, nombre_hoja: str, columnas_base: list = None, rows: int = 500, cols: int = 20):
+        with self._lock:
+            ws = self.libro().add_worksheet(title=nombre_hoja, rows=rows, cols=cols)
+            if columnas_base:
+                ws.append_row(columnas_base)
+            self._registrar(ws)
+            return ws
+
+    def renombrar_hoja(self, nombre_actual: str, nombre_nuevo: str):
+        with self._lock:
+            ws = self.hoja(nombre_actual)
+            if ws is None:
+                raise KeyError(nombre_actual)
+            ws.update_title(nombre_nuevo)
+            self._hojas.pop(nombre_actual, None)
+            self._metadatos.pop(nombre_actual, None)
+            self._registrar(ws)
+            return ws
+
+
+@st.cache_resource(show_spinner=False)
+def obtener_conexion(sheet_id: str, creds_path: str, scope: tuple) -> ConexionSheets:
+    """Conexión única del proceso (st.cache_resource la comparte entre sesiones)."""
+    return ConexionSheets(
+        cargar_credenciales(creds_path, scope), sheet_id, obtener_limitador(), obtener_circuito()
+    )
@@ -0,0 +1,111 @@
+# =========================================================
+# 🧬 JUGADORES SIMILARES (K-NN SOBRE EL PERFIL DE MÉTRICAS)
+# =========================================================
+# - Perfil = media de las METRICAS del jugador (matriz de
+#   agregados), estandarizada dentro de su posición: "parecido"
+#   es relativo a lo que se espera de cada puesto
+# - Matriz NumPy float32 armada una vez por versión de datos y
+#   alcance; cada búsqueda es una operación vectorizada sobre las
+#   filas que pasan los filtros (posición, liga, edad) y un
+#   argpartition: milisegundos con decenas de miles de jugadores
+# - Distancia coseno o euclídea
+# =========================================================
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from data.cache import CachePorVersion
+
+
+MAX_INDICES = 32
+DISTANCIAS = ("coseno", "euclidea")
+
+
+def _estandarizar(matriz: np.ndarray, grupos: np.ndarray) -> np.ndarray:
+    """z-score de cada columna dentro de su grupo (código -1 = sin grupo: se usa el total)."""
+    z = np.empty_like(matriz)
+    for codigo in np.unique(grupos):
+        filas = grupos == codigo
+        bloque = matriz if codigo < 0 else matriz[filas]
+        desvio = bloque.std(axis=0)
+        z[filas] = (matriz[filas] - bloque.mean(axis=0)) / np.where(desvio > 0, desvio, 1)
+    return z
+
+
+class IndiceSimilares:
+    def __init__(self, agregado, df_players: pd.DataFrame, hoy=None):
+        self.ids = agregado.ids
+        self._pos = {id_jugador: pos for pos, id_jugador in enumerate(self.ids)}
+
+        jugadores = (
+            df_players.drop_duplicates(subset=["ID_Jugador"], keep="first")
+            .set_index("ID_Jugador")
+            .reindex(self.ids)
+        )
+        posicion = jugadores["Posición"].astype("category")
+        liga = jugadores["Liga"].astype("category")
+        self.posiciones = posicion.cat.codes.to_numpy()
+        self.ligas = liga.cat.codes.to_numpy()
+
+        hoy = pd.Timestamp.today().normalize() if hoy is None else pd.Timestamp(hoy)
+        self.edades = ((hoy - jugadores["Fecha_Nac_dt"]).dt.days / 365.25).to_numpy(dtype="float32")
+
+        self.perfiles = _estandarizar(agregado.media.astype("float32"), self.posiciones)
+        normas = np.linalg.norm(self.perfiles, axis=1, keepdims=True)
+        self._unitarios = self.perfiles / np.where(normas > 0, normas, 1)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def similares(
+        self,
+        id_jugador,
+        k: int = 10,
+        distancia: str = "coseno",
+        misma_posicion: bool = False,
+        misma_liga: bool = False,
+        edad: tuple = None,
+    ) -> pd.DataFrame:
+        """
+        Los `k` jugadores más cercanos (sin el propio) con su edad y su
+        distancia, del más parecido al menos. Vacío si el jugador no tiene informes.
+        """
+        pos = self._pos.get(str(id_jugador))
+        if pos is None:
+            return pd.DataFrame({"ID_Jugador": [], "Edad": [], "Distancia": []})
+
+        candidatos = np.ones(len(self.ids), dtype=bool)
+        candidatos[pos] = False
+        if misma_posicion:
+            candidatos &= self.posiciones == self.posiciones[pos]
+        if misma_liga:
+            candidatos &= self.ligas == self.ligas[pos]
+        if edad is not None:
+            # Sin fecha de nacimiento no se puede acotar por edad: se excluye
+            candidatos &= (self.edades >= edad[0]) & (self.edades <= edad[1])
+        filas = np.flatnonzero(candidatos)
+
+        if distancia == "coseno":
+            distancias = 1 - self._unitarios[filas] @ self._unitarios[pos]
+        elif distancia == "euclidea":
+            distancias = np.sqrt(((self.perfiles[filas] - self.perfiles[pos]) ** 2).sum(axis=1))
+        else:
+            raise ValueError(f"Distancia desconocida: {distancia} (usar {', '.join(DISTANCIAS)})")
+
+        k = min(k, len(filas))
+        if k == 0:
+            return pd.DataFrame({"ID_Jugador": [], "Edad": [], "Distancia": []})
+        cercanos = np.argpartition(distancias, k - 1)[:k]
+        cercanos = cercanos[np.argsort(distancias[cercanos], kind="stable")]
+        return pd.DataFrame({
+            "ID_Jugador": self.ids[filas[cercanos]],
+            "Edad": np.floor(self.edades[filas[cercanos]]),
+            "Distancia": distancias[cercanos].astype("float32"),
+        })
+
+
+@st.cache_resource(show_spinner=False)
+def obtener_similares() -> CachePorVersion:
+    """Índices de similitud del proceso por (versiones + alcance): `.obtener(clave, agregado, df_players)`."""
+    return CachePorVersion(IndiceSimilares, MAX_INDICES)
@@ -0,0 +1,373 @@
+# =========================================================
+# 🧪 GOOGLE SHEETS SIMULADO (EN MEMORIA, INSTRUMENTADO)
+# =========================================================
+# - Imita la superficie de gspread que usa la app:
+#       Spreadsheet: worksheets, worksheet, add_worksheet,
+#                    values_batch_get, batch_update, get_lastUpdateTime
+#       Worksheet:   get_all_records, get_all_values, append_row(s),
+#                    update, batch_update, clear, update_title
+# - Latencia configurable e inyección de HTTP 429
+# - Contadores por método: llamadas, bytes enviados y recibidos
+# - Se usa con SCOUTING_ALMACEN=simulado (ver data/almacen.py) o directo:
+#       libro = LibroSimulado.desde_csv(".")
+#       ...
+#       libro.estadisticas.resumen()
+# =========================================================
+
+import os
+import re
+import csv
+import json
+import time
+import random
+import threading
+from collections import defaultdict
+from datetime import datetime, timezone
+
+import requests
+from gspread.exceptions import APIError, WorksheetNotFound
+from gspread.utils import a1_to_rowcol, rowcol_to_a1
+
+from data.cuota import LimitadorCuota, ejecutar_con_cuota
+from data.loader import ARCHIVOS_CSV, valores_a_registros
+from data.sheets import ConexionSheets
+
+
+_A1 = re.compile(r"^([A-Z]*)(\d*)$")
+
+
+def _tamano(obj) -> int:
+    return len(json.dumps(obj, ensure_ascii=False, default=str).encode("utf-8"))
+
+
+def _a_texto(valor, value_input_option: str = "RAW") -> str:
+    """Como lo devuelve la API al leer (FORMATTED_VALUE)."""
+    if valor is None:
+        return ""
+    if isinstance(valor, bool):
+        return "TRUE" if valor else "FALSE"
+    if value_input_option == "USER_ENTERED" and isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    return str(valor)
+
+
+def _recortar(fila: list) -> list:
+    fila = list(fila)
+    while fila and fila[-1] == "":
+        fila.pop()
+    return fila
+
+
+def _columna(letras: str) -> int:
+    n = 0
+    for letra in letras:
+        n = n * 26 + (ord(letra) - 64)
+    return n
+
+
+def _parsear_rango(a1: str) -> tuple:
+    """'A5:AB' -> (5, 1, None, 28); None = abierto. Sin ':' es una sola celda."""
+    partes = a1.split(":") if a1 else ["", ""]
+    if len(partes) == 1:
+        partes = partes * 2
+    limites = []
+    for parte in partes:
+        m = _A1.match(parte.upper())
+        if not m:
+            raise ValueError(f"Rango inválido: {a1}")
+        letras, numero = m.groups()
+        limites.append((int(numero) if numero else None, _columna(letras) if letras else None))
+    (f1, c1), (f2, c2) = limites
+    return (f1 or 1, c1 or 1, f2, c2)
+
+
+def _separar_hoja(rango: str) -> tuple:
+    """"'Lista corta'!A1:B2" -> ("Lista corta", "A1:B2")."""
+    if "!" in rango:
+        hoja, a1 = rango.rsplit("!", 1)
+    else:
+        hoja, a1 = rango, ""
+    if hoja.startswith("'") and hoja.endswith("'"):
+        hoja = hoja[1:-1].replace("''", "'")
+    return hoja, a1
+
+
+# ---------------------------------------------------------
+# INSTRUMENTACIÓN
+# ---------------------------------------------------------
+class EstadisticasAPI:
+    """Llamadas y bytes por método (thread-safe)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self):
+        with self._lock:
+            self.llamadas = defaultdict(int)
+            self.bytes_enviados = defaultdict(int)
+            self.bytes_recibidos = defaultdict(int)
+            self.errores_429 = 0
+
+    def registrar(self, metodo: str, enviados: int, recibidos: int):
+        with self._lock:
+            self.llamadas[metodo] += 1
+            self.bytes_enviados[metodo] += enviados
+            self.bytes_recibidos[metodo] += recibidos
+
+    @property
+    def total_llamadas(self) -> int:
+        return sum(self.llamadas.values())
+
+    def resumen(self) -> dict:
+        with self._lock:
+            return {
+                "llamadas": dict(self.llamadas),
+                "total_llamadas": sum(self.llamadas.values()),
+                "bytes_enviados": sum(self.bytes_enviados.values()),
+                "bytes_recibidos": sum(self.bytes_recibidos.values()),
+                "errores_429": self.errores_429,
+            }
+
+
+def _respuesta_429() -> requests.Response:
+    respuesta = requests.Response()
+    respuesta.status_code = 429
+    respuesta._content = json.dumps({
+        "error": {"code": 429, "message": "Quota exceeded (simulado)", "status": "RESOURCE_EXHAUSTED"}
+    }).encode("utf-8")
+    return respuesta
+
+
+# ---------------------------------------------------------
+# WORKSHEET
+# ---------------------------------------------------------
+class HojaSimulada:
+    def __init__(self, libro, sheet_id: int, title: str, rows: int = 1000, cols: int = 26):
+        self.spreadsheet = libro
+        self.id = sheet_id
+        self.title = title
+        self.row_count = rows
+        self.col_count = cols
+        self._grilla = []
+
+    # -- acceso interno (sin contar llamadas) --
+    def _leer(self, f1=1, c1=1, f2=None, c2=None) -> list:
+        filas = self._grilla[f1 - 1: f2]
+        valores = [_recortar(fila[c1 - 1: c2]) for fila in filas]
+        while valores and not valores[-1]:
+            valores.pop()
+        return valores
+
+    def _escribir(self, fila: int, col: int, valores: list, value_input_option: str):
+        for i, valores_fila in enumerate(valores):
+            destino_fila = fila - 1 + i
+            while len(self._grilla) <= destino_fila:
+                self._grilla.append([])
+            destino = self._grilla[destino_fila]
+            if len(destino) < col - 1 + len(valores_fila):
+                destino.extend([""] * (col - 1 + len(valores_fila) - len(destino)))
+            for j, valor in enumerate(valores_fila):
+                destino[col - 1 + j] = _a_texto(valor, value_input_option)
+            self._grilla[destino_fila] = _recortar(destino)
+        self.row_count = max(self.row_count, len(self._grilla))
+
+    def _agregar(self, filas: list, value_input_option: str) -> dict:
+        ultima = len(self._leer())
+        self._escribir(ultima + 1, 1, filas, value_input_option)
+        # Misma forma que la respuesta de values.append
+        hasta = rowcol_to_a1(ultima + len(filas), max([len(f) for f in filas] + [1]))
+        return {"updates": {"updatedRange": f"'{self.title}'!A{ultima + 1}:{hasta}", "updatedRows": len(filas)}}
+
+    # -- superficie gspread --
+    def get_all_values(self) -> list:
+        return self.spreadsheet._llamar("get_all_values", None, lambda: [list(f) for f in self._leer()])
+
+    def get_all_records(self) -> list:
+        def _registros():
+            encabezado, filas = valores_a_registros(self._leer())
+            return [dict(zip(encabezado, fila)) for fila in filas]
+        return self.spreadsheet._llamar("get_all_records", None, _registros)
+
+    def append_row(self, values: list, value_input_option: str = "RAW", **kwargs):
+        return self.append_rows([values], value_input_option=value_input_option)
+
+    def append_rows(self, values: list, value_input_option: str = "RAW", **kwargs):
+        return self.spreadsheet._llamar(
+            "append_rows", values, lambda: self._agregar(values, value_input_option), escribe=True
+        )
+
+    def update(self, values=None, range_name=None, value_input_option: str = "RAW", **kwargs):
+        # gspread acepta también el orden viejo: update("A1", [[...]])
+        if isinstance(values, str):
+            values, range_name = range_name, values
+        fila, col = a1_to_rowcol((range_name or "A1").split(":")[0])
+        return self.spreadsheet._llamar(
+            "update", values, lambda: self._escribir(fila, col, values, value_input_option), escribe=True
+        )
+
+    def batch_update(self, data: list, value_input_option: str = "RAW", **kwargs):
+        def _aplicar():
+            for bloque in data:
+                fila, col = a1_to_rowcol(bloque["range"].split("!")[-1].split(":")[0])
+                self._escribir(fila, col, bloque["values"], value_input_option)
+        return self.spreadsheet._llamar("batch_update_valores", data, _aplicar, escribe=True)
+
+    def clear(self):
+        def _limpiar():
+            self._grilla = []
+        return self.spreadsheet._llamar("clear", None, _limpiar, escribe=True)
+
+    def update_title(self, title: str):
+        def _renombrar():
+            self.title = title
+        return self.spreadsheet._llamar("update_title", title, _renombrar, escribe=True)
+
+
+# ---------------------------------------------------------
+# SPREADSHEET
+# ---------------------------------------------------------
+class LibroSimulado:
+    """
+    Libro en memoria. `latencia_seg` se suma a cada llamada (más un jitter
+    de hasta `jitter_seg`); `prob_429` o `forzar_429(n)` hacen fallar llamadas
+    con el mismo APIError que lanza gspread ante un exceso de cuota.
+    """
+
+    def __init__(
+        self,
+        latencia_seg: float = 0.0,
+        jitter_seg: float = 0.0,
+        prob_429: float = 0.0,
+        semilla: int = None,
+        limitador: LimitadorCuota = None,
+        circuito=None,
+    ):
+        self.id = "libro-simulado"
+        self.title = "ScoutingApp (simulado)"
+        self.latencia_seg = latencia_seg
+        self.jitter_seg = jitter_seg
+        self.prob_429 = prob_429
+        # Con limitador, cada llamada pasa por la cuota y el circuito
+        # igual que las requests HTTP reales (ClienteLimitado)
+        self.limitador = limitador
+        self.circuito = circuito
+        self.estadisticas = EstadisticasAPI()
+        self._azar = random.Random(semilla)
+        self._lock = threading.RLock()
+        self._hojas = []
+        self._forzados_429 = 0
+        self._modificado = datetime.now(timezone.utc).isoformat()
+
+    @classmethod
+    def desde_csv(cls, carpeta: str = ".", archivos: dict = None, **kwargs):
+        libro = cls(**kwargs)
+        for nombre, archivo in (archivos or ARCHIVOS_CSV).items():
+            ruta = os.path.join(carpeta, archivo)
+            if not os.path.exists(ruta):
+                continue
+            with open(ruta, newline="", encoding="utf-8") as f:
+                grilla = [fila for fila in csv.reader(f)]
+            hoja = libro._nueva_hoja(nombre, max(len(grilla), 1000), 26)
+            hoja._escribir(1, 1, grilla, "RAW")
+        return libro
+
+    def forzar_429(self, llamadas: int = 1):
+        """Las próximas `llamadas` responden 429."""
+        with self._lock:
+            self._forzados_429 += llamadas
+
+    # -- núcleo: latencia, 429 y contadores --
+    def _llamar(self, metodo: str, enviado, operacion, escribe: bool = False):
+        if self.limitador is None:
+            return self._ejecutar(metodo, enviado, operacion, escribe)
+        return ejecutar_con_cuota(
+            lambda: self._ejecutar(metodo, enviado, operacion, escribe),
+            self.limitador,
+            self.circuito,
+        )
+
+    def _ejecutar(self, metodo: str, enviado, operacion, escribe: bool):
+        demora = self.latencia_seg + (self._azar.uniform(0, self.jitter_seg) if self.jitter_seg else 0)
+        if demora:
+            time.sleep(demora)
+        with self._lock:
+            falla = self._forzados_429 > 0 or (self.prob_429 and self._azar.random() < self.prob_429)
+            if falla:
+                self._forzados_429 = max(self._forzados_429 - 1, 0)
+                self.estadisticas.errores_429 += 1
+                self.estadisticas.registrar(metodo, _tamano(enviado) if enviado is not None else 0, 0)
+                raise APIError(_respuesta_429())
+            resultado = operacion()
+            if escribe:
+                self._modificado = datetime.now(timezone.utc).isoformat()
+        self.estadisticas.registrar(
+            metodo,
+            _tamano(enviado) if enviado is not None else 0,
+            _tamano(resultado) if resultado is not None else 0,
+        )
+        return resultado
+
+    def _nueva_hoja(self, title: str, rows: int, cols: int) -> HojaSimulada:
+        hoja = HojaSimulada(self, len(self._hojas) + 1, title, rows, cols)
+        self._hojas.append(hoja)
+        return hoja
+
+    def _hoja(self, title: str) -> HojaSimulada:
+        for hoja in self._hojas:
+            if hoja.title == title:
+                return hoja
+        raise WorksheetNotFound(title)
+
+    # -- superficie gspread --
+    def worksheets(self) -> list:
+        return self._llamar("worksheets", None, lambda: list(self._hojas))
+
+    def worksheet(self, title: str) -> HojaSimulada:
+        return self._llamar("worksheet", title, lambda: self._hoja(title))
+
+    def add_worksheet(self, title: str, rows: int = 1000, cols: int = 26, **kwargs) -> HojaSimulada:
+        return self._llamar("add_worksheet", title, lambda: self._nueva_hoja(title, rows, cols), escribe=True)
+
+    def get_lastUpdateTime(self) -> str:
+        return self._llamar("get_lastUpdateTime", None, lambda: self._modificado)
+
+    def values_batch_get(self, ranges: list, params: dict = None) -> dict:
+        def _leer():
+            value_ranges = []
+            for rango in ranges:
+                nombre, a1 = _separar_hoja(rango)
+                hoja = self._hoja(nombre)
+                valores = hoja._leer(*_parsear_rango(a1)) if a1 else hoja._leer()
+                entrada = {"range": rango, "majorDimension": "ROWS"}
+                if valores:
+                    entrada["values"] = valores
+                value_ranges.append(entrada)
+            return {"spreadsheetId": self.id, "valueRanges": value_ranges}
+        return self._llamar("values_batch_get", ranges, _leer)
+
+    def batch_update(self, body: dict) -> dict:
+        def _aplicar():
+            for request in body.get("requests", []):
+                borrado = request.get("deleteDimension")
+                if not borrado or borrado["range"].get("dimension") != "ROWS":
+                    raise NotImplementedError(f"Request no simulada: {list(request)}")
+                rango = borrado["range"]
+                hoja = next(h for h in self._hojas if h.id == rango["sheetId"])
+                del hoja._grilla[rango["startIndex"]:rango["endIndex"]]
+            return {"spreadsheetId": self.id, "replies": [{} for _ in body.get("requests", [])]}
+        return self._llamar("batch_update", body, _aplicar, escribe=True)
+
+
+# ---------------------------------------------------------
+# CONEXIÓN SOBRE EL LIBRO SIMULADO
+# ---------------------------------------------------------
+class ConexionSimulada(ConexionSheets):
+    """ConexionSheets que en vez de autorizar contra Google usa un LibroSimulado."""
+
+    def __init__(self, libro: LibroSimulado, limitador: LimitadorCuota = None, circuito=None):
+        super().__init__(None, libro.id, limitador, circuito)
+        if limitador is not None:
+            libro.limitador = limitador
+            libro.circuito = circuito
+        self._libro = libro
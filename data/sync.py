@@ -0,0 +1,303 @@
+# =========================================================
+# 🔁 SINCRONIZACIÓN INCREMENTAL (HOJAS APPEND-ONLY)
+# =========================================================
+# - Guarda por proceso la última grilla leída de cada hoja
+# - Hojas incrementales ("Informes"): solo se baja la cola nueva
+# - Chequeo barato de cambios: modifiedTime de Drive + fila de solape;
+#   si el libro cambió y no llegaron filas nuevas, se relee completa
+# - Filas editadas: la app marca la hoja como "sucia" y además
+#   se fuerza una resincronización completa cada RESYNC_COMPLETO_SEG
+# - Antes de planear una escritura sobre la grilla cacheada se
+#   verifican sus columnas clave con una lectura angosta
+# =========================================================
+
+import time
+import threading
+from collections import defaultdict
+
+import streamlit as st
+from gspread.utils import absolute_range_name, rowcol_to_a1
+
+from data.loader import COLUMNAS_BASE, leer_rangos, normalizar_id, valores_a_dataframe
+
+
+HOJAS_INCREMENTALES = ("Informes",)
+RESYNC_COMPLETO_SEG = 600
+
+
+def _recortar(fila: list) -> list:
+    """La API omite las celdas vacías al final de cada fila."""
+    fila = [("" if v is None else str(v)) for v in fila]
+    while fila and fila[-1] == "":
+        fila.pop()
+    return fila
+
+
+def _letra_columna(n: int) -> str:
+    return rowcol_to_a1(1, max(n, 1))[:-1]
+
+
+class EstadoHoja:
+    """Última grilla conocida de una hoja (encabezado en la fila 0)."""
+
+    def __init__(self, grilla: list, modificado=None):
+        self.grilla = grilla
+        self.modificado = modificado
+        self.ultima_completa = time.time()
+        self.sucia = False
+        self._indices = {}
+
+    @property
+    def filas_fisicas(self) -> int:
+        # Fila física (1-based) de la última fila con datos
+        return len(self.grilla)
+
+    def agregar_filas(self, filas: list):
+        self.grilla = self.grilla + filas
+        self._indices = {}
+
+    def indice(self, columnas: tuple) -> dict:
+        """
+        {claves normalizadas: [filas físicas]} para las columnas pedidas.
+        Se arma una vez por grilla y se reutiliza hasta que la grilla cambie.
+        """
+        if columnas not in self._indices:
+            indice = {}
+            encabezado = self.grilla[0] if self.grilla else []
+            if all(c in encabezado for c in columnas):
+                posiciones = [encabezado.index(c) for c in columnas]
+                for fila_fisica, fila in enumerate(self.grilla[1:], start=2):
+                    clave = tuple(
+                        normalizar_id(fila[p] if p < len(fila) else "") for p in posiciones
+                    )
+                    indice.setdefault(clave, []).append(fila_fisica)
+            self._indices[columnas] = indice
+        return self._indices[columnas]
+
+
+class SincronizadorHojas:
+    def __init__(self, incrementales=HOJAS_INCREMENTALES, resync_completo_seg=RESYNC_COMPLETO_SEG):
+        self._incrementales = set(incrementales)
+        self._resync_completo_seg = resync_completo_seg
+        # Solo protege el estado: las requests corren sin él
+        self._lock = threading.RLock()
+        self._estados = {}
+        # {nombre_hoja: contador}: sube con cada marca, así una lectura que
+        # empezó antes de una escritura no borra la marca de "sucia"
+        self._marcas = defaultdict(int)
+
+    # -----------------------------------------------------
+    # MARCAS
+    # -----------------------------------------------------
+    def marcar_sucia(self, nombre_hoja: str):
+        """Una fila existente cambió o se borró: la próxima lectura es completa."""
+        with self._lock:
+            self._marcas[nombre_hoja] += 1
+            estado = self._estados.get(nombre_hoja)
+            if estado is not None:
+                estado.sucia = True
+
+    def descartar(self, nombre_hoja: str = None):
+        with self._lock:
+            if nombre_hoja is None:
+                for nombre in self._estados:
+                    self._marcas[nombre] += 1
+                self._estados = {}
+            else:
+                self._marcas[nombre_hoja] += 1
+                self._estados.pop(nombre_hoja, None)
+
+    def estado(self, nombre_hoja: str):
+        return self._estados.get(nombre_hoja)
+
+    def filas_sincronizadas(self, nombre_hoja: str) -> int:
+        estado = self._estados.get(nombre_hoja)
+        return max(estado.filas_fisicas - 1, 0) if estado else 0
+
+    # -----------------------------------------------------
+    # PLAN DE LECTURA
+    # -----------------------------------------------------
+    def _es_incremental(self, nombre_hoja: str) -> bool:
+        estado = self._estados.get(nombre_hoja)
+        if nombre_hoja not in self._incrementales or estado is None or estado.sucia:
+            return False
+        if not estado.grilla:
+            return False
+        return time.time() - estado.ultima_completa < self._resync_completo_seg
+
+    def _rangos(self, nombre_hoja: str) -> list:
+        if not self._es_incremental(nombre_hoja):
+            return [absolute_range_name(nombre_hoja)]
+
+        estado = self._estados[nombre_hoja]
+        ultima_col = _letra_columna(len(estado.grilla[0]))
+        # Encabezado + cola desde la última fila conocida (fila de solape)
+        return [
+            absolute_range_name(nombre_hoja, "1:1"),
+            absolute_range_name(nombre_hoja, f"A{estado.filas_fisicas}:{ultima_col}"),
+        ]
+
+    def _aplicar_incremental(self, nombre_hoja: str, encabezado: list, cola: list, modificado) -> bool:
+        estado = self._estados[nombre_hoja]
+        encabezado_actual = _recortar(encabezado[0]) if encabezado else []
+        if encabezado_actual != _recortar(estado.grilla[0]):
+            return False
+        if not cola or _recortar(cola[0]) != _recortar(estado.grilla[-1]):
+            # La fila de solape cambió: hubo borrados o ediciones al final
+            return False
+        if len(cola) <= 1 and modificado is not None and modificado != estado.modificado:
+            # El libro cambió pero no hay filas nuevas: la edición fue a mitad de hoja
+            return False
+        if len(cola) > 1:
+            estado.agregar_filas(cola[1:])
+        return True
+
+    def _modificado(self, libro):
+        """modifiedTime de Drive: una llamada de metadatos, sin leer valores."""
+        try:
+            return libro.get_lastUpdateTime()
+        except Exception:
+            return None
+
+    def _sin_cambios(self, nombres_hojas: list, modificado) -> bool:
+        if modificado is None:
+            return False
+        for nombre in nombres_hojas:
+            estado = self._estados.get(nombre)
+            if estado is None or estado.sucia or estado.modificado != modificado:
+                return False
+        return True
+
+    # -----------------------------------------------------
+    # LECTURA
+    # -----------------------------------------------------
+    def _instalar(self, nombre_hoja: str, grilla: list, modificado, marca: int) -> list:
+        """Guarda una lectura completa (con el lock tomado)."""
+        estado = EstadoHoja(grilla, modificado)
+        # Hubo una escritura mientras se leía: puede no estar en la grilla
+        estado.sucia = self._marcas[nombre_hoja] != marca
+        self._estados[nombre_hoja] = estado
+        return grilla
+
+    def leer_valores(self, libro, nombres_hojas: list) -> dict:
+        """
+        {nombre_hoja: grilla} actualizando solo lo necesario en una
+        request values_batch_get (dos si alguna cola no coincide).
+        El lock cubre solo el plan y la instalación: una request lenta
+        no frena las lecturas de las demás sesiones.
+        """
+        modificado = self._modificado(libro)
+        with self._lock:
+            if self._sin_cambios(nombres_hojas, modificado):
+                return {nombre: self._estados[nombre].grilla for nombre in nombres_hojas}
+            planes = {nombre: self._rangos(nombre) for nombre in nombres_hojas}
+            previos = {nombre: self._estados.get(nombre) for nombre in nombres_hojas}
+            filas = {nombre: e.filas_fisicas if e is not None else 0 for nombre, e in previos.items()}
+            marcas = {nombre: self._marcas[nombre] for nombre in nombres_hojas}
+
+        rangos = [r for nombre in nombres_hojas for r in planes[nombre]]
+        grillas = iter(leer_rangos(libro, rangos))
+        resultados = {nombre: [next(grillas) for _ in planes[nombre]] for nombre in nombres_hojas}
+
+        valores = {}
+        completas = []
+        with self._lock:
+            for nombre in nombres_hojas:
+                resultado = resultados[nombre]
+                if len(resultado) == 1:
+                    valores[nombre] = self._instalar(nombre, resultado[0], modificado, marcas[nombre])
+                    continue
+                estado = self._estados.get(nombre)
+                if estado is not previos[nombre] or estado.filas_fisicas != filas[nombre]:
+                    # Otra sesión la actualizó mientras se leía: vale la suya
+                    if estado is None:
+                        completas.append(nombre)
+                    else:
+                        valores[nombre] = estado.grilla
+                elif self._aplicar_incremental(nombre, *resultado, modificado):
+                    estado.modificado = modificado
+                    valores[nombre] = estado.grilla
+                else:
+                    completas.append(nombre)
+
+        # Solape inconsistente: segunda lectura, completa, solo de esas hojas
+        if completas:
+            leidas = leer_rangos(libro, [absolute_range_name(nombre) for nombre in completas])
+            with self._lock:
+                for nombre, grilla in zip(completas, leidas):
+                    valores[nombre] = self._instalar(nombre, grilla, modificado, marcas[nombre])
+
+        return {nombre: valores[nombre] for nombre in nombres_hojas}
+
+    def grilla_verificada(self, libro, nombre_hoja: str, columnas: tuple) -> list:
+        """
+        Grilla sobre la que se puede planear una escritura. modifiedTime tarda
+        en moverse y no ve a tiempo las ediciones a mitad de hoja: si la grilla
+        no se acaba de leer completa, se comparan el encabezado y las `columnas`
+        clave con una request angosta. Si algo difiere (filas insertadas,
+        borradas o movidas) se relee la hoja entera.
+        """
+        inicio = time.time()
+        grilla = self.leer_valores(libro, [nombre_hoja])[nombre_hoja]
+        with self._lock:
+            estado = self._estados.get(nombre_hoja)
+            marca = self._marcas[nombre_hoja]
+        if estado is not None and estado.ultima_completa >= inicio:
+            return grilla
+
+        encabezado = grilla[0] if grilla else []
+        if grilla and all(c in encabezado for c in columnas):
+            posiciones = [encabezado.index(c) for c in columnas]
+            letras = [_letra_columna(p + 1) for p in posiciones]
+            cabecera, *leidas = leer_rangos(libro, [absolute_range_name(nombre_hoja, "1:1")] + [
+                absolute_range_name(nombre_hoja, f"{letra}2:{letra}") for letra in letras
+            ])
+            if _recortar(cabecera[0] if cabecera else []) == _recortar(encabezado) and all(
+                _recortar([fila[0] if fila else "" for fila in leida])
+                == _recortar([fila[p] if p < len(fila) else "" for fila in grilla[1:]])
+                for p, leida in zip(posiciones, leidas)
+            ):
+                return grilla
+
+        # La grilla cacheada ya no es la de la hoja
+        grilla = leer_rangos(libro, [absolute_range_name(nombre_hoja)])[0]
+        with self._lock:
+            return self._instalar(nombre_hoja, grilla, estado.modificado if estado is not None else None, marca)
+
+    def leer_tablas(self, libro, nombres_hojas: list) -> dict:
+        valores = self.leer_valores(libro, nombres_hojas)
+        return {
+            nombre: valores_a_dataframe(valores[nombre], COLUMNAS_BASE.get(nombre))
+            for nombre in nombres_hojas
+        }
+
+
+def leer_hojas(conexion, sincronizador: SincronizadorHojas, nombres_hojas: list, espejo=None) -> dict:
+    """
+    {nombre_hoja: DataFrame} con IDs de jugador normalizados.
+    Crea las hojas que falten. No usa st.*: sirve también en hilos de fondo.
+    Con `espejo` (data/espejo.py) deja copiada cada grilla leída.
+    """
+    for nombre in nombres_hojas:
+        if conexion.hoja(nombre) is None:
+            conexion.crear_hoja(nombre, COLUMNAS_BASE.get(nombre))
+
+    tablas = sincronizador.leer_tablas(conexion.libro(), nombres_hojas)
+    if espejo is not None:
+        for nombre in nombres_hojas:
+            estado = sincronizador.estado(nombre)
+            try:
+                espejo.guardar_grilla(nombre, estado.grilla, estado.modificado)
+            except Exception:
+                # El espejo es un respaldo: si falla, la lectura sigue valiendo
+                pass
+    for df in tablas.values():
+        if not df.empty and "ID_Jugador" in df.columns:
+            df["ID_Jugador"] = df["ID_Jugador"].astype(str)
+    return tablas
+
+
+@st.cache_resource(show_spinner=False)
+def obtener_sincronizador() -> SincronizadorHojas:
+    """Estado de sincronización único del proceso."""
+    return SincronizadorHojas()
@@ -0,0 +1,59 @@
+# =========================================================
+# 🔗 VISTA MATERIALIZADA INFORMES × JUGADORES
+# =========================================================
+# - Un único merge informes ⟕ jugadores por versión de datos,
+#   compartido por todas las sesiones y secciones
+# - Cada sección toma solo las columnas (y el alcance del scout)
+#   que necesita con `proyectar`
+# - Si "Jugadores" no cambió y a "Informes" solo se le agregaron
+#   filas al final (mismo linaje, data/cache.py), se unen
+#   únicamente las nuevas
+# =========================================================
+
+import pandas as pd
+import streamlit as st
+
+from data.cache import CachePorVersion, filas_conservadas
+
+
+def _unir(df_reports: pd.DataFrame, jugadores: pd.DataFrame) -> pd.DataFrame:
+    return df_reports.merge(jugadores, on="ID_Jugador", how="left", suffixes=("", "_jug"))
+
+
+class VistaInformesJugadores:
+    def __init__(self, df_reports: pd.DataFrame, df_players: pd.DataFrame, previa=None):
+        self.informes = df_reports
+
+        n = filas_conservadas(previa.informes if previa is not None else None, df_reports, "ID_Informe")
+        if n:
+            # Solo se agregaron informes al final: se unen las filas nuevas
+            self.jugadores = previa.jugadores
+            nuevas = _unir(df_reports.iloc[n:], self.jugadores)
+            self.df = pd.concat([previa.df, nuevas], ignore_index=True) if len(nuevas) else previa.df
+        else:
+            self.jugadores = df_players.drop_duplicates(subset=["ID_Jugador"], keep="first")
+            self.df = _unir(df_reports, self.jugadores)
+
+    def proyectar(self, columnas: list = None, scout: str = None) -> pd.DataFrame:
+        """Filas (solo las de `scout` si se indica) con las columnas pedidas que existan."""
+        df = self.df
+        if scout is not None:
+            df = df[df["Scout"] == scout]
+        if columnas is not None:
+            df = df[[c for c in columnas if c in df.columns]]
+        # Nunca el objeto compartido: agregar columnas no debe tocar la vista
+        return df if df is not self.df else df.copy(deep=False)
+
+
+@st.cache_resource(show_spinner=False)
+def obtener_vistas() -> CachePorVersion:
+    """
+    Vista del proceso por (versión de "Jugadores", versión de "Informes",
+    linaje de "Informes"): `.obtener(clave, df_reports, df_players)`. Solo se
+    guarda la actual; con la misma versión de "Jugadores" y el mismo linaje
+    se extiende la anterior.
+    """
+    return CachePorVersion(
+        VistaInformesJugadores, 1,
+        reutilizable=lambda clave, anterior: clave[0] == anterior[0] and clave[2] == anterior[2],
+    )
@@ -0,0 +1,222 @@
+# =========================================================
+# ✍️ ESCRITURAS POR DIFERENCIA
+# =========================================================
+# - Compara el DataFrame entrante con la grilla actual por ID
+# - Solo viaja lo que cambió: un batch_update con las celdas
+#   modificadas + un append_rows con los IDs nuevos
+# - Dos guardados de filas distintas ya no se pisan entre sí
+# - Borrado por fila física (delete de filas, nunca clear + rewrite)
+# =========================================================
+
+import math
+
+from gspread.utils import a1_to_rowcol, absolute_range_name, rowcol_to_a1
+
+from data.loader import normalizar_id
+
+
+def a_celda(valor):
+    """Valor serializable para la API (sin NaN ni tipos numpy)."""
+    if valor is None:
+        return ""
+    if hasattr(valor, "item"):
+        valor = valor.item()
+    if isinstance(valor, float) and math.isnan(valor):
+        return ""
+    return valor
+
+
+def _mismo_valor(actual, nuevo) -> bool:
+    """Compara como lo muestra Sheets: '2' y 2.0 son el mismo valor."""
+    a = "" if actual is None else str(actual).strip()
+    b = str(a_celda(nuevo)).strip()
+    if a == b:
+        return True
+    try:
+        return float(a.replace(",", ".")) == float(b.replace(",", "."))
+    except ValueError:
+        return False
+
+
+def _rango_fila(fila: int, col_desde: int, col_hasta: int) -> str:
+    return f"{rowcol_to_a1(fila, col_desde)}:{rowcol_to_a1(fila, col_hasta)}"
+
+
+def _tramos(columnas: list) -> list:
+    """[2, 3, 4, 7] -> [(2, 4), (7, 7)] (columnas contiguas en un solo rango)."""
+    tramos = []
+    for c in sorted(columnas):
+        if tramos and c == tramos[-1][1] + 1:
+            tramos[-1] = (tramos[-1][0], c)
+        else:
+            tramos.append((c, c))
+    return tramos
+
+
+def indice_por_id(grilla: list, id_col: str) -> dict:
+    """{id normalizado: fila física (1-based)} a partir de la grilla."""
+    if not grilla or id_col not in grilla[0]:
+        return {}
+    pos = grilla[0].index(id_col)
+    indice = {}
+    for i, fila in enumerate(grilla[1:], start=2):
+        if pos < len(fila):
+            clave = normalizar_id(fila[pos])
+            if clave and clave not in indice:
+                indice[clave] = i
+    return indice
+
+
+def calcular_diferencias(grilla: list, df, id_col: str = None) -> dict:
+    """
+    Plan mínimo de escritura para llevar `grilla` a contener `df`.
+
+    Devuelve:
+        encabezado : encabezado final (con columnas nuevas al final)
+        rangos     : [{"range": "C5:E5", "values": [[...]]}] para batch_update
+        nuevas     : filas completas para append_rows
+    """
+    encabezado = list(grilla[0]) if grilla else []
+    columnas_nuevas = [c for c in df.columns if c not in encabezado]
+    encabezado_final = encabezado + columnas_nuevas
+    rangos = []
+
+    if columnas_nuevas and encabezado:
+        desde = len(encabezado) + 1
+        rangos.append({
+            "range": _rango_fila(1, desde, len(encabezado_final)),
+            "values": [columnas_nuevas],
+        })
+
+    posiciones = {c: encabezado_final.index(c) for c in df.columns}
+    registros = df.to_dict("records")
+    nuevas = []
+
+    if id_col and id_col in df.columns:
+        indice = indice_por_id(grilla, id_col)
+        for registro in registros:
+            fila_fisica = indice.get(normalizar_id(registro[id_col]))
+            if fila_fisica is None:
+                nuevas.append(registro)
+                continue
+
+            actual = grilla[fila_fisica - 1]
+            cambios = {}
+            for col, valor in registro.items():
+                pos = posiciones[col]
+                previo = actual[pos] if pos < len(actual) else ""
+                if not _mismo_valor(previo, valor):
+                    cambios[pos + 1] = a_celda(valor)
+
+            for desde, hasta in _tramos(list(cambios)):
+                rangos.append({
+                    "range": _rango_fila(fila_fisica, desde, hasta),
+                    "values": [[cambios[c] for c in range(desde, hasta + 1)]],
+                })
+    else:
+        # Sin ID: se agregan solo las filas que no existen idénticas
+        existentes = {
+            tuple(str(v).strip() for v in fila) for fila in grilla[1:]
+        }
+        for registro in registros:
+            fila = [str(a_celda(registro.get(c, ""))).strip() for c in encabezado_final]
+            while fila and fila[-1] == "":
+                fila.pop()
+            if tuple(fila) not in existentes:
+                nuevas.append(registro)
+
+    filas_nuevas = [
+        [a_celda(registro.get(c, "")) for c in encabezado_final]
+        for registro in nuevas
+    ]
+
+    return {"encabezado": encabezado_final, "rangos": rangos, "nuevas": filas_nuevas}
+
+
+def a_texto(valor) -> str:
+    """Valor de celda tal como queda guardado en una grilla de strings."""
+    return str(a_celda(valor))
+
+
+def aplicar_a_grilla(grilla: list, plan: dict) -> list:
+    """Grilla resultante de aplicar el plan en local (mismo efecto que el batch_update + append_rows de la cola)."""
+    nueva = [list(fila) for fila in grilla]
+    for rango in plan["rangos"]:
+        fila, col = a1_to_rowcol(rango["range"].split(":")[0])
+        valores = rango["values"][0]
+        while len(nueva) < fila:
+            nueva.append([])
+        destino = nueva[fila - 1]
+        destino.extend([""] * (col - 1 + len(valores) - len(destino)))
+        for i, valor in enumerate(valores):
+            destino[col - 1 + i] = a_texto(valor)
+    nueva.extend([[a_texto(v) for v in fila] for fila in plan["nuevas"]])
+    return nueva
+
+
+# ---------------------------------------------------------
+# BORRADO POR FILA
+# ---------------------------------------------------------
+class FilaDesplazadaError(Exception):
+    """La fila indexada ya no contiene el registro esperado."""
+
+
+def agrupar_contiguas(filas: list) -> list:
+    """[9, 4, 5, 6] -> [(9, 9), (4, 6)] (de abajo hacia arriba)."""
+    return sorted(_tramos(filas), reverse=True)
+
+
+def verificar_filas(ws, filas: list, filtro: dict) -> bool:
+    """
+    Relee SOLO las filas candidatas (una request) y confirma que
+    siguen conteniendo los valores del filtro.
+    """
+    if not filas:
+        return True
+    respuesta = ws.spreadsheet.values_batch_get(
+        [absolute_range_name(ws.title, "1:1")] +
+        [absolute_range_name(ws.title, f"{f}:{f}") for f in filas]
+    )
+    grillas = [(vr.get("values") or [[]]) for vr in respuesta.get("valueRanges", [])]
+    encabezado = grillas[0][0] if grillas and grillas[0] else []
+    if any(c not in encabezado for c in filtro):
+        return False
+
+    for grilla in grillas[1:]:
+        fila = grilla[0] if grilla else []
+        for col, esperado in filtro.items():
+            pos = encabezado.index(col)
+            actual = fila[pos] if pos < len(fila) else ""
+            if normalizar_id(actual) != normalizar_id(esperado):
+                return False
+    return True
+
+
+def eliminar_filas(ws, filas: list, filtro: dict) -> int:
+    """
+    Borra las filas físicas indicadas tras verificar que siguen siendo
+    las del filtro. Tramos contiguos en un único batch_update, de abajo
+    hacia arriba para que los índices no se corran.
+    """
+    if not filas:
+        return 0
+    if not verificar_filas(ws, filas, filtro):
+        raise FilaDesplazadaError(
+            "La hoja cambió desde la última lectura; recargá los datos e intentá de nuevo."
+        )
+
+    requests = [
+        {
+            "deleteDimension": {
+                "range": {
+                    "sheetId": ws.id,
+                    "dimension": "ROWS",
+                    "startIndex": desde - 1,
+                    "endIndex": hasta,
+                }
+            }
+        }
+        for desde, hasta in agrupar_contiguas(filas)
+    ]
+    ws.spreadsheet.batch_update({"requests": requests})
+    return len(filas)
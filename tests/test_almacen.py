@@ -0,0 +1,213 @@
+# =========================================================
+# 🧪 ESCRITURAS Y SINCRONIZACIÓN CONTRA LOS ALMACENES
+# =========================================================
+# - Los caminos de agregar_fila / actualizar_hoja /
+#   eliminar_filas_por_filtro (Scoutingapp.py) sobre AlmacenLocal
+#   y sobre AlmacenSheets con el Google Sheets simulado
+# - Cada escritura se compara con el parche optimista que la app
+#   aplica al snapshot en memoria (data/cache.py)
+# - Sync incremental de "Informes": solo baja la cola nueva
+# - Dos instancias que reservan el mismo ID terminan con IDs distintos
+# =========================================================
+
+import csv
+import os
+import sys
+from functools import partial
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.almacen import AlmacenLocal, AlmacenSheets, RegistroNoEncontradoError, _hoja_o_crear
+from data.cache import actualizar_registros, agregar_registros, eliminar_registros
+from data.cola import CoordinadorEscrituras
+from data.espejo import EspejoSQLite
+from data.ids import AsignadorIDs
+from data.loader import ARCHIVOS_CSV, COLUMNAS_BASE
+from data.simulado import ConexionSimulada, LibroSimulado
+from data.sync import SincronizadorHojas, leer_hojas
+
+
+def _fila(nombre_hoja: str, **valores) -> list:
+    return [str(valores.get(c, "")) for c in COLUMNAS_BASE[nombre_hoja]]
+
+
+JUGADORES = [
+    _fila("Jugadores", ID_Jugador=1, Nombre="Ana Gómez", Posición="Extremo", Club="Atlético", Liga="Primera"),
+    _fila("Jugadores", ID_Jugador=2, Nombre="Luis Pérez", Posición="Lateral", Club="Unión", Liga="Primera"),
+    _fila("Jugadores", ID_Jugador=3, Nombre="Juan Ruiz", Posición="Extremo", Club="Sportivo", Liga="Nacional"),
+]
+INFORMES = [
+    _fila("Informes", ID_Informe=i, ID_Jugador=(i % 3) + 1, Scout="Scout A", Fecha_Informe="01/03/2024", Controles=3)
+    for i in range(1, 6)
+]
+
+
+@pytest.fixture
+def carpeta(tmp_path):
+    """CSV chicos con la forma de los del repo."""
+    for nombre, filas in (("Jugadores", JUGADORES), ("Informes", INFORMES), ("Lista corta", [])):
+        with open(tmp_path / ARCHIVOS_CSV[nombre], "w", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerows([COLUMNAS_BASE[nombre]] + filas)
+    return tmp_path
+
+
+@pytest.fixture(params=["local", "simulado"])
+def almacen(request, carpeta):
+    if request.param == "local":
+        return AlmacenLocal(EspejoSQLite(str(carpeta / "local.sqlite")), str(carpeta))
+    conexion = ConexionSimulada(LibroSimulado.desde_csv(str(carpeta)))
+    coordinador = CoordinadorEscrituras(partial(_hoja_o_crear, conexion))
+    return AlmacenSheets(conexion, SincronizadorHojas(), coordinador)
+
+
+def _confirmar(almacen, nombre_hoja: str, confirmacion):
+    almacen.vaciar(nombre_hoja)
+    return confirmacion.result(timeout=5)
+
+
+def _columna(df, columna: str) -> list:
+    return [str(v) for v in df[columna]]
+
+
+# ---------------------------------------------------------
+# ESCRITURAS
+# ---------------------------------------------------------
+def test_agregar_fila(almacen):
+    antes = almacen.leer_tabla("Jugadores")
+    fila = _fila("Jugadores", ID_Jugador=4, Nombre="Pedro Sosa", Posición="Volante", Club="Unión")
+
+    _confirmar(almacen, "Jugadores", almacen.agregar_filas("Jugadores", [fila]))
+
+    despues = almacen.leer_tabla("Jugadores")
+    assert _columna(despues, "ID_Jugador") == ["1", "2", "3", "4"]
+    assert despues.iloc[-1]["Nombre"] == "Pedro Sosa"
+    parchado = agregar_registros([fila])(antes)
+    assert _columna(parchado, "Nombre") == _columna(despues, "Nombre")
+
+
+def test_actualizar_hoja_escribe_solo_lo_que_cambio(almacen):
+    antes = almacen.leer_tabla("Jugadores")
+    cambios = antes[antes["ID_Jugador"] == "2"].copy()
+    cambios["Club"] = "Independiente"
+
+    resultado = almacen.actualizar_por_id("Jugadores", cambios, "ID_Jugador", agregar_nuevos=False)
+    _confirmar(almacen, "Jugadores", resultado["confirmacion"])
+
+    assert (resultado["celdas"], resultado["filas_nuevas"]) == (1, 0)
+    despues = almacen.leer_tabla("Jugadores")
+    assert _columna(despues, "Club") == ["Atlético", "Independiente", "Sportivo"]
+    parchado = actualizar_registros(cambios, "ID_Jugador")(antes)
+    assert _columna(parchado, "Club") == _columna(despues, "Club")
+
+
+def test_actualizar_hoja_sin_agregar_nuevos(almacen):
+    nuevo = almacen.leer_tabla("Jugadores").iloc[[0]].copy()
+    nuevo["ID_Jugador"] = "99"
+    with pytest.raises(RegistroNoEncontradoError):
+        almacen.actualizar_por_id("Jugadores", nuevo, "ID_Jugador", agregar_nuevos=False)
+    assert _columna(almacen.leer_tabla("Jugadores"), "ID_Jugador") == ["1", "2", "3"]
+
+
+def test_eliminar_filas_por_filtro(almacen):
+    antes = almacen.leer_tabla("Informes")
+
+    assert almacen.eliminar_por_filtro("Informes", {"ID_Jugador": "2"}, solo_primera=True) == 1
+    assert almacen.eliminar_por_filtro("Informes", {"ID_Informe": "99"}) == 0
+    with pytest.raises(KeyError):
+        almacen.eliminar_por_filtro("Informes", {"No_Existe": "1"})
+
+    despues = almacen.leer_tabla("Informes")
+    assert _columna(despues, "ID_Informe") == ["2", "3", "4", "5"]
+    parchado = eliminar_registros({"ID_Jugador": "2"}, solo_primera=True)(antes)
+    assert _columna(parchado, "ID_Informe") == _columna(despues, "ID_Informe")
+
+
+# ---------------------------------------------------------
+# SINCRONIZACIÓN INCREMENTAL
+# ---------------------------------------------------------
+@pytest.fixture
+def libro(carpeta):
+    libro = LibroSimulado.desde_csv(str(carpeta))
+    pedidos = []
+    values_batch_get = libro.values_batch_get
+
+    def _registrar(ranges, params=None):
+        pedidos.append(list(ranges))
+        return values_batch_get(ranges, params)
+
+    libro.values_batch_get = _registrar
+    libro.pedidos = pedidos
+    return libro
+
+
+def test_sync_incremental_baja_solo_la_cola(libro):
+    conexion = ConexionSimulada(libro)
+    sincronizador = SincronizadorHojas()
+    assert len(leer_hojas(conexion, sincronizador, ["Informes"])["Informes"]) == 5
+
+    # Otra instancia agrega un informe
+    libro.worksheet("Informes").append_rows([_fila("Informes", ID_Informe=6, ID_Jugador=1, Scout="Scout B")])
+    libro.pedidos.clear()
+    df = leer_hojas(conexion, sincronizador, ["Informes"])["Informes"]
+
+    assert _columna(df, "ID_Informe") == ["1", "2", "3", "4", "5", "6"]
+    # Encabezado + cola desde la última fila conocida (la 6, de solape)
+    assert len(libro.pedidos) == 1
+    encabezado, cola = libro.pedidos[0]
+    assert encabezado.endswith("!1:1") and "!A6:" in cola
+
+
+def test_sync_incremental_relee_si_cambio_el_final(libro):
+    conexion = ConexionSimulada(libro)
+    sincronizador = SincronizadorHojas()
+    leer_hojas(conexion, sincronizador, ["Informes"])
+
+    # Borrado de la última fila: la fila de solape ya no coincide
+    libro.batch_update({"requests": [{"deleteDimension": {"range": {
+        "sheetId": libro.worksheet("Informes").id, "dimension": "ROWS", "startIndex": 5, "endIndex": 6,
+    }}}]})
+    df = leer_hojas(conexion, sincronizador, ["Informes"])["Informes"]
+    assert _columna(df, "ID_Informe") == ["1", "2", "3", "4"]
+
+
+def test_sync_incremental_relee_si_se_edito_a_mitad_de_hoja(libro):
+    conexion = ConexionSimulada(libro)
+    sincronizador = SincronizadorHojas()
+    leer_hojas(conexion, sincronizador, ["Informes"])
+
+    # Edición de una fila existente (C2 = Scout del primer informe), sin filas nuevas
+    libro.worksheet("Informes").update([["Scout B"]], "C2")
+    df = leer_hojas(conexion, sincronizador, ["Informes"])["Informes"]
+    assert _columna(df, "Scout") == ["Scout B"] + ["Scout A"] * 4
+
+
+def test_grilla_verificada_ve_borrados_a_mitad_de_hoja(libro):
+    conexion = ConexionSimulada(libro)
+    sincronizador = SincronizadorHojas()
+    leer_hojas(conexion, sincronizador, ["Informes"])
+
+    # Borrado a mitad de hoja que modifiedTime todavía no refleja
+    del libro.worksheet("Informes")._grilla[2]
+    grilla = sincronizador.grilla_verificada(conexion.libro(), "Informes", ("ID_Informe",))
+    assert [fila[0] for fila in grilla[1:]] == ["1", "3", "4", "5"]
+
+
+# ---------------------------------------------------------
+# IDS ENTRE INSTANCIAS
+# ---------------------------------------------------------
+def test_ids_repetidos_se_renumeran_aunque_las_filas_coincidan(almacen):
+    # Dos instancias reservan el mismo ID para el mismo jugador
+    reservas = [AsignadorIDs(almacen).reservar("Jugadores") for _ in range(2)]
+    assert reservas == [4, 4]
+    verificados = []
+    for id_jugador in reservas:
+        fila = _fila("Jugadores", ID_Jugador=id_jugador, Nombre="Pedro Sosa")
+        confirmacion = almacen.agregar_filas("Jugadores", [fila])
+        almacen.vaciar("Jugadores")
+        verificados.append(AsignadorIDs(almacen).confirmar("Jugadores", fila, confirmacion))
+
+    ids = [str(v.result(timeout=5)) for v in verificados]
+    assert ids == ["4", "5"]
+    assert _columna(almacen.leer_tabla("Jugadores"), "ID_Jugador") == ["1", "2", "3", "4", "5"]